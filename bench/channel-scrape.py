@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Offline benchmark stage for the HTML extraction of releases-retriever.py.
+# Runs its requests scraper unchanged, but with a session that answers from a
+# saved channel page and its continuation responses instead of the network.
+# Writes the playlist URL list like the retriever does and prints its path.
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'libexec'))
+from sibling_import import load_sibling
+
+class SavedResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.text)
+
+class SavedSession:
+    """Stands in for requests.Session: GET returns the page, POST the continuation for the token."""
+    def __init__(self, html_path: str, continuations_path: str | None):
+        with open(html_path, 'r', encoding='utf-8') as f:
+            self.html = f.read()
+        self.continuations = {}
+        if continuations_path:
+            with open(continuations_path, 'r', encoding='utf-8') as f:
+                self.continuations = json.load(f)
+
+    def get(self, url, **kwargs):
+        return SavedResponse(self.html)
+
+    def post(self, url, **kwargs):
+        token = kwargs['json']['continuation']
+        return SavedResponse(json.dumps(self.continuations.get(token, {})))
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the releases-retriever requests scraper on a saved channel page.")
+    parser.add_argument("html_path", help="Saved channel page.")
+    parser.add_argument("--continuations", help="JSON object mapping continuation tokens to browse API responses.")
+    parser.add_argument("--output-dir", required=True)
+    args = parser.parse_args()
+
+    retriever = load_sibling('releases-retriever.py')
+    session = SavedSession(args.html_path, args.continuations)
+    page_title, playlist_urls = retriever.run_requests_scraper("https://www.youtube.com/@bench/releases", session=session)
+    if playlist_urls is None:
+        sys.exit(1)
+
+    output_path = os.path.join(args.output_dir, f"{os.path.splitext(os.path.basename(args.html_path))[0]}.playlists.txt")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{url}\n" for url in playlist_urls)
+    print(f"{page_title}: {len(playlist_urls)} playlists", file=sys.stderr)
+    print(output_path)
+
+if __name__ == "__main__":
+    main()
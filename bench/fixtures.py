@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Deterministic synthetic inputs for the benchmarks: .info.json files shaped
+# like yt-dlp's (formats, thumbnails, flat comment list with parent ids),
+# rolling YouTube-style auto-captions as SRT and ASS, and channel pages with
+# ytInitialData, ytcfg and continuation pages for the browse API. The same
+# arguments always produce byte-identical files.
+
+import argparse
+import json
+import os
+import random
+
+WORDS = (
+    "the a of and to in is that it was for on are with as this be at by not or have from "
+    "but what all were when we there can an your which their said if do will each about how "
+    "up out them then she many some so these would other into has more her two like him see "
+    "time could no make than first been its who now people my made over did down only way find "
+    "use may water long little very after words called just where most know get through back "
+    "much before go good new write our used me man too any day same right look think also around "
+    "another came come work three word must because does part even place well such here take why "
+    "album track music video sound mix live session bass guitar drums vocals release remaster"
+).split()
+SEED = 1337
+
+# --- Helper Functions ---
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    text = " ".join(words)
+    return text[0].upper() + text[1:]
+
+def comment_id(rng: random.Random) -> str:
+    return "Ugx" + "".join(rng.choices("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-", k=23))
+
+def clock(milliseconds: int, separator: str = ',') -> str:
+    s, ms = divmod(milliseconds, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+# --- .info.json ---
+
+def generate_comments(rng: random.Random, count: int, replies: int, reply_depth: int) -> list[dict]:
+    """
+    A flat yt-dlp comment list of `count` comments. Threads get on average
+    `replies` replies; with reply_depth > 1 some replies answer other replies.
+    """
+    comments = []
+    while len(comments) < count:
+        root = {
+            "id": comment_id(rng), "parent": "root", "text": sentence(rng, 4, 60),
+            "like_count": int(rng.paretovariate(1.2)) - 1, "author": f"@user{rng.randint(1, 10**6)}",
+            "author_id": comment_id(rng), "author_is_uploader": rng.random() < 0.01,
+            "timestamp": 1700000000 + rng.randint(0, 10**7), "_time_text": "1 month ago",
+        }
+        comments.append(root)
+        thread = [(root["id"], 0)] # (comment id, reply level)
+        for _ in range(min(rng.randint(0, 2 * replies), count - len(comments))):
+            parent_id, depth = rng.choice(thread) if reply_depth > 1 else thread[0]
+            reply = dict(root, id=f"{root['id']}.{comment_id(rng)[3:]}", parent=parent_id,
+                         text=sentence(rng, 2, 40), like_count=int(rng.paretovariate(2)) - 1,
+                         author=f"@user{rng.randint(1, 10**6)}", author_is_uploader=False)
+            comments.append(reply)
+            if depth + 1 < reply_depth:
+                thread.append((reply["id"], depth + 1))
+    return comments
+
+def generate_info_json(path: str, comments: int, replies: int = 3, reply_depth: int = 1, formats: int = 40, seed: int = SEED):
+    rng = random.Random(seed)
+    video_id = "BenchVid001"
+    info = {
+        "id": video_id, "title": "Synthetic benchmark video", "channel": "Bench Channel",
+        "channel_id": "UCbenchbenchbenchbenchbe", "uploader": "Bench Channel", "upload_date": "20240101",
+        "duration": 3600, "view_count": 123456, "like_count": 7890,
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "description": "\n".join(sentence(rng, 5, 20) for _ in range(30)),
+        "tags": rng.sample(WORDS, 20),
+        "formats": [{
+            "format_id": str(100 + i), "ext": rng.choice(("mp4", "webm", "m4a")),
+            "url": "https://rr1---sn-bench.googlevideo.com/videoplayback?" + "&".join(
+                f"{rng.choice(WORDS)}={rng.getrandbits(64):x}" for _ in range(25)),
+            "tbr": rng.uniform(50, 5000), "filesize": rng.randint(10**5, 10**9),
+            "http_headers": {"User-Agent": "Mozilla/5.0", "Accept": "*/*"},
+        } for i in range(formats)],
+        "thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/{i}.jpg", "id": str(i)} for i in range(40)],
+        "comment_count": comments,
+        "comments": generate_comments(rng, comments, replies, reply_depth),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False)
+
+# --- Subtitles ---
+
+def iter_rolling_cues(rng: random.Random, hours: float):
+    """Auto-caption cues: two lines each, the second one repeated as the first line of the next cue."""
+    position = 0
+    previous = sentence(rng, 3, 8)
+    end_of_track = int(hours * 3600 * 1000)
+    while position < end_of_track:
+        line = sentence(rng, 3, 8) + rng.choice(("", "", "", "."))
+        duration = rng.randint(1500, 3500)
+        yield position, position + duration, [previous, line]
+        previous = line
+        position += duration + (rng.randint(900, 3000) if rng.random() < 0.05 else 10)
+
+def generate_srt(path: str, hours: float, seed: int = SEED):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for number, (start, end, lines) in enumerate(iter_rolling_cues(rng, hours), start=1):
+            f.write(f"{number}\n{clock(start)} --> {clock(end)}\n" + "\n".join(lines) + "\n\n")
+
+def generate_ass(path: str, hours: float, seed: int = SEED):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[Script Info]\nScriptType: v4.00+\nPlayResX: 1920\nPlayResY: 1080\n\n"
+                "[V4+ Styles]\nFormat: Name, Fontname, Fontsize, PrimaryColour, Bold, Italic, Alignment\n"
+                "Style: Default,Arial,48,&H00FFFFFF,0,0,2\n\n"
+                "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+        for start, end, lines in iter_rolling_cues(rng, hours):
+            text = "\\N".join(lines)
+            if rng.random() < 0.1:
+                text = "{\\i1}" + text + "{\\i0}"
+            f.write(f"Dialogue: 0,{clock(start, '.')[1:-1]},{clock(end, '.')[1:-1]},Default,,0,0,0,,{text}\n")
+
+# --- Channel pages ---
+
+def playlist_lockup(rng: random.Random, playlist_id: str) -> dict:
+    """A playlist item as the channel releases tab renders it (lockupViewModel)."""
+    return {"richItemRenderer": {"content": {"lockupViewModel": {
+        "contentId": playlist_id, "contentType": "LOCKUP_CONTENT_TYPE_PLAYLIST",
+        "metadata": {"lockupMetadataViewModel": {"title": {"content": sentence(rng, 1, 5)}}},
+        "contentImage": {"collectionThumbnailViewModel": {"primaryThumbnail": {"thumbnailViewModel": {
+            "image": {"sources": [{"url": f"https://i.ytimg.com/vi/{playlist_id[-11:]}/hqdefault.jpg", "width": 480}]},
+        }}}},
+        "rendererContext": {"commandContext": {"onTap": {"innertubeCommand": {
+            "commandMetadata": {"webCommandMetadata": {"url": f"/playlist?list={playlist_id}"}},
+        }}}},
+    }}}}
+
+def continuation_item(token: str) -> dict:
+    return {"continuationItemRenderer": {"continuationEndpoint": {"continuationCommand": {"token": token}}}}
+
+def generate_channel(directory: str, name: str, playlists: int, page_size: int = 30, seed: int = SEED) -> dict:
+    """
+    Writes <name>.html (the first page, as served to a browser) and
+    <name>.continuations.json (token -> browse API response). Returns the
+    paths and the playlist ids the page holds.
+    """
+    rng = random.Random(seed)
+    ids = [f"OLAK5uy_{rng.getrandbits(128):032x}"[:41] for _ in range(playlists)]
+    pages = [ids[i:i + page_size] for i in range(0, len(ids), page_size)] or [[]]
+    tokens = [f"4qmFsgKbench{index:04d}" for index in range(len(pages))]
+
+    def page_items(index):
+        items = [playlist_lockup(rng, playlist_id) for playlist_id in pages[index]]
+        if index + 1 < len(pages):
+            items.append(continuation_item(tokens[index + 1]))
+        return items
+
+    initial_data = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [
+        {"tabRenderer": {"title": "Home", "content": {"richGridRenderer": {"contents": []}}}},
+        {"tabRenderer": {"title": "Releases", "selected": True,
+                         "content": {"richGridRenderer": {"contents": page_items(0)}}}},
+    ]}}, "header": {"pageHeaderRenderer": {"pageTitle": "Bench Channel"}}}
+    ytcfg = {"INNERTUBE_API_KEY": "AIzaBench", "INNERTUBE_CLIENT_VERSION": "2.20240101.00.00",
+             "INNERTUBE_CONTEXT_CLIENT_NAME": 1,
+             "INNERTUBE_CONTEXT": {"client": {"clientName": "WEB", "clientVersion": "2.20240101.00.00", "hl": "en"}}}
+    # Pages carry a lot of unrelated script and markup around the data.
+    filler = "\n".join(f'<script nonce="x">var _f{i} = "{rng.getrandbits(512):x}";</script>' for i in range(400))
+    html = (f'<!DOCTYPE html><html lang="en"><head><title>Bench Channel - YouTube</title>\n{filler}\n'
+            f'<script nonce="x">ytcfg.set({json.dumps(ytcfg)});</script></head><body>\n'
+            f'<script nonce="x">var ytInitialData = {json.dumps(initial_data)};</script>\n</body></html>\n')
+    continuations = {tokens[index]: {"onResponseReceivedActions": [{"appendContinuationItemsAction": {
+        "continuationItems": page_items(index)}}]} for index in range(1, len(pages))}
+
+    html_path = os.path.join(directory, f"{name}.html")
+    continuations_path = os.path.join(directory, f"{name}.continuations.json")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    with open(continuations_path, 'w', encoding='utf-8') as f:
+        json.dump(continuations, f)
+    return {"html": html_path, "continuations": continuations_path, "playlist_ids": ids}
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes deterministic synthetic benchmark inputs and prints their paths.")
+    parser.add_argument("--output-dir", required=True, help="Directory for the generated files.")
+    parser.add_argument("--seed", type=int, default=SEED)
+    subparsers = parser.add_subparsers(dest="kind", required=True)
+
+    p = subparsers.add_parser("info-json", help="A yt-dlp .info.json with comments.")
+    p.add_argument("--comments", type=int, default=10000)
+    p.add_argument("--replies", type=int, default=3, help="Average replies per thread (default: 3).")
+    p.add_argument("--reply-depth", type=int, default=1, help="1 = replies answer the thread (YouTube); more nests replies.")
+    p.add_argument("--formats", type=int, default=40)
+
+    for kind in ("srt", "ass"):
+        p = subparsers.add_parser(kind, help=f"Rolling auto-captions as {kind.upper()}.")
+        p.add_argument("--hours", type=float, default=1.0)
+
+    p = subparsers.add_parser("channel", help="A channel releases page with continuation pages.")
+    p.add_argument("--playlists", type=int, default=90)
+    p.add_argument("--page-size", type=int, default=30)
+    p.add_argument("--name", default="channel")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.kind == "info-json":
+        path = os.path.join(args.output_dir, f"bench-{args.comments}c-d{args.reply_depth}.info.json")
+        generate_info_json(path, args.comments, args.replies, args.reply_depth, args.formats, args.seed)
+        print(path)
+    elif args.kind in ("srt", "ass"):
+        path = os.path.join(args.output_dir, f"bench-{args.hours:g}h.en.{args.kind}")
+        (generate_srt if args.kind == "srt" else generate_ass)(path, args.hours, args.seed)
+        print(path)
+    elif args.kind == "channel":
+        paths = generate_channel(args.output_dir, args.name, args.playlists, args.page_size, args.seed)
+        print(paths["html"])
+        print(paths["continuations"])
+
+if __name__ == "__main__":
+    main()
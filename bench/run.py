@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Benchmark suite for the Python processors. Generates the fixtures of a size
+# preset (see fixtures.py), runs every stage as its own process exactly as the
+# worker scripts do, and reports wall time, CPU time, peak RSS and output size
+# per stage. Results are compared with bench/baseline.json when it exists; a
+# stage that got slower or bigger than the tolerance fails the run. Everything
+# runs offline.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = os.path.dirname(BENCH_DIR)
+LIBEXEC_DIR = os.path.join(WORK_DIR, 'libexec')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_FIXTURE_DIR = os.path.join(WORK_DIR, 'tmp', 'bench')
+SAVED_CHANNEL = os.path.join(BENCH_DIR, 'fixtures', 'channel-releases.html')
+
+# Size presets: comments in the .info.json, subtitle length, playlists on the channel page.
+SIZES = {
+    'small': {'comments': 2000, 'reply_depth': 1, 'hours': 0.5, 'playlists': 90},
+    'medium': {'comments': 20000, 'reply_depth': 1, 'hours': 2, 'playlists': 600},
+    'large': {'comments': 100000, 'reply_depth': 3, 'hours': 6, 'playlists': 3000},
+}
+COMPARED_METRICS = ('wall_s', 'peak_rss_mb', 'output_bytes')
+
+# --- Helper Functions ---
+
+def generate(directory: str, *arguments) -> list[str]:
+    """Runs fixtures.py in its own process and returns the paths it wrote."""
+    result = subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'fixtures.py'), '--output-dir', directory, *arguments],
+                            capture_output=True, text=True, check=True)
+    return result.stdout.splitlines()
+
+def prepare_fixtures(directory: str, size: str) -> dict:
+    """
+    Generates the fixtures of a preset (deterministic, so every run sees the
+    same bytes). Generation runs in a separate process: a forked stage inherits
+    the peak RSS of its parent, so this process has to stay small for the
+    numbers to mean anything.
+    """
+    preset = SIZES[size]
+    directory = os.path.join(directory, size)
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    paths['info'], = generate(directory, 'info-json', '--comments', str(preset['comments']),
+                              '--reply-depth', str(preset['reply_depth']))
+    paths['srt'], = generate(directory, 'srt', '--hours', str(preset['hours']))
+    paths['ass'], = generate(directory, 'ass', '--hours', str(preset['hours']))
+    paths['channel'], paths['channel_continuations'] = generate(directory, 'channel', '--playlists', str(preset['playlists']))
+    paths['output_dir'] = os.path.join(directory, 'out')
+    os.makedirs(paths['output_dir'], exist_ok=True)
+    return paths
+
+def stage_commands(paths: dict) -> dict[str, list[str]]:
+    python = sys.executable
+    stages = {
+        'restructure-load': [python, os.path.join(LIBEXEC_DIR, 'json-restructurer.py'), paths['info']],
+        'restructure-stream': [python, os.path.join(LIBEXEC_DIR, 'json-restructurer.py'), '--stream', paths['info']],
+        'srt': [python, os.path.join(LIBEXEC_DIR, 'srt-processor.py'), paths['srt']],
+        'ass': [python, os.path.join(LIBEXEC_DIR, 'ass-processor.py'), paths['ass']],
+        'package-build': [python, os.path.join(LIBEXEC_DIR, 'package-builder.py'), '--stream',
+                          '--info-json', paths['info'], '--subtitle', paths['srt'], '--output-dir', paths['output_dir']],
+        'channel-extract': [python, os.path.join(BENCH_DIR, 'channel-scrape.py'), paths['channel'],
+                            '--continuations', paths['channel_continuations'], '--output-dir', paths['output_dir']],
+    }
+    if os.path.exists(SAVED_CHANNEL):
+        stages['channel-extract-saved'] = [
+            python, os.path.join(BENCH_DIR, 'channel-scrape.py'), SAVED_CHANNEL,
+            '--continuations', SAVED_CHANNEL.replace('.html', '.continuations.json'), '--output-dir', paths['output_dir']]
+    return stages
+
+def peak_rss_mb(usage) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss / divisor
+
+def measure(command: list[str], log_path: str) -> dict:
+    """Runs one stage and returns its metrics. wait4 gives the resource usage of exactly this process."""
+    with open(log_path, 'w+', encoding='utf-8') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=log, cwd=WORK_DIR)
+        stdout = process.stdout.read().decode('utf-8')
+        _pid, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+        process.stdout.close()
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            log.seek(0)
+            raise RuntimeError(f"exit code {process.returncode}: {log.read().strip()[-500:]}")
+
+    output_path = stdout.strip().splitlines()[-1] if stdout.strip() else ''
+    output_bytes = os.path.getsize(output_path) if os.path.isfile(output_path) else 0
+    if output_bytes:
+        os.remove(output_path)
+    return {
+        'wall_s': wall,
+        'cpu_s': usage.ru_utime + usage.ru_stime,
+        'peak_rss_mb': peak_rss_mb(usage),
+        'output_bytes': output_bytes,
+    }
+
+def run_stage(command: list[str], repeat: int, log_path: str) -> dict:
+    """Best wall and CPU time of `repeat` runs; peak RSS and output size of the largest."""
+    runs = [measure(command, log_path) for _ in range(repeat)]
+    return {
+        'wall_s': round(min(run['wall_s'] for run in runs), 3),
+        'cpu_s': round(min(run['cpu_s'] for run in runs), 3),
+        'peak_rss_mb': round(max(run['peak_rss_mb'] for run in runs), 1),
+        'output_bytes': max(run['output_bytes'] for run in runs),
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns the regressions: metrics that grew by more than the tolerance against the baseline."""
+    regressions = []
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            if base.get(metric) and metrics[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {base[metric]} -> {metrics[metric]}")
+    return regressions
+
+def format_change(value, base) -> str:
+    if not base:
+        return ""
+    return f" ({(value - base) / base:+.0%})"
+
+def print_table(results: dict, baseline: dict):
+    print(f"{'stage':<34}{'wall s':>16}{'cpu s':>10}{'peak RSS MB':>20}{'output bytes':>24}")
+    for key, metrics in results.items():
+        base = baseline.get(key, {})
+        print(f"{key:<34}"
+              f"{metrics['wall_s']:>9.3f}{format_change(metrics['wall_s'], base.get('wall_s')):>7}"
+              f"{metrics['cpu_s']:>10.3f}"
+              f"{metrics['peak_rss_mb']:>13.1f}{format_change(metrics['peak_rss_mb'], base.get('peak_rss_mb')):>7}"
+              f"{metrics['output_bytes']:>17}{format_change(metrics['output_bytes'], base.get('output_bytes')):>7}")
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the Python processors on synthetic fixtures and compares the results with a stored baseline."
+    )
+    parser.add_argument("--size", action="append", choices=SIZES, help="Size preset; repeatable (default: small and medium).")
+    parser.add_argument("--stage", action="append", help="Only run these stages; repeatable (default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best time counts (default: 3).")
+    parser.add_argument("--fixture-dir", default=DEFAULT_FIXTURE_DIR, help=f"Where fixtures are generated (default: {DEFAULT_FIXTURE_DIR}).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"Baseline file (default: {DEFAULT_BASELINE}).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline instead of comparing.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed growth against the baseline (default: 0.25 = 25%%).")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    results = {}
+    failed = False
+    for size in args.size or ['small', 'medium']:
+        print(f"Preparing {size} fixtures...", file=sys.stderr, flush=True)
+        paths = prepare_fixtures(args.fixture_dir, size)
+        for stage, command in stage_commands(paths).items():
+            if args.stage and stage not in args.stage:
+                continue
+            key = f"{size}/{stage}"
+            print(f"Running {key}...", file=sys.stderr, flush=True)
+            try:
+                results[key] = run_stage(command, max(1, args.repeat), os.path.join(paths['output_dir'], f"{stage}.log"))
+            except RuntimeError as e:
+                print(f"Error: {key} failed: {e}", file=sys.stderr)
+                failed = True
+
+    print_table(results, baseline)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('results', {})
+            report['results'] = {**previous, **results} # Keep the presets that were not run
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    elif baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    else:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline.", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/bin/bash
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# This script provides the audio pipeline mode shared by the mp3 downloaders.
+# It should be sourced by other scripts, not executed directly.
+#
+# In pipeline mode yt-dlp only downloads (bestaudio, .info.json, thumbnail) into
+# a staging directory and appends each finished file to a queue file. In the
+# meantime libexec/audio-encoder.py transcodes the queued files with a pool of
+# ffmpeg processes into the real destination. Network I/O and encoding overlap
+# instead of alternating.
+#
+# Usage:
+#   source "$WORK_DIR/lib/audio-pipeline.sh"
+#   audio_pipeline_setup "$destination_dir" [album]   # sets AUDIO_OUTPUT_DIR and AUDIO_ARGS
+#   album_artwork_prefetch "$playlist_url"      # or: --batch-file "$list"
+#   "${YTDLP_COMMAND_ARRAY[@]}" -P "$AUDIO_OUTPUT_DIR" "${AUDIO_ARGS[@]}" ... "$url"
+#   audio_pipeline_finish                       # waits for the encoder
+
+# Ensure WORK_DIR is set. The sourcing script must have sourced environment.sh first.
+if [ -z "$WORK_DIR" ]; then
+    echo "FATAL: WORK_DIR not set. Sourcing environment.sh is a prerequisite." >&2
+    exit 1
+fi
+source "$WORK_DIR/lib/directories-config.sh"
+
+# Must match END_MARKER in libexec/audio-encoder.py
+AUDIO_PIPELINE_END_MARKER="__yt-menu-end__"
+
+# The regular, inline yt-dlp conversion. The cover art is added by audio_pipeline_setup.
+AUDIO_INLINE_ARGS=(
+    --extract-audio
+    --audio-format mp3
+    --audio-quality 0
+    --embed-metadata
+)
+
+# --- Function: artwork_exec_args ---
+# Sets ARTWORK_EXEC_ARGS to the yt-dlp --exec hook that attaches the playlist's
+# cached cover to each finished track (libexec/artwork.py).
+artwork_exec_args() {
+    local command
+    command=$(printf '%q ' "$VENV_PYTHON" "$WORK_DIR/libexec/artwork.py" \
+        --max-mb "$(get_config_default "ARTWORK_CACHE_MAX_MB" "256")" embed)
+    if [ "$(get_config_default "ALBUM_COVER_FILE" "0")" = "1" ]; then
+        command+="--cover-file "
+    fi
+    ARTWORK_EXEC_ARGS=(--exec "after_move:${command}--key %(playlist_id,id)q --url %(thumbnail)q %(filepath)q")
+}
+
+# --- Function: album_artwork_prefetch ---
+# album_artwork_prefetch PLAYLIST_URL... | --batch-file FILE
+# Resolves the playlists' own thumbnails and caches them as their covers before
+# the download starts. No-op unless audio_pipeline_setup enabled album artwork.
+# A playlist without a cached cover leaves its tracks with their own thumbnails.
+album_artwork_prefetch() {
+    [ "$AUDIO_ALBUM_ARTWORK" = "1" ] || return 0
+    mkdir -p "$WORK_DIR/tmp"
+    "$VENV_PYTHON" "$WORK_DIR/libexec/artwork.py" \
+        --max-mb "$(get_config_default "ARTWORK_CACHE_MAX_MB" "256")" prefetch "$@" \
+        -- "${YTDLP_COMMAND_ARRAY[@]}"
+    return 0
+}
+
+# --- Function: audio_pipeline_setup ---
+# audio_pipeline_setup DESTINATION_DIR [album]
+# Decides between inline conversion and pipeline mode (AUDIO_ENCODER_PIPELINE=1
+# in config/yt-menu.cfg). Sets AUDIO_OUTPUT_DIR (the -P path for yt-dlp) and
+# AUDIO_ARGS (the conversion related yt-dlp arguments). In pipeline mode it also
+# starts the encoder in the background. With "album" (and ALBUM_ARTWORK_CACHE=1),
+# every track gets its playlist's cover, fetched once by album_artwork_prefetch,
+# instead of its own thumbnail.
+audio_pipeline_setup() {
+    local destination_dir="$1"
+    local album_artwork=0
+    if [ "$2" = "album" ] && [ "$(get_config_default "ALBUM_ARTWORK_CACHE" "1")" = "1" ]; then
+        album_artwork=1
+    fi
+    AUDIO_ALBUM_ARTWORK="$album_artwork"
+    AUDIO_PIPELINE_PID=""
+    AUDIO_PIPELINE_STAGING=""
+    AUDIO_PIPELINE_DEST="$destination_dir"
+
+    if [ "$(get_config_default "AUDIO_ENCODER_PIPELINE" "0")" != "1" ]; then
+        AUDIO_OUTPUT_DIR="$destination_dir"
+        AUDIO_ARGS=("${AUDIO_INLINE_ARGS[@]}")
+        if [ "$album_artwork" = "1" ]; then
+            artwork_exec_args
+            AUDIO_ARGS+=("${ARTWORK_EXEC_ARGS[@]}")
+        else
+            AUDIO_ARGS+=(--embed-thumbnail)
+        fi
+        return 0
+    fi
+
+    mkdir -p "$WORK_DIR/tmp/staging"
+    AUDIO_PIPELINE_STAGING=$(mktemp -d "$WORK_DIR/tmp/staging/XXXXXX")
+    AUDIO_PIPELINE_QUEUE="$AUDIO_PIPELINE_STAGING/.queue"
+    : > "$AUDIO_PIPELINE_QUEUE"
+    AUDIO_OUTPUT_DIR="$AUDIO_PIPELINE_STAGING"
+    AUDIO_ARGS=(
+        --write-info-json
+        --print-to-file "after_move:%(filepath)s" "$AUDIO_PIPELINE_QUEUE"
+    )
+
+    local encoder_args=(
+        --queue "$AUDIO_PIPELINE_QUEUE"
+        --staging-dir "$AUDIO_PIPELINE_STAGING"
+        --dest-dir "$destination_dir"
+    )
+    local encoder_jobs
+    encoder_jobs=$(get_config_default "AUDIO_ENCODER_JOBS" "")
+    if [ -n "$encoder_jobs" ]; then
+        encoder_args+=(--jobs "$encoder_jobs")
+    fi
+    if [ "$album_artwork" = "1" ]; then
+        encoder_args+=(--album-artwork --artwork-max-mb "$(get_config_default "ARTWORK_CACHE_MAX_MB" "256")")
+        [ "$(get_config_default "ALBUM_COVER_FILE" "0")" = "1" ] && encoder_args+=(--cover-file)
+    else
+        AUDIO_ARGS+=(--write-thumbnail)
+    fi
+
+    echo "Pipeline mode: downloading to staging, encoding in parallel into \"$destination_dir\""
+    "$VENV_PYTHON" "$WORK_DIR/libexec/audio-encoder.py" "${encoder_args[@]}" &
+    AUDIO_PIPELINE_PID=$!
+    # The encoder polls the queue until the end marker; if the script is
+    # interrupted or exits before audio_pipeline_finish, stop it instead.
+    trap audio_pipeline_abort EXIT
+    trap 'audio_pipeline_abort; exit 130' INT
+    trap 'audio_pipeline_abort; exit 143' TERM
+}
+
+# --- Function: audio_pipeline_abort ---
+# Stops a still running encoder. Installed as the EXIT/INT/TERM trap by
+# audio_pipeline_setup; a no-op once audio_pipeline_finish has run.
+audio_pipeline_abort() {
+    [ -z "$AUDIO_PIPELINE_PID" ] && return 0
+    kill "$AUDIO_PIPELINE_PID" 2>/dev/null
+    wait "$AUDIO_PIPELINE_PID" 2>/dev/null
+    AUDIO_PIPELINE_PID=""
+    echo "Encoder stopped. Downloaded but unencoded files are kept in: $AUDIO_PIPELINE_STAGING" >&2
+}
+
+# --- Function: audio_pipeline_finish ---
+# Signals the end of the download queue and waits for the encoder to finish the
+# remaining tracks. Empty staging directories are removed; files that failed to
+# encode are kept for inspection. Returns the encoder's exit status.
+audio_pipeline_finish() {
+    [ -z "$AUDIO_PIPELINE_PID" ] && return 0
+
+    echo "$AUDIO_PIPELINE_END_MARKER" >> "$AUDIO_PIPELINE_QUEUE"
+    echo "Downloads finished. Waiting for the encoder..."
+    wait "$AUDIO_PIPELINE_PID"
+    local status=$?
+
+    rm -f "$AUDIO_PIPELINE_QUEUE"
+    find "$AUDIO_PIPELINE_STAGING" -depth -type d -empty -delete
+    if [ -d "$AUDIO_PIPELINE_STAGING" ]; then
+        echo "Some files were not encoded. They are kept in: $AUDIO_PIPELINE_STAGING" >&2
+    fi
+    AUDIO_PIPELINE_PID=""
+    trap - EXIT INT TERM
+    return $status
+}
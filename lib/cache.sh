@@ -0,0 +1,86 @@
+#!/bin/bash
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# This script provides the metadata cache hooks (see libexec/cache.py) for the
+# metadata modes. It should be sourced by other scripts, not executed directly.
+#
+# Usage:
+#   source "$WORK_DIR/lib/cache.sh"
+#   cache_restore "$url" "$dir" info subtitle   # sets CACHE_VIDEO_ID and CACHE_MISSING
+#   ... run yt-dlp for the types in CACHE_MISSING only ...
+#   cache_store "$dir"                          # stores what was just fetched
+
+# Ensure WORK_DIR is set. The sourcing script must have sourced environment.sh first.
+if [ -z "$WORK_DIR" ]; then
+    echo "FATAL: WORK_DIR not set. Sourcing environment.sh is a prerequisite." >&2
+    exit 1
+fi
+source "$WORK_DIR/lib/directories-config.sh"
+
+CACHE_CMD=(
+    "$VENV_PYTHON" "$WORK_DIR/libexec/cache.py"
+    --ttl-hours "$(get_config_default "CACHE_TTL_HOURS" "24")"
+    --max-mb "$(get_config_default "CACHE_MAX_MB" "2048")"
+)
+
+# --- Function: cache_restore ---
+# cache_restore URL DEST_DIR ARTIFACT... (info, subtitle, description)
+# Restores the cached artifacts of the video into DEST_DIR and sets CACHE_MISSING
+# to the ones that still have to be fetched. CACHE_SUB_FORMATS (comma-separated)
+# limits which cached subtitle formats are acceptable. Files are copied, so the
+# user gets normal, writable files; set CACHE_LINK=1 to hard-link them instead,
+# only for a private temporary DEST_DIR that is removed afterwards.
+cache_restore() {
+    local url="$1" dest_dir="$2"
+    shift 2
+    CACHE_MISSING=("$@")
+    CACHE_VIDEO_ID=$("$VENV_PYTHON" "$WORK_DIR/libexec/library.py" video-id "$url") || return 0
+
+    local restore_args=(restore --id "$CACHE_VIDEO_ID" --dest "$dest_dir")
+    if [ -n "$CACHE_SUB_FORMATS" ]; then
+        restore_args+=(--sub-formats "$CACHE_SUB_FORMATS")
+    fi
+    if [ "$CACHE_LINK" = "1" ]; then
+        restore_args+=(--link)
+    fi
+    mapfile -t CACHE_MISSING < <("${CACHE_CMD[@]}" "${restore_args[@]}" "$@" || printf '%s\n' "$@")
+}
+
+# --- Function: cache_missing ---
+# Succeeds if the given artifact type still has to be fetched.
+cache_missing() {
+    local artifact
+    for artifact in "${CACHE_MISSING[@]}"; do
+        [ "$artifact" = "$1" ] && return 0
+    done
+    return 1
+}
+
+# --- Function: cache_store ---
+# Stores the artifacts that cache_restore reported missing, now that yt-dlp has
+# written them into DIR.
+cache_store() {
+    [ -z "$CACHE_VIDEO_ID" ] || [ ${#CACHE_MISSING[@]} -eq 0 ] && return 0
+    local store_args=(store --id "$CACHE_VIDEO_ID")
+    local artifact
+    for artifact in "${CACHE_MISSING[@]}"; do
+        store_args+=(--fetched "$artifact")
+    done
+    "${CACHE_CMD[@]}" "${store_args[@]}" "$1"
+}
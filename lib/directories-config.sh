@@ -83,4 +83,25 @@ get_config() {
 
     # The final value is echoed to be captured by the calling script.
     echo "$value"
-}
\ No newline at end of file
+}
+
+# --- Function: get_config_default ---
+# Reads an optional value from the config file. Falls back to the given default
+# if the key is missing or empty. Never prompts, so it is safe in non-interactive
+# sessions.
+#
+# Usage:
+#   local my_var
+#   my_var=$(get_config_default "KEY_NAME" "default value")
+#
+get_config_default() {
+    local key="$1"
+    local default="$2"
+    local value=""
+
+    if [ -f "$CONFIG_FILE" ]; then
+        value=$(grep "^${key}=" "$CONFIG_FILE" | tail -n 1 | cut -d'=' -f2-)
+    fi
+
+    echo "${value:-$default}"
+}
@@ -25,8 +25,19 @@ WORK_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )/.." && pwd )" # Points to proj
 # Define the absolute path to your venv's Python interpreter.
 VENV_PYTHON="$WORK_DIR/.venv/bin/python3"
 
+# yt-dlp checkout. Updates (lib/ytdlp-update.sh) install each revision as its own
+# directory and swap the vendor/yt-dlp-current link. It is resolved once here, so
+# this script and everything it starts use one complete revision, even if an
+# update lands meanwhile. Before the first update the plain clone is used.
+YTDLP_DIR="$WORK_DIR/vendor/yt-dlp"
+if [ -L "$WORK_DIR/vendor/yt-dlp-current" ] && [ -d "$WORK_DIR/vendor/yt-dlp-current" ]; then
+    YTDLP_DIR=$(readlink -f "$WORK_DIR/vendor/yt-dlp-current")
+    # Recorded by the run report; identifies the revision a job ran with.
+    export YTDLP_REVISION="${YTDLP_DIR##*/}"
+fi
+
 # Define the full, non-argument part of the command by replicating the exec line.
-YTDLP_COMMAND="$VENV_PYTHON -Werror -Xdev $WORK_DIR/vendor/yt-dlp/yt_dlp/__main__.py"
+YTDLP_COMMAND="$VENV_PYTHON -Werror -Xdev $YTDLP_DIR/yt_dlp/__main__.py"
 
 # MODERN: Robust array for new and updated scripts.
 # Use with "${YTDLP_COMMAND_ARRAY[@]}"
@@ -34,11 +45,30 @@ YTDLP_COMMAND_ARRAY=(
     "$VENV_PYTHON"
     "-Werror"
     "-Xdev"
-    "$WORK_DIR/vendor/yt-dlp/yt_dlp/__main__.py"
+    "$YTDLP_DIR/yt_dlp/__main__.py"
 )
 
 # Use with "${YTDLP_COMMAND_ARRAY_NONERROR[@]}"
 YTDLP_COMMAND_ARRAY_NONERROR=(
     "$VENV_PYTHON"
-    "$WORK_DIR/vendor/yt-dlp/yt_dlp/__main__.py"
+    "$YTDLP_DIR/yt_dlp/__main__.py"
 )
+
+# Optional warm yt-dlp worker (libexec/ytdlp-worker.py start|stop|status).
+# While its socket exists, jobs are handed to the already-imported yt-dlp and
+# start in milliseconds. The client execs the one-shot command above if the
+# worker does not answer, so a stale socket is harmless. It also does so if the
+# worker has moved on to a newer revision than $YTDLP_DIR, so a script keeps
+# its revision with the worker too.
+YTDLP_WORKER_SOCKET="$WORK_DIR/tmp/ytdlp-worker.sock"
+if [ -S "$YTDLP_WORKER_SOCKET" ]; then
+    YTDLP_COMMAND="$VENV_PYTHON $WORK_DIR/libexec/ytdlp-worker.py --ytdlp-dir $YTDLP_DIR run --"
+    YTDLP_COMMAND_ARRAY=(
+        "$VENV_PYTHON"
+        "$WORK_DIR/libexec/ytdlp-worker.py"
+        "--ytdlp-dir"
+        "$YTDLP_DIR"
+        "run"
+        "--"
+    )
+fi
@@ -0,0 +1,97 @@
+#!/bin/bash
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# This script provides the shared library index (config/library.sqlite) hooks
+# for the worker scripts. It should be sourced by other scripts, not executed
+# directly. See libexec/library.py for the index itself.
+#
+# Usage:
+#   source "$WORK_DIR/lib/library.sh"
+#   library_has album "$url" && { echo "Already in library"; exit 0; }
+#   library_setup album                      # sets LIBRARY_ARGS
+#   "${YTDLP_COMMAND_ARRAY[@]}" ... "${LIBRARY_ARGS[@]}" "$url"
+#   library_commit                           # records what was downloaded
+
+# Ensure WORK_DIR is set. The sourcing script must have sourced environment.sh first.
+if [ -z "$WORK_DIR" ]; then
+    echo "FATAL: WORK_DIR not set. Sourcing environment.sh is a prerequisite." >&2
+    exit 1
+fi
+
+LIBRARY_CMD=("$VENV_PYTHON" "$WORK_DIR/libexec/library.py")
+
+# --- Function: library_has ---
+# Succeeds (and prints the recorded path) if the video, or the whole playlist,
+# is already in the library for the given mode.
+library_has() {
+    "${LIBRARY_CMD[@]}" has --mode "$1" "$2"
+}
+
+# --- Function: library_confirm_refetch ---
+# For the metadata modes (comments, llm-package), where fetching the same video
+# again can be intended. Succeeds if the item is new or the user asks to fetch
+# it again.
+library_confirm_refetch() {
+    local existing answer
+    existing=$(library_has "$1" "$2") || return 0
+    echo "Already in library ($1): $existing"
+    printf "Fetch again anyway? [y/N]: "
+    read -r answer
+    [[ "$answer" =~ ^[Yy]$ ]]
+}
+
+# --- Function: library_record ---
+# Records a single item: library_record MODE URL PATH
+library_record() {
+    [ -n "$3" ] && "${LIBRARY_CMD[@]}" record --mode "$1" --id "$2" --path "$3"
+}
+
+# --- Function: library_setup ---
+# Prepares the yt-dlp arguments for a mode: a download archive exported from the
+# library, so known tracks are skipped without being downloaded, and a record
+# file for library_commit. Besides the finished tracks it gets one line per
+# playlist, from which the tracks skipped through the archive are counted, so a
+# playlist with already known tracks can still be marked complete.
+library_setup() {
+    LIBRARY_MODE="$1"
+    mkdir -p "$WORK_DIR/tmp"
+    LIBRARY_RECORD_FILE=$(mktemp "$WORK_DIR/tmp/library-record.XXXXXX")
+    LIBRARY_ARCHIVE_FILE=$(mktemp "$WORK_DIR/tmp/library-archive.XXXXXX")
+    "${LIBRARY_CMD[@]}" export-archive --mode "$LIBRARY_MODE" "$LIBRARY_ARCHIVE_FILE"
+    LIBRARY_ARGS=(
+        --download-archive "$LIBRARY_ARCHIVE_FILE"
+        --print-to-file "after_move:$("${LIBRARY_CMD[@]}" template)" "$LIBRARY_RECORD_FILE"
+        --print-to-file "playlist:$("${LIBRARY_CMD[@]}" template --playlist)" "$LIBRARY_RECORD_FILE"
+    )
+}
+
+# --- Function: library_commit ---
+# Records the items yt-dlp reported as finished. In audio pipeline mode the
+# reported paths are in the staging area and are mapped to the encoded mp3s;
+# tracks that failed to encode are not recorded.
+library_commit() {
+    [ -z "$LIBRARY_RECORD_FILE" ] && return 0
+    local record_args=(record --mode "$LIBRARY_MODE" --from-file "$LIBRARY_RECORD_FILE")
+    if [ -n "$AUDIO_PIPELINE_STAGING" ]; then
+        record_args+=(--rebase "$AUDIO_PIPELINE_STAGING" "$AUDIO_PIPELINE_DEST" --ext mp3)
+    fi
+    "${LIBRARY_CMD[@]}" "${record_args[@]}"
+    rm -f "$LIBRARY_RECORD_FILE" "$LIBRARY_ARCHIVE_FILE"
+    LIBRARY_RECORD_FILE=""
+}
@@ -0,0 +1,71 @@
+#!/bin/bash
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# This script provides the stage wrapper for the opt-in run report (see
+# libexec/runreport.py). It should be sourced by other scripts, not executed directly.
+#
+# The report is enabled by YT_MENU_REPORT=/path/report.jsonl in the environment,
+# or RUN_REPORT_FILE in config/yt-menu.cfg. Without either, report_stage just runs
+# the command.
+#
+# Usage:
+#   source "$WORK_DIR/lib/run-report.sh"
+#   report_stage llm-package.yt-dlp --output "$tmp_dir" -- "${YTDLP_COMMAND_ARRAY[@]}" ...
+#   path=$(report_stage llm-package.build -- "$VENV_PYTHON" ...)   # stdio is passed through
+
+# Ensure WORK_DIR is set. The sourcing script must have sourced environment.sh first.
+if [ -z "$WORK_DIR" ]; then
+    echo "FATAL: WORK_DIR not set. Sourcing environment.sh is a prerequisite." >&2
+    exit 1
+fi
+source "$WORK_DIR/lib/directories-config.sh"
+
+if [ -z "$YT_MENU_REPORT" ]; then
+    YT_MENU_REPORT=$(get_config_default "RUN_REPORT_FILE" "")
+    if [ -n "$YT_MENU_REPORT" ] && [[ "$YT_MENU_REPORT" != /* ]]; then
+        YT_MENU_REPORT="$WORK_DIR/$YT_MENU_REPORT"
+    fi
+fi
+if [ -n "$YT_MENU_REPORT" ]; then
+    # The Python helpers started below write to the same report, under the same run id.
+    export YT_MENU_REPORT
+    export YT_MENU_RUN_ID="${YT_MENU_RUN_ID:-$(date +%Y%m%d-%H%M%S)-$$}"
+fi
+
+# --- Function: report_stage ---
+# report_stage NAME [--output PATH]... [--field KEY=VALUE]... -- COMMAND [ARGS...]
+# Runs COMMAND (an external program, not a shell function) and, if the report
+# is enabled, records its wall time, CPU time, peak RSS and bytes read and
+# written as stage NAME. Returns the command's exit status.
+report_stage() {
+    local name="$1"
+    shift
+    local options=()
+    while [ $# -gt 0 ] && [ "$1" != "--" ]; do
+        options+=("$1")
+        shift
+    done
+    shift
+
+    if [ -z "$YT_MENU_REPORT" ]; then
+        "$@"
+        return
+    fi
+    "$VENV_PYTHON" "$WORK_DIR/libexec/runreport.py" exec --stage "$name" "${options[@]}" -- "$@"
+}
@@ -0,0 +1,243 @@
+#!/bin/bash
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# This script provides the yt-dlp self-update. It should be sourced by other
+# scripts, not executed directly.
+#
+# vendor/yt-dlp is only fetched, never changed in place. Each new upstream
+# revision is checked out as its own worktree in vendor/yt-dlp-releases/<rev>,
+# and the vendor/yt-dlp-current link is then swapped to it with one rename.
+# environment.sh resolves that link once, so a running script keeps the
+# complete revision it started with.
+#
+# Usage:
+#   source "$WORK_DIR/lib/ytdlp-update.sh"
+#   ytdlp_update_background    # at startup: returns at once, checks at most every YTDLP_UPDATE_TTL_HOURS
+#   ytdlp_update               # check and apply now, in the foreground
+#   ytdlp_update_status        # print the recorded update state
+
+# Ensure WORK_DIR is set. The sourcing script must have sourced environment.sh first.
+if [ -z "$WORK_DIR" ]; then
+    echo "FATAL: WORK_DIR not set. Sourcing environment.sh is a prerequisite." >&2
+    exit 1
+fi
+source "$WORK_DIR/lib/directories-config.sh"
+
+YTDLP_REPO="$WORK_DIR/vendor/yt-dlp"
+YTDLP_RELEASES_DIR="$WORK_DIR/vendor/yt-dlp-releases"
+YTDLP_CURRENT_LINK="$WORK_DIR/vendor/yt-dlp-current"
+YTDLP_UPDATE_STATE="$WORK_DIR/config/ytdlp-update.state"
+YTDLP_UPDATE_LOCK="$WORK_DIR/tmp/ytdlp-update.lock"
+YTDLP_UPDATE_LOG="$WORK_DIR/tmp/ytdlp-update.log"
+# Releases kept on disk: the current one and the ones long-running jobs may still use.
+YTDLP_KEEP_RELEASES=3
+# Abort a fetch that stays below 1 KB/s for this many seconds (offline, captive portal).
+YTDLP_FETCH_STALL_SECONDS=30
+
+# --- Function: ytdlp_state_get ---
+# ytdlp_state_get KEY - prints the value recorded in the state file, or nothing.
+ytdlp_state_get() {
+    [ -f "$YTDLP_UPDATE_STATE" ] || return 0
+    sed -n "s/^$1=//p" "$YTDLP_UPDATE_STATE" | tail -n 1
+}
+
+# --- Function: ytdlp_state_write ---
+# ytdlp_state_write STATUS MESSAGE [REVISION]
+# Records the outcome of a check. last_success is only advanced when STATUS is
+# not "failed", so a failed check is retried at the next start.
+ytdlp_state_write() {
+    local status="$1" message="$2" revision="${3:-$(ytdlp_state_get revision)}"
+    local now last_success previous
+    now=$(date +%s)
+    last_success=$(ytdlp_state_get last_success)
+    previous=$(ytdlp_state_get previous_revision)
+    [ "$status" != "failed" ] && last_success="$now"
+    if [ "$revision" != "$(ytdlp_state_get revision)" ]; then
+        previous=$(ytdlp_state_get revision)
+    fi
+    mkdir -p "$(dirname "$YTDLP_UPDATE_STATE")"
+    printf '%s\n' \
+        "status=$status" \
+        "message=$message" \
+        "revision=$revision" \
+        "previous_revision=$previous" \
+        "last_check=$now" \
+        "last_success=$last_success" > "$YTDLP_UPDATE_STATE.tmp"
+    mv -f "$YTDLP_UPDATE_STATE.tmp" "$YTDLP_UPDATE_STATE"
+}
+
+# --- Function: ytdlp_update_due ---
+# Succeeds if the last successful check is older than YTDLP_UPDATE_TTL_HOURS.
+ytdlp_update_due() {
+    local ttl_hours last_success
+    ttl_hours=$(get_config_default "YTDLP_UPDATE_TTL_HOURS" "24")
+    [ "$ttl_hours" = "off" ] && return 1
+    last_success=$(ytdlp_state_get last_success)
+    [ -z "$last_success" ] && return 0
+    # Fractional hours are allowed; bash arithmetic is integer-only.
+    awk -v now="$(date +%s)" -v last="$last_success" -v ttl="$ttl_hours" \
+        'BEGIN { exit !(now - last >= ttl * 3600) }'
+}
+
+# --- Function: ytdlp_lock / ytdlp_unlock ---
+# mkdir is atomic, so at most one update runs. A lock whose owner is gone is taken over.
+ytdlp_lock() {
+    mkdir -p "$(dirname "$YTDLP_UPDATE_LOCK")"
+    if ! mkdir "$YTDLP_UPDATE_LOCK" 2>/dev/null; then
+        local owner
+        owner=$(cat "$YTDLP_UPDATE_LOCK/pid" 2>/dev/null)
+        if [ -n "$owner" ] && kill -0 "$owner" 2>/dev/null; then
+            return 1
+        fi
+        rm -rf "$YTDLP_UPDATE_LOCK"
+        mkdir "$YTDLP_UPDATE_LOCK" 2>/dev/null || return 1
+    fi
+    echo "$BASHPID" > "$YTDLP_UPDATE_LOCK/pid"
+}
+
+ytdlp_unlock() {
+    rm -rf "$YTDLP_UPDATE_LOCK"
+}
+
+# --- Function: ytdlp_swap_current ---
+# ytdlp_swap_current REVISION - points vendor/yt-dlp-current at the release with
+# a single rename(2), so readers see either the old or the new link, never none.
+ytdlp_swap_current() {
+    local new_link="$YTDLP_CURRENT_LINK.new.$$"
+    rm -f "$new_link"
+    ln -s "yt-dlp-releases/$1" "$new_link" || return 1
+    # mv onto a link to a directory would move into that directory; rename directly.
+    "$VENV_PYTHON" -c 'import os, sys; os.replace(sys.argv[1], sys.argv[2])' "$new_link" "$YTDLP_CURRENT_LINK" \
+        || { rm -f "$new_link"; return 1; }
+}
+
+# --- Function: ytdlp_prune_releases ---
+# Removes all but the YTDLP_KEEP_RELEASES newest release worktrees.
+ytdlp_prune_releases() {
+    local current release
+    current=$(basename "$(readlink "$YTDLP_CURRENT_LINK")")
+    ls -1t "$YTDLP_RELEASES_DIR" 2>/dev/null | tail -n +$((YTDLP_KEEP_RELEASES + 1)) | while read -r release; do
+        [ "$release" = "$current" ] && continue
+        git -C "$YTDLP_REPO" worktree remove --force "$YTDLP_RELEASES_DIR/$release" 2>/dev/null \
+            || rm -rf "${YTDLP_RELEASES_DIR:?}/$release"
+    done
+    git -C "$YTDLP_REPO" worktree prune
+}
+
+# --- Function: ytdlp_update ---
+# Fetches upstream and, if it moved, installs the new revision as a release and
+# makes it current. Records the outcome in config/ytdlp-update.state.
+ytdlp_update() {
+    if [ ! -d "$YTDLP_REPO/.git" ]; then
+        echo "[yt-menu] yt-dlp checkout not found at $YTDLP_REPO. Run install.sh." >&2
+        return 1
+    fi
+    if ! ytdlp_lock; then
+        echo "[yt-menu] Another yt-dlp update is running."
+        return 0
+    fi
+
+    echo "[yt-menu] $(date '+%Y-%m-%d %H:%M:%S') Checking for yt-dlp updates..."
+    if ! GIT_TERMINAL_PROMPT=0 GIT_HTTP_LOW_SPEED_LIMIT=1000 GIT_HTTP_LOW_SPEED_TIME="$YTDLP_FETCH_STALL_SECONDS" \
+            git -C "$YTDLP_REPO" fetch --quiet; then
+        ytdlp_state_write failed "git fetch failed"
+        ytdlp_unlock
+        echo "[yt-menu] Error: Could not fetch yt-dlp updates." >&2
+        return 1
+    fi
+
+    local upstream target current
+    upstream=$(git -C "$YTDLP_REPO" rev-parse --verify --quiet '@{upstream}' \
+        || git -C "$YTDLP_REPO" rev-parse --verify --quiet origin/HEAD)
+    target=$(git -C "$YTDLP_REPO" rev-parse --short=12 "$upstream" 2>/dev/null)
+    if [ -z "$target" ]; then
+        ytdlp_state_write failed "no upstream branch to follow"
+        ytdlp_unlock
+        echo "[yt-menu] Error: The yt-dlp checkout has no upstream branch." >&2
+        return 1
+    fi
+
+    current=$(basename "$(readlink "$YTDLP_CURRENT_LINK" 2>/dev/null)")
+    if [ "$current" = "$target" ] && [ -d "$YTDLP_RELEASES_DIR/$target" ]; then
+        ytdlp_state_write up-to-date "yt-dlp $target is current" "$target"
+        ytdlp_unlock
+        echo "[yt-menu] yt-dlp is up to date ($target)."
+        return 0
+    fi
+
+    # Check out into a temporary name first; the release only appears complete.
+    mkdir -p "$YTDLP_RELEASES_DIR"
+    local staging="$YTDLP_RELEASES_DIR/.$target.tmp"
+    if [ ! -d "$YTDLP_RELEASES_DIR/$target" ]; then
+        git -C "$YTDLP_REPO" worktree remove --force "$staging" 2>/dev/null
+        rm -rf "$staging"
+        git -C "$YTDLP_REPO" worktree add --quiet --detach "$staging" "$upstream"
+        local status=$? binary
+        # install.sh puts ffmpeg and ffprobe into the clone, where yt-dlp looks for them.
+        for binary in ffmpeg ffprobe; do
+            if [ $status -eq 0 ] && [ -x "$YTDLP_REPO/$binary" ]; then
+                ln -s "../../yt-dlp/$binary" "$staging/$binary"
+            fi
+        done
+        if [ $status -ne 0 ] || ! git -C "$YTDLP_REPO" worktree move "$staging" "$YTDLP_RELEASES_DIR/$target"; then
+            git -C "$YTDLP_REPO" worktree remove --force "$staging" 2>/dev/null
+            ytdlp_state_write failed "could not check out $target"
+            ytdlp_unlock
+            echo "[yt-menu] Error: Could not check out yt-dlp $target." >&2
+            return 1
+        fi
+    fi
+    touch "$YTDLP_RELEASES_DIR/$target"
+
+    if ! ytdlp_swap_current "$target"; then
+        ytdlp_state_write failed "could not switch to $target"
+        ytdlp_unlock
+        echo "[yt-menu] Error: Could not switch to yt-dlp $target." >&2
+        return 1
+    fi
+    ytdlp_state_write updated "updated from ${current:-the initial checkout} to $target" "$target"
+    ytdlp_prune_releases
+    ytdlp_unlock
+    echo "[yt-menu] yt-dlp updated to $target. New jobs use it; running jobs keep their revision."
+}
+
+# --- Function: ytdlp_update_background ---
+# Starts ytdlp_update detached from the terminal if a check is due, and returns
+# immediately. Output goes to tmp/ytdlp-update.log.
+ytdlp_update_background() {
+    ytdlp_update_due || return 0
+    mkdir -p "$(dirname "$YTDLP_UPDATE_LOG")"
+    ( ytdlp_update ) < /dev/null >> "$YTDLP_UPDATE_LOG" 2>&1 &
+    disown 2>/dev/null
+}
+
+# --- Function: ytdlp_update_status ---
+ytdlp_update_status() {
+    local revision last_check
+    revision=$(ytdlp_state_get revision)
+    last_check=$(ytdlp_state_get last_check)
+    if [ -z "$last_check" ]; then
+        echo "yt-dlp: not checked yet (using $YTDLP_DIR)"
+        return 0
+    fi
+    echo "yt-dlp: ${revision:-initial checkout} in use: $YTDLP_DIR"
+    echo "Last check: $(date -d "@$last_check" '+%Y-%m-%d %H:%M' 2>/dev/null || date -r "$last_check" '+%Y-%m-%d %H:%M') ($(ytdlp_state_get status): $(ytdlp_state_get message))"
+    [ -n "$(ytdlp_state_get previous_revision)" ] && echo "Previous revision: $(ytdlp_state_get previous_revision)"
+    return 0
+}
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Full-text search over the comment archive: the llm-packages, threaded and raw
+# comment files, subtitles and descriptions the metadata modes leave in their
+# base directories. 'update' indexes them into config/archive-index.sqlite
+# (SQLite FTS5): titles, descriptions, transcript chunks with their start time
+# and comments with author, likes and the comment they reply to. It is
+# incremental: a file is only read again if its size or mtime changed, and only
+# re-indexed if its content hash changed too. 'query' prints the video id, the
+# timestamp or comment author and a snippet of each match, best match first.
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import cache
+import subtitles
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(WORK_DIR, 'config', 'archive-index.sqlite')
+# The base directories chosen in the comments/llm-package and subs/minimized-comments modes.
+BASEDIR_CONFIG_FILES = ('yt-comments.cfg', 'subs.cfg')
+KINDS = ('title', 'description', 'transcript', 'comment')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    video_id TEXT,
+    title TEXT,
+    entries INTEGER NOT NULL,
+    indexed_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    video_id TEXT,
+    kind TEXT NOT NULL,
+    start_ms INTEGER,
+    author TEXT,
+    likes INTEGER,
+    uploader INTEGER,
+    parent INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (
+    author, text, content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, author, text) VALUES ('delete', old.id, old.author, old.text);
+END;
+"""
+
+# Suffix -> reader, longest suffixes first so '.info.comments_threaded.json' is not read as '.json'.
+SUFFIX_KINDS = (
+    ('.llm-package.json', 'package'),
+    ('.comments_threaded.json', 'threaded'),
+    ('.transcription_structured.json', 'chunks'),
+    ('.info.json', 'info'),
+    ('.description', 'description'),
+    *((f'.{ext}', 'subtitle') for ext in subtitles.SUPPORTED_FORMATS),
+)
+# yt-dlp's output template ends in "[<id>].<upload_date>.<ext>"; the id is the last bracket.
+FILENAME_ID_PATTERN = re.compile(r'\[([A-Za-z0-9_-]+)\]')
+INFO_KEYS = ('id', 'title', 'channel', 'uploader', 'description')
+INSERT_BATCH_ROWS = 5000
+
+# --- Helper Functions ---
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"Error: This Python's SQLite has no FTS5 support ({e}).", file=sys.stderr)
+        sys.exit(1)
+    return conn
+
+def default_directories() -> list[str]:
+    """The comment base directories configured by the metadata modes, if any."""
+    directories = []
+    for name in BASEDIR_CONFIG_FILES:
+        try:
+            with open(os.path.join(WORK_DIR, 'config', name), 'r', encoding='utf-8') as f:
+                directory = f.readline().strip()
+        except OSError:
+            continue
+        if directory and os.path.isdir(directory) and os.path.abspath(directory) not in directories:
+            directories.append(os.path.abspath(directory))
+    return directories
+
+def file_kind(filename: str) -> str | None:
+    lower = filename.lower()
+    for suffix, kind in SUFFIX_KINDS:
+        if lower.endswith(suffix):
+            return kind
+    return None
+
+def iter_archive_files(paths: list[str]):
+    """Yields (absolute path, kind) of the indexable files among paths and below the directories in it."""
+    for path in paths:
+        if os.path.isfile(path):
+            if kind := file_kind(path):
+                yield os.path.abspath(path), kind
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in names:
+                if kind := file_kind(name):
+                    yield os.path.abspath(os.path.join(root, name)), kind
+
+def video_id_from_filename(path: str) -> str | None:
+    matches = FILENAME_ID_PATTERN.findall(os.path.basename(path))
+    return matches[-1] if matches else None
+
+def title_from_filename(path: str) -> str:
+    """'<channel> - <title> [<id>].<date>.<ext>' -> '<channel> - <title>'."""
+    name = os.path.basename(path)
+    return name[:name.rfind(' [')] if ' [' in name else name
+
+# --- Readers ---
+# Each reader yields entry dicts (kind, text and optionally start_ms, author,
+# likes, uploader, ref, parent_ref) and may fill in the file's metadata.
+# ref/parent_ref link replies to their parent within one file.
+
+def metadata_entries(meta: dict, title, channel, description):
+    if title:
+        meta['title'] = f"{channel} - {title}" if channel else title
+        yield {'kind': 'title', 'text': title, 'author': channel}
+    if description:
+        yield {'kind': 'description', 'text': description}
+
+def chunk_entries(chunks):
+    """[start, end, text] transcript chunks, with times in milliseconds or HH:MM:SS.mmm."""
+    for start, _end, text in chunks:
+        if text:
+            yield {'kind': 'transcript', 'text': text,
+                   'start_ms': start if isinstance(start, int) else subtitles.parse_time_ms(start)}
+
+def threaded_entries(comments):
+    """Nested comment objects (see json_restructurer.CommentRecord.to_dict)."""
+    stack = [(comment, None) for comment in reversed(comments)]
+    while stack:
+        comment, parent = stack.pop()
+        ref = object()
+        yield {'kind': 'comment', 'text': comment.get('text') or '', 'author': comment.get('author'),
+               'likes': comment.get('like_count', 0), 'uploader': bool(comment.get('author_is_uploader')),
+               'ref': ref, 'parent_ref': parent}
+        stack.extend((reply, ref) for reply in reversed(comment.get('replies', [])))
+
+def compact_entries(compact):
+    """Columnar comments (see json_restructurer.compact_comments); parents precede their replies."""
+    uploader = set(compact.get('uploader', []))
+    for i, (parent, author, likes, text) in enumerate(zip(compact['parent'], compact['author'], compact['likes'], compact['text'])):
+        yield {'kind': 'comment', 'text': text or '', 'author': compact['authors'][author], 'likes': likes,
+               'uploader': author in uploader, 'ref': i, 'parent_ref': parent if parent >= 0 else None}
+
+def comment_entries(comments):
+    if isinstance(comments, dict):
+        return compact_entries(comments)
+    return threaded_entries(comments or [])
+
+def read_package(path, meta):
+    with open(path, 'r', encoding='utf-8') as f:
+        package = json.load(f)
+    metadata = package.get('metadata', {})
+    meta['video_id'] = metadata.get('video_id')
+    yield from metadata_entries(meta, metadata.get('title'), metadata.get('channel'), package.get('description'))
+    transcription = package.get('transcription')
+    if isinstance(transcription, dict): # Nested packages wrap the chunks with their format description
+        transcription = transcription.get('data')
+    yield from chunk_entries(transcription or [])
+    yield from comment_entries(package.get('comments'))
+
+def read_threaded(path, meta):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from comment_entries(json.load(f))
+
+def read_chunks(path, meta):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from chunk_entries(json.load(f))
+
+def read_info(path, meta):
+    """Streams a .info.json; raw yt-dlp comments reference their parent by comment id."""
+    info = {}
+    for key, value in json_restructurer.stream_info_json(path, INFO_KEYS):
+        if key != 'comment':
+            info[key] = value
+            continue
+        parent = value.get('parent', 'root')
+        yield {'kind': 'comment', 'text': value.get('text') or '', 'author': value.get('author'),
+               'likes': value.get('like_count') or 0, 'uploader': bool(value.get('author_is_uploader')),
+               'ref': value.get('id'), 'parent_ref': None if parent == 'root' else parent}
+    # The top-level keys may come after the comments, so the metadata goes last.
+    meta['video_id'] = info.get('id')
+    yield from metadata_entries(meta, info.get('title'), info.get('channel') or info.get('uploader'), info.get('description'))
+
+def read_description(path, meta):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.strip():
+        yield {'kind': 'description', 'text': text}
+
+def read_subtitle(path, meta):
+    yield from chunk_entries(subtitles.structure_subtitle_file(path))
+
+READERS = {
+    'package': read_package,
+    'threaded': read_threaded,
+    'chunks': read_chunks,
+    'info': read_info,
+    'description': read_description,
+    'subtitle': read_subtitle,
+}
+
+# --- Indexing ---
+
+def insert_entries(conn, rows):
+    conn.executemany(
+        "INSERT INTO entries (id, file_id, video_id, kind, start_ms, author, likes, uploader, parent, text) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    rows.clear()
+
+def index_file(conn, path, kind, size, mtime_ns, sha256) -> int:
+    """Replaces the entries of one file. Returns the number of entries written."""
+    meta = {}
+    conn.execute("DELETE FROM entries WHERE file_id = (SELECT id FROM files WHERE path = ?)", (path,))
+    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+    file_id = conn.execute(
+        "INSERT INTO files (path, size, mtime_ns, sha256, entries, indexed_at) VALUES (?, ?, ?, ?, 0, ?)",
+        (path, size, mtime_ns, sha256, int(time.time()))).lastrowid
+    fallback_id = video_id_from_filename(path)
+
+    # Ids are assigned here so replies can point to their parent without a
+    # round-trip per row; the full-text index is filled once per file.
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM entries").fetchone()[0]
+    first_id = next_id
+    entry_ids = {}
+    rows = []
+    for entry in READERS[kind](path, meta):
+        parent_ref = entry.get('parent_ref')
+        rows.append((next_id, file_id, fallback_id, entry['kind'], entry.get('start_ms'), entry.get('author'),
+                     entry.get('likes'), entry.get('uploader'),
+                     entry_ids.get(parent_ref) if parent_ref is not None else None, entry['text']))
+        if entry.get('ref') is not None:
+            entry_ids[entry['ref']] = next_id
+        next_id += 1
+        if len(rows) >= INSERT_BATCH_ROWS:
+            insert_entries(conn, rows)
+    insert_entries(conn, rows)
+    conn.execute("INSERT INTO entries_fts (rowid, author, text) SELECT id, author, text FROM entries WHERE id >= ?",
+                 (first_id,))
+    count = next_id - first_id
+
+    # The id from the file's own metadata wins over the one in its name.
+    video_id = meta.get('video_id') or fallback_id
+    if video_id != fallback_id:
+        conn.execute("UPDATE entries SET video_id = ? WHERE file_id = ?", (video_id, file_id))
+    conn.execute("UPDATE files SET video_id = ?, title = ?, entries = ? WHERE id = ?",
+                 (video_id, meta.get('title') or title_from_filename(path), count, file_id))
+    return count
+
+def remove_file(conn, path):
+    conn.execute("DELETE FROM entries WHERE file_id = (SELECT id FROM files WHERE path = ?)", (path,))
+    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+def update_index(conn, paths: list[str]) -> dict:
+    """
+    Brings the index up to date with the files under paths. Unchanged files
+    (same size and mtime) are not opened; touched files with the same content
+    hash only get their new mtime recorded. Indexed files under paths that no
+    longer exist are removed. Every file is committed on its own, so an
+    interrupted update keeps what it has done.
+    """
+    stats = {'indexed': 0, 'entries': 0, 'unchanged': 0, 'touched': 0, 'removed': 0, 'failed': 0}
+    known = {path: (size, mtime_ns, sha256) for path, size, mtime_ns, sha256
+             in conn.execute("SELECT path, size, mtime_ns, sha256 FROM files")}
+    seen = set()
+
+    for path, kind in iter_archive_files(paths):
+        seen.add(path)
+        try:
+            st = os.stat(path)
+            previous = known.get(path)
+            if previous and previous[:2] == (st.st_size, st.st_mtime_ns):
+                stats['unchanged'] += 1
+                continue
+            sha256 = cache.file_sha256(path)
+            if previous and previous[2] == sha256:
+                conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (st.st_size, st.st_mtime_ns, path))
+                conn.commit()
+                stats['touched'] += 1
+                continue
+            stats['entries'] += index_file(conn, path, kind, st.st_size, st.st_mtime_ns, sha256)
+            conn.commit()
+            stats['indexed'] += 1
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            # A file being written or a malformed one is skipped and tried again next time.
+            conn.rollback()
+            print(f"Archive index: skipped {path}: {e}", file=sys.stderr)
+            stats['failed'] += 1
+
+    roots = [os.path.abspath(path) for path in paths]
+    for path in known.keys() - seen:
+        under_roots = any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+        if under_roots and not os.path.exists(path):
+            remove_file(conn, path)
+            stats['removed'] += 1
+    conn.commit()
+    return stats
+
+# --- Querying ---
+
+def match_expression(terms: str, raw: bool) -> str:
+    """Plain words are matched as given (all of them, any order); raw passes FTS5 query syntax through."""
+    if raw:
+        return terms
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms.split())
+
+def search(conn, terms, raw=False, kind=None, video_id=None, limit=20) -> list[tuple]:
+    """
+    Best matches first. The same video's comments, transcript and metadata are
+    usually indexed from several files (.info.json, .comments_threaded.json,
+    .llm-package.json, subtitles), so equal entries of one video are reported once.
+    """
+    where = "entries_fts MATCH ?"
+    params = [match_expression(terms, raw)]
+    if kind:
+        where += " AND e.kind = ?"
+        params.append(kind)
+    if video_id:
+        where += " AND e.video_id = ?"
+        params.append(video_id)
+    cursor = conn.execute(
+        f"SELECT e.video_id, e.kind, e.start_ms, e.author, e.likes, e.uploader, p.author, "
+        f"snippet(entries_fts, 1, '[', ']', '...', 16), f.title, e.text "
+        f"FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid JOIN files f ON f.id = e.file_id "
+        f"LEFT JOIN entries p ON p.id = e.parent "
+        f"WHERE {where} ORDER BY bm25(entries_fts)", params)
+    matches = []
+    seen = set()
+    for row in cursor:
+        video, entry_kind, start_ms, author, *_, title, text = row
+        key = (video or title, entry_kind, start_ms, author, text)
+        if key in seen:
+            continue
+        seen.add(key)
+        matches.append(row[:-1])
+        if len(matches) >= limit:
+            break
+    return matches
+
+def format_timestamp(milliseconds: int) -> str:
+    return subtitles.format_time_ms(milliseconds).split('.')[0]
+
+def print_matches(rows):
+    for video_id, kind, start_ms, author, likes, uploader, parent_author, snippet, title in rows:
+        if kind == 'transcript':
+            where = f"{format_timestamp(start_ms)}\thttps://www.youtube.com/watch?v={video_id}&t={start_ms // 1000}s"
+        elif kind == 'comment':
+            where = f"{author or '?'}{' (uploader)' if uploader else ''}, {likes or 0} likes"
+            if parent_author is not None:
+                where += f", reply to {parent_author}"
+        else:
+            where = kind
+        snippet = ' '.join(snippet.split())
+        print(f"{video_id or '-'}\t{where}\t{snippet}\t({title or '-'})")
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over the downloaded comments, transcripts and llm-packages.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Index database (default: {DEFAULT_DB}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("update", help="Index new and changed files, and drop deleted ones.")
+    p.add_argument("paths", nargs="*", help="Directories or files (default: the configured comment base directories).")
+
+    p = subparsers.add_parser("query", help="Search the index, best match first.")
+    p.add_argument("terms", help="Words that must all occur (in any order).")
+    p.add_argument("--fts", action="store_true", help="Treat TERMS as an FTS5 query (\"exact phrase\", OR, NOT, prefix*, NEAR(...)).")
+    p.add_argument("--kind", choices=KINDS, help="Only this kind of entry.")
+    p.add_argument("--video", help="Only this video id.")
+    p.add_argument("--limit", type=int, default=20)
+
+    subparsers.add_parser("stats", help="Show the number of indexed files, videos and entries.")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+
+    if args.command == "update":
+        paths = args.paths or default_directories()
+        if not paths:
+            print("Error: No comment base directory is configured yet; give the directories to index.", file=sys.stderr)
+            sys.exit(1)
+        started = time.perf_counter()
+        stats = update_index(conn, paths)
+        print(f"Archive index: {stats['indexed']} file(s) indexed ({stats['entries']} entries), "
+              f"{stats['unchanged'] + stats['touched']} unchanged, {stats['removed']} removed, "
+              f"{stats['failed']} skipped in {time.perf_counter() - started:.1f}s.", file=sys.stderr)
+
+    elif args.command == "query":
+        try:
+            rows = search(conn, args.terms, args.fts, args.kind, args.video, args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"Error: Invalid search query: {e}", file=sys.stderr)
+            sys.exit(2)
+        if not rows:
+            sys.exit(1)
+        print_matches(rows)
+
+    elif args.command == "stats":
+        files, videos = conn.execute("SELECT COUNT(*), COUNT(DISTINCT video_id) FROM files").fetchone()
+        print(f"{files} files, {videos} videos in {args.db}")
+        for kind, count in conn.execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind ORDER BY kind"):
+            print(f"  {kind}: {count}")
+
+if __name__ == "__main__":
+    main()
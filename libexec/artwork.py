@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Album artwork stage for the album downloaders. The tracks of an album share
+# one cover, so instead of letting yt-dlp download, convert and embed every
+# track's own thumbnail, the playlist's own thumbnail is resolved (yt-dlp
+# --flat-playlist), fetched and converted to JPEG once per playlist before the
+# download, and kept in cache/artwork (a MetadataCache keyed by playlist id,
+# objects stored by content hash, least recently used evicted beyond the size
+# limit). Each track then gets that image attached with a stream-copy remux;
+# a track whose playlist has no cached cover gets its own thumbnail instead.
+# Used by yt-dlp's --exec in inline mode and by audio-encoder.py in pipeline mode.
+
+import argparse
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import urllib.request
+
+import cache
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ARTWORK_DIR = os.path.join(cache.DEFAULT_CACHE_DIR, 'artwork')
+COVER_FILENAME = 'cover.jpg'
+FETCH_TIMEOUT_SECONDS = 30
+# Attached picture stream settings, as yt-dlp's --embed-thumbnail writes them for mp3.
+COVER_STREAM_ARGS = ['-disposition:v:0', 'attached_pic',
+                     '-metadata:s:v', 'title=Album cover', '-metadata:s:v', 'comment=Cover (front)']
+
+# yt-dlp --print template for the playlist itself, not its entries.
+PLAYLIST_THUMBNAIL_TEMPLATE = "playlist:%(id)s\t%(thumbnail,thumbnails.-1.url|)s"
+
+# --- Helper Functions ---
+
+def default_ffmpeg() -> str:
+    vendored = os.path.join(WORK_DIR, 'vendor', 'yt-dlp', 'ffmpeg')
+    return vendored if os.access(vendored, os.X_OK) else 'ffmpeg'
+
+def open_cache(cache_dir: str = DEFAULT_ARTWORK_DIR, ttl_hours: float = 720, max_mb: float = 256) -> cache.MetadataCache:
+    return cache.MetadataCache(cache_dir, ttl_hours, max_mb)
+
+def fetch_cover(url: str, ffmpeg: str, work_dir: str) -> str:
+    """Downloads a thumbnail (JPEG, WebP or PNG) and converts it to a JPEG in work_dir. Returns its path."""
+    source_path = os.path.join(work_dir, 'source')
+    request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT_SECONDS) as response, open(source_path, 'wb') as f:
+        shutil.copyfileobj(response, f)
+    cover_path = os.path.join(work_dir, COVER_FILENAME)
+    result = subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-i', source_path, '-frames:v', '1', '-c:v', 'mjpeg', '-q:v', '2', cover_path],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not convert the cover: {result.stderr.strip()}")
+    return cover_path
+
+def playlist_thumbnails(ytdlp_command: list[str], urls: list[str], batch_file: str | None = None) -> dict[str, str]:
+    """Playlist id -> thumbnail URL of the playlists themselves, listed without resolving their tracks."""
+    command = [*ytdlp_command, "--flat-playlist", "--ignore-config", "--print", PLAYLIST_THUMBNAIL_TEMPLATE]
+    if batch_file:
+        command += ["--batch-file", batch_file]
+    result = subprocess.run([*command, *urls], stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if result.returncode != 0 and not result.stdout.strip():
+        raise RuntimeError(f"yt-dlp exited with {result.returncode}: {result.stderr.strip()}")
+    thumbnails = {}
+    for line in result.stdout.splitlines():
+        playlist_id, _, url = line.partition('\t')
+        if playlist_id and url and url != 'NA':
+            thumbnails[playlist_id] = url
+    return thumbnails
+
+def prefetch_covers(artwork_cache: cache.MetadataCache, thumbnails: dict[str, str], ffmpeg: str) -> int:
+    """Fetches and caches the covers that are not cached yet. Returns the number of covers available."""
+    available = 0
+    for key, url in thumbnails.items():
+        if artwork_cache.lookup(key, 'cover'):
+            available += 1
+            continue
+        with tempfile.TemporaryDirectory(prefix='artwork.', dir=os.path.join(WORK_DIR, 'tmp')) as work_dir:
+            try:
+                artwork_cache.store_file(key, 'cover', fetch_cover(url, ffmpeg, work_dir))
+            except (OSError, RuntimeError) as e:
+                print(f"Artwork: could not fetch the cover of {key}: {e}", file=sys.stderr)
+                continue
+        print(f"Artwork: cached the cover of {key}.", file=sys.stderr)
+        available += 1
+    return available
+
+@contextlib.contextmanager
+def cover_for(artwork_cache: cache.MetadataCache, key: str, track_thumbnail: str | None, ffmpeg: str):
+    """
+    Yields (cover path, is_album_cover): the playlist's cached cover, or else the
+    track's own thumbnail, fetched for this track only and never cached under the
+    playlist. (None, False) if neither is to be had; the track is then left without one.
+    """
+    if path := artwork_cache.lookup(key, 'cover'):
+        yield path, True
+        return
+    if not track_thumbnail:
+        yield None, False
+        return
+    with tempfile.TemporaryDirectory(prefix='artwork.', dir=os.path.join(WORK_DIR, 'tmp')) as work_dir:
+        try:
+            path = fetch_cover(track_thumbnail, ffmpeg, work_dir)
+        except (OSError, RuntimeError) as e:
+            print(f"Artwork: could not fetch the thumbnail of a track of {key}: {e}", file=sys.stderr)
+            path = None
+        yield path, False
+
+def embed_cover(audio_path: str, cover_path: str, ffmpeg: str):
+    """Attaches the cover to an mp3 without re-encoding anything, replacing an existing picture."""
+    ext = os.path.splitext(audio_path)[1]
+    partial_path = f"{audio_path}.part{ext}"
+    result = subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-i', audio_path, '-i', cover_path,
+         '-map', '0:a', '-map', '1:v', '-c', 'copy', '-id3v2_version', '3', *COVER_STREAM_ARGS, partial_path],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()}")
+    os.replace(partial_path, audio_path)
+
+def write_cover_file(cover_path: str, directory: str):
+    """Places a cover.jpg in the album directory, unless one is there already."""
+    target = os.path.join(directory, COVER_FILENAME)
+    if not os.path.exists(target):
+        shutil.copyfile(cover_path, target)
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Album artwork cache: fetches a playlist's cover once and attaches it to each track."
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_ARTWORK_DIR, help=f"Cache directory (default: {DEFAULT_ARTWORK_DIR}).")
+    parser.add_argument("--ttl-hours", type=float, default=720, help="Covers older than this are fetched again (default: 720).")
+    parser.add_argument("--max-mb", type=float, default=256, help="Size limit; least recently used covers are evicted beyond it (default: 256).")
+    parser.add_argument("--ffmpeg", default=default_ffmpeg(), help="ffmpeg binary (default: the vendored one).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("prefetch", help="Cache the covers of playlists before their download. The yt-dlp command follows '--'.")
+    p.add_argument("--batch-file", help="File with one playlist URL per line.")
+    p.add_argument("urls", nargs="*", help="Playlist URLs.")
+
+    p = subparsers.add_parser("embed", help="Attach the playlist's cover to a track.")
+    p.add_argument("--key", required=True, help="Playlist id (or the video id of a single track).")
+    p.add_argument("--url", help="The track's own thumbnail, used if the playlist's cover was not prefetched.")
+    p.add_argument("--cover-file", action="store_true", help=f"Also write a {COVER_FILENAME} next to the track.")
+    p.add_argument("audio_path")
+
+    subparsers.add_parser("stats", help="Show the number of cached covers and their size.")
+    # The yt-dlp command of 'prefetch' follows '--'; it is split off first so its options are not parsed.
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    ytdlp_command = argv[split + 1:]
+
+    artwork_cache = open_cache(args.cache_dir, args.ttl_hours, args.max_mb)
+    os.makedirs(os.path.join(WORK_DIR, 'tmp'), exist_ok=True)
+
+    if args.command == "prefetch":
+        if not ytdlp_command:
+            parser.error("the yt-dlp command is missing (give it after '--')")
+        if not args.urls and not args.batch_file:
+            parser.error("prefetch needs playlist URLs or --batch-file")
+        try:
+            thumbnails = playlist_thumbnails(ytdlp_command, args.urls, args.batch_file)
+        except (OSError, RuntimeError) as e:
+            # Not fatal: the tracks then get their own thumbnails.
+            print(f"Artwork: could not list the playlist covers: {e}", file=sys.stderr)
+            return
+        available = prefetch_covers(artwork_cache, thumbnails, args.ffmpeg)
+        print(f"Artwork: {available} playlist cover(s) ready.", file=sys.stderr)
+
+    elif args.command == "embed":
+        url = args.url if args.url != 'NA' else None
+        with cover_for(artwork_cache, args.key, url, args.ffmpeg) as (cover_path, album_cover):
+            if not cover_path:
+                return # A missing cover must not fail the download
+            try:
+                embed_cover(args.audio_path, cover_path, args.ffmpeg)
+                if args.cover_file and album_cover:
+                    write_cover_file(cover_path, os.path.dirname(os.path.abspath(args.audio_path)))
+            except (OSError, RuntimeError) as e:
+                print(f"Artwork: could not attach the cover to {args.audio_path}: {e}", file=sys.stderr)
+
+    elif args.command == "stats":
+        covers = artwork_cache.conn.execute("SELECT COUNT(*) FROM entries WHERE artifact = 'cover'").fetchone()[0]
+        print(f"{covers} covers, {artwork_cache.total_size() / 1e6:.1f} MB in {artwork_cache.objects_dir}")
+
+if __name__ == "__main__":
+    main()
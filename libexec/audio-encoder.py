@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Encoder stage of the audio pipeline (lib/audio-pipeline.sh). yt-dlp downloads
+# bestaudio into a staging directory and appends every finished file to a queue
+# file. This script follows the queue and transcodes each file to mp3 with a
+# pool of ffmpeg processes, embedding the thumbnail and the metadata from the
+# .info.json. Downloads and encodes therefore overlap instead of alternating.
+# With --album-artwork the cover comes from the album artwork cache (artwork.py)
+# instead of a thumbnail downloaded for every track.
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import artwork
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+END_MARKER = '__yt-menu-end__'
+THUMBNAIL_EXTENSIONS = ('jpg', 'jpeg', 'webp', 'png')
+POLL_INTERVAL_SECONDS = 0.5
+
+# ID3 tag -> info dict fields, first non-empty wins. Mirrors yt-dlp's
+# FFmpegMetadataPP; a 'meta_<tag>' field (set with --parse-metadata) overrides.
+METADATA_FIELDS = {
+    'title': ('track', 'title'),
+    'artist': ('artist', 'creator', 'uploader', 'uploader_id'),
+    'album': ('album',),
+    'album_artist': ('album_artist',),
+    'genre': ('genre',),
+    'track': ('track_number',),
+    'date': ('upload_date',),
+    'description': ('description',),
+    'purl': ('webpage_url',),
+    'comment': ('webpage_url',),
+}
+
+# --- Helper Functions ---
+
+def build_metadata(info: dict) -> dict:
+    """Resolves the ID3 tags for a track from its info dict."""
+    tags = {}
+    for tag, fields in METADATA_FIELDS.items():
+        if f"meta_{tag}" in info:
+            value = info[f"meta_{tag}"] # May be '' to clear the tag on purpose
+        else:
+            value = next((info[field] for field in fields if info.get(field) not in (None, '')), None)
+        if value not in (None, ''):
+            tags[tag] = str(value)
+    return tags
+
+def sidecar_files(staged_path: str) -> tuple[str | None, str | None]:
+    """Finds the .info.json and the thumbnail yt-dlp wrote next to the staged audio."""
+    base = os.path.splitext(staged_path)[0]
+    info_path = f"{base}.info.json"
+    thumbnail_path = next((f"{base}.{ext}" for ext in THUMBNAIL_EXTENSIONS if os.path.exists(f"{base}.{ext}")), None)
+    return (info_path if os.path.exists(info_path) else None), thumbnail_path
+
+def build_ffmpeg_command(ffmpeg: str, staged_path: str, thumbnail_path: str | None, tags: dict, output_path: str) -> list[str]:
+    command = [ffmpeg, '-y', '-loglevel', 'error', '-i', staged_path]
+    if thumbnail_path:
+        command += ['-i', thumbnail_path, '-map', '0:a', '-map', '1:v', '-c:v', 'mjpeg', *artwork.COVER_STREAM_ARGS]
+    else:
+        command += ['-map', '0:a']
+    # Same encoder settings as yt-dlp's --audio-format mp3 --audio-quality 0
+    command += ['-c:a', 'libmp3lame', '-q:a', '0', '-id3v2_version', '3', '-map_metadata', '-1']
+    for tag, value in tags.items():
+        command += ['-metadata', f"{tag}={value}"]
+    command.append(output_path)
+    return command
+
+# --- Encoding ---
+
+def encode(staged_path: str, staging_dir: str, dest_dir: str, ffmpeg: str,
+           artwork_max_mb: float | None = None, cover_file: bool = False) -> tuple[bool, str]:
+    """
+    Transcodes one staged download into the destination tree. Returns (ok,
+    message). With artwork_max_mb set, the playlist's cover comes from the
+    artwork cache (opened per call: sqlite connections belong to one thread),
+    or the track's own thumbnail if the cover was not prefetched.
+    """
+    relative = os.path.relpath(staged_path, staging_dir)
+    if not os.path.isfile(staged_path):
+        return False, f"{relative}: staged file not found"
+    output_path = os.path.join(dest_dir, os.path.splitext(relative)[0] + '.mp3')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    info_path, thumbnail_path = sidecar_files(staged_path)
+    info = {}
+    if info_path:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    tags = build_metadata(info)
+    with contextlib.ExitStack() as stack:
+        cover_path, album_cover = thumbnail_path, False
+        if artwork_max_mb is not None and info:
+            key = info.get('playlist_id') or info.get('id')
+            cover_path, album_cover = stack.enter_context(
+                artwork.cover_for(artwork.open_cache(max_mb=artwork_max_mb), key, info.get('thumbnail'), ffmpeg))
+
+        partial_path = f"{output_path}.part.mp3"
+        command = build_ffmpeg_command(ffmpeg, staged_path, cover_path, tags, partial_path)
+        result = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        if result.returncode != 0:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False, f"{relative}: ffmpeg exited with {result.returncode}: {result.stderr.strip()}"
+
+        os.replace(partial_path, output_path)
+        if cover_file and album_cover:
+            artwork.write_cover_file(cover_path, os.path.dirname(output_path))
+    for path in (staged_path, info_path, thumbnail_path):
+        if path:
+            os.remove(path)
+    return True, output_path
+
+def follow_queue(queue_path: str):
+    """
+    Yields staged file paths as yt-dlp appends them, until the end marker. Stops
+    early if the script that started the encoder is gone (the parent changes),
+    since then nobody will ever write the end marker.
+    """
+    parent = os.getppid()
+
+    def orphaned() -> bool:
+        if os.getppid() == parent:
+            return False
+        print("[encoder] The download script exited without finishing the queue; stopping.", file=sys.stderr, flush=True)
+        return True
+
+    while not os.path.exists(queue_path):
+        if orphaned():
+            return
+        time.sleep(POLL_INTERVAL_SECONDS)
+    with open(queue_path, 'r', encoding='utf-8') as f:
+        pending = ''
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                if orphaned():
+                    return
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            pending += chunk
+            if not pending.endswith('\n'):
+                continue # Half-written line; wait for the rest
+            line, pending = pending.strip(), ''
+            if line == END_MARKER:
+                return
+            if line:
+                yield line
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Transcodes downloads listed in a queue file to mp3 with a pool of ffmpeg processes."
+    )
+    parser.add_argument("--queue", required=True, help=f"File yt-dlp appends finished downloads to; ends with a '{END_MARKER}' line.")
+    parser.add_argument("--staging-dir", required=True, help="Directory yt-dlp downloads into (-P).")
+    parser.add_argument("--dest-dir", required=True, help="Destination root; the staging layout is mirrored below it.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of concurrent ffmpeg processes (default: CPU count).")
+    parser.add_argument("--ffmpeg", default=artwork.default_ffmpeg(), help="ffmpeg binary (default: the vendored one).")
+    parser.add_argument("--album-artwork", action="store_true", help="Embed each playlist's cover from the artwork cache (see artwork.py prefetch).")
+    parser.add_argument("--cover-file", action="store_true", help=f"With --album-artwork, also write a {artwork.COVER_FILENAME} per album directory.")
+    parser.add_argument("--artwork-max-mb", type=float, default=256, help="Size limit of the artwork cache (default: 256).")
+    args = parser.parse_args()
+
+    if not shutil.which(args.ffmpeg):
+        print(f"Error: ffmpeg not found at '{args.ffmpeg}'.", file=sys.stderr)
+        sys.exit(1)
+
+    failures = []
+    encoded = []
+
+    def report(future):
+        try:
+            ok, message = future.result()
+        except Exception as e:
+            ok, message = False, str(e)
+        if ok:
+            encoded.append(message)
+            print(f"[encoder] Encoded: {message}", flush=True)
+        else:
+            failures.append(message)
+            print(f"[encoder] FAILED: {message}", file=sys.stderr, flush=True)
+
+    # Encodes start as soon as each download is queued; leaving the block
+    # waits for the ones still running after the end marker.
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for path in follow_queue(args.queue):
+            pool.submit(encode, path, args.staging_dir, args.dest_dir, args.ffmpeg,
+                        args.artwork_max_mb if args.album_artwork else None, args.cover_file).add_done_callback(report)
+
+    print(f"[encoder] {len(encoded)} tracks encoded, {len(failures)} failed.", flush=True)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
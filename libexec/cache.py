@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Local metadata cache shared by the metadata modes (comments, subs,
+# llm-package). Files yt-dlp wrote for a video (.info.json with comments,
+# subtitles, .description) are stored once under cache/objects by content hash;
+# cache/index.sqlite maps (video id, artifact type, variant) to them. Entries
+# expire after a TTL, and the least recently used ones are evicted when the
+# cache grows past its size limit.
+
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import runreport
+import subtitles
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(WORK_DIR, 'cache')
+ARTIFACTS = ('info', 'subtitle', 'description')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    video_id TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    sha256 TEXT,
+    filename TEXT,
+    size INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (video_id, artifact, variant)
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+# --- Helper Functions ---
+
+def classify(filename: str, video_id: str) -> tuple[str, str] | None:
+    """Maps a file yt-dlp wrote for the video to (artifact, variant), or None if it is not cacheable."""
+    if f"[{video_id}]" not in filename:
+        return None
+    if filename.endswith('.info.json'):
+        return 'info', ''
+    if filename.endswith('.description'):
+        return 'description', ''
+    variant = subtitle_variant(filename)
+    return ('subtitle', variant) if variant else None
+
+def subtitle_variant(filename: str) -> str | None:
+    """'Title [id].20240101.en-orig.vtt' -> 'en-orig.vtt'; None if it is not a subtitle file."""
+    subtitle_format = subtitles.detect_format(filename)
+    if not subtitle_format:
+        return None
+    language = os.path.splitext(os.path.splitext(filename)[0])[1].lstrip('.')
+    return f"{language}.{subtitle_format}"
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class MetadataCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_hours: float = 24, max_mb: float = 2048):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_mb * 1024 * 1024
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def fresh_entries(self, video_id: str, artifact: str) -> list[tuple]:
+        cutoff = int(time.time() - self.ttl_seconds)
+        return self.conn.execute(
+            "SELECT variant, sha256, filename FROM entries "
+            "WHERE video_id = ? AND artifact = ? AND created_at >= ?",
+            (video_id, artifact, cutoff)
+        ).fetchall()
+
+    # --- Store ---
+
+    def put_object(self, path: str) -> str:
+        """Adds a file to the object store (once per content) and returns its hash."""
+        sha256 = file_sha256(path)
+        target = self.object_path(sha256)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            os.close(fd)
+            shutil.copyfile(path, temp_path)
+            os.chmod(temp_path, 0o444) # Restores into private work directories may hard-link it
+            os.replace(temp_path, target)
+        return sha256
+
+    def store(self, video_id: str, directory: str, fetched: list[str]) -> int:
+        """
+        Stores the video's files of the `fetched` artifact types from a yt-dlp
+        output directory, replacing older entries of those types. A fetched type
+        without any file is stored as 'known to be absent' (e.g. no subtitles).
+        """
+        now = int(time.time())
+        found = {}
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            kind = classify(name, video_id) if os.path.isfile(path) else None
+            if kind:
+                found.setdefault(kind[0], []).append((kind[1], path, name))
+
+        stored = 0
+        for artifact in dict.fromkeys(fetched):
+            self.conn.execute("DELETE FROM entries WHERE video_id = ? AND artifact = ?", (video_id, artifact))
+            files = found.get(artifact) or [('', None, None)]
+            for variant, path, name in files:
+                sha256 = self.put_object(path) if path else None
+                size = os.path.getsize(path) if path else 0
+                self.conn.execute(
+                    "INSERT INTO entries (video_id, artifact, variant, sha256, filename, size, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, artifact, variant, sha256, name, size, now, now)
+                )
+                stored += bool(path)
+        self.conn.commit()
+        self.evict()
+        return stored
+
+    def store_file(self, key: str, artifact: str, path: str) -> str:
+        """Stores a single file under (key, artifact), e.g. an album cover under its playlist id. Returns its object path."""
+        now = int(time.time())
+        sha256 = self.put_object(path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (video_id, artifact, variant, sha256, filename, size, created_at, last_used) "
+            "VALUES (?, ?, '', ?, ?, ?, ?, ?)",
+            (key, artifact, sha256, os.path.basename(path), os.path.getsize(path), now, now)
+        )
+        self.conn.commit()
+        self.evict()
+        return self.object_path(sha256)
+
+    # --- Restore ---
+
+    def restore(self, video_id: str, artifacts: list[str], dest_dir: str, subtitle_formats: list[str] | None = None,
+                link: bool = False) -> list[str]:
+        """
+        Copies the cached files of the requested types into dest_dir. Returns the
+        types that are missing. link=True hard-links them instead; only for
+        private work directories that are deleted afterwards, since the links
+        share the (read-only) cached objects.
+        """
+        missing = []
+        now = int(time.time())
+        for artifact in artifacts:
+            entries = self.fresh_entries(video_id, artifact)
+            if artifact == 'subtitle' and subtitle_formats:
+                entries = [e for e in entries if not e[1] or e[0].rsplit('.', 1)[-1] in subtitle_formats]
+            if not entries or not all(sha256 is None or os.path.exists(self.object_path(sha256)) for _, sha256, _ in entries):
+                missing.append(artifact)
+                continue
+            for variant, sha256, filename in entries:
+                if sha256:
+                    place_object(self.object_path(sha256), os.path.join(dest_dir, filename), link)
+                self.conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE video_id = ? AND artifact = ? AND variant = ?",
+                    (now, video_id, artifact, variant)
+                )
+            print(f"Cache: reusing {artifact} of {video_id}.", file=sys.stderr)
+        self.conn.commit()
+        return missing
+
+    def lookup(self, key: str, artifact: str) -> str | None:
+        """Object path of a fresh single-file entry (see store_file), or None."""
+        for _variant, sha256, _filename in self.fresh_entries(key, artifact):
+            path = self.object_path(sha256) if sha256 else None
+            if path and os.path.exists(path):
+                self.conn.execute("UPDATE entries SET last_used = ? WHERE video_id = ? AND artifact = ?",
+                                  (int(time.time()), key, artifact))
+                self.conn.commit()
+                return path
+        return None
+
+    # --- Eviction ---
+
+    def evict(self):
+        """Drops expired entries, then the least recently used ones while the objects exceed the size limit."""
+        cutoff = int(time.time() - self.ttl_seconds)
+        self.conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+        total = self.total_size()
+        if total > self.max_bytes:
+            for video_id, artifact, variant in self.conn.execute(
+                    "SELECT video_id, artifact, variant FROM entries ORDER BY last_used").fetchall():
+                self.conn.execute("DELETE FROM entries WHERE video_id = ? AND artifact = ? AND variant = ?",
+                                  (video_id, artifact, variant))
+                total = self.total_size()
+                if total <= self.max_bytes:
+                    break
+        self.conn.commit()
+        self.remove_orphans()
+
+    def total_size(self) -> int:
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM entries WHERE sha256 IS NOT NULL)"
+        ).fetchone()[0]
+
+    def remove_orphans(self):
+        referenced = {row[0] for row in self.conn.execute("SELECT DISTINCT sha256 FROM entries WHERE sha256 IS NOT NULL")}
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if name not in referenced and not name.endswith('.tmp'):
+                    os.remove(os.path.join(prefix_dir, name))
+
+def place_object(source: str, target: str, link: bool = False):
+    """
+    Puts a cached object at target: a hard link if link is set (falling back to a
+    copy across file systems), otherwise a copy that ends up as a normal,
+    writable file the user owns.
+    """
+    if link:
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Content-addressed cache for the metadata yt-dlp writes per video (.info.json, subtitles, .description)."
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Cache directory (default: {DEFAULT_CACHE_DIR}).")
+    parser.add_argument("--ttl-hours", type=float, default=24, help="Entries older than this are refetched (default: 24). 0 disables the cache.")
+    parser.add_argument("--max-mb", type=float, default=2048, help="Size limit; least recently used entries are evicted beyond it (default: 2048).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("restore", help="Copy cached files into a directory and print the missing artifact types, one per line.")
+    p.add_argument("--id", required=True, help="Video id.")
+    p.add_argument("--dest", required=True, help="Directory to restore into.")
+    p.add_argument("--sub-formats", help="Comma-separated subtitle formats that are acceptable (default: any).")
+    p.add_argument("--link", action="store_true",
+                   help="Hard-link instead of copying. Only for private temporary directories: the links share the cached objects.")
+    p.add_argument("artifacts", nargs="+", choices=ARTIFACTS)
+
+    p = subparsers.add_parser("store", help="Store the video's files from a yt-dlp output directory.")
+    p.add_argument("--id", required=True, help="Video id.")
+    p.add_argument("--fetched", action="append", required=True, choices=ARTIFACTS,
+                   help="Artifact type that was requested from yt-dlp; recorded even if no file came back. Repeatable.")
+    p.add_argument("directory")
+
+    subparsers.add_parser("stats", help="Show the number of entries and the cache size.")
+    subparsers.add_parser("clear", help="Remove all entries and objects.")
+    args = parser.parse_args()
+
+    if args.ttl_hours <= 0:
+        # Disabled: everything is missing, nothing is stored.
+        if args.command == "restore":
+            print("\n".join(args.artifacts))
+        return
+
+    cache = MetadataCache(args.cache_dir, args.ttl_hours, args.max_mb)
+
+    if args.command == "restore":
+        if not os.path.isdir(args.dest):
+            print(f"Error: Provided destination directory does not exist: {args.dest}", file=sys.stderr)
+            sys.exit(1)
+        formats = args.sub_formats.split(',') if args.sub_formats else None
+        with runreport.stage("cache.restore", id=args.id) as fields:
+            missing = cache.restore(args.id, args.artifacts, args.dest, formats, link=args.link)
+            fields.update(hits=len(args.artifacts) - len(missing), misses=len(missing))
+        for artifact in missing:
+            print(artifact)
+
+    elif args.command == "store":
+        with runreport.stage("cache.store", id=args.id) as fields:
+            stored = fields['files'] = cache.store(args.id, args.directory, args.fetched)
+        print(f"Cache: stored {stored} file(s) of {args.id}.", file=sys.stderr)
+
+    elif args.command == "stats":
+        entries = cache.conn.execute("SELECT COUNT(*), COUNT(DISTINCT video_id) FROM entries").fetchone()
+        print(f"{entries[0]} entries for {entries[1]} videos, {cache.total_size() / 1e6:.1f} MB in {cache.objects_dir}")
+
+    elif args.command == "clear":
+        cache.conn.execute("DELETE FROM entries")
+        cache.conn.commit()
+        cache.remove_orphans()
+        print("Cache cleared.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Local job queue for the worker scripts. Jobs live in config/jobs.sqlite with
+# the answers the script would otherwise ask for (URL, directory name, ...),
+# which are fed to it on stdin. The daemon ('serve') starts queued jobs oldest
+# first, with a concurrency limit per job type, and writes each job's output to
+# tmp/jobs/<id>.log. Nothing needs a terminal, so it also runs on headless
+# servers.
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(WORK_DIR, 'config', 'jobs.sqlite')
+JOBS_DIR = os.path.join(WORK_DIR, 'tmp', 'jobs')
+PID_FILE = os.path.join(WORK_DIR, 'tmp', 'jobqueue.pid')
+POLL_SECONDS = 1.0
+
+# Job type: (worker script, the questions it asks on stdin, in order)
+JOB_TYPES = {
+    'album': ('yt-album.sh', ('Playlist URL', 'Album directory name (blank: automatic)')),
+    'albums': ('yt-albums_plural.sh', ('URL to crawl for playlists', 'Artist name')),
+    'song': ('yt-song.sh', ('Target URL',)),
+    'regular': ('yt-regular.sh', ('URL',)),
+    'comments': ('yt-comments.sh', ('URL', 'Fetch again if already in the library? [y/N]')),
+    'subs': ('subs.sh', ('URL',)),
+    'llm-package': ('llm-package.sh', ('URL', 'Fetch again if already in the library? [y/N]')),
+}
+# Album jobs share the link and the encoder, metadata jobs are light.
+DEFAULT_CONCURRENCY = {
+    'album': 1, 'albums': 1, 'song': 2, 'regular': 1,
+    'comments': 2, 'subs': 2, 'llm-package': 2,
+}
+ACTIVE_STATES = ('queued', 'running')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    args TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    pid INTEGER,
+    exit_code INTEGER,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    started_at INTEGER,
+    finished_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+# --- Helper Functions ---
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def parse_concurrency(spec: str | None) -> dict[str, int]:
+    """'album=1,comments=3' -> the defaults with those types overridden."""
+    limits = dict(DEFAULT_CONCURRENCY)
+    for item in (spec or '').replace(' ', ',').split(','):
+        if not item:
+            continue
+        job_type, _, value = item.partition('=')
+        if job_type not in JOB_TYPES or not value.isdigit():
+            raise ValueError(f"invalid concurrency entry '{item}' (expected TYPE=N with TYPE one of {', '.join(JOB_TYPES)})")
+        limits[job_type] = int(value)
+    return limits
+
+def log_path_for(job_id: int) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.log")
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def daemon_pid() -> int | None:
+    try:
+        with open(PID_FILE) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+    return pid if process_alive(pid) else None
+
+def enqueue(conn, job_type: str, inputs: list[str], args: list[str]) -> int:
+    cursor = conn.execute(
+        "INSERT INTO jobs (type, inputs, args, created_at) VALUES (?, ?, ?, ?)",
+        (job_type, json.dumps(inputs), json.dumps(args), int(time.time()))
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+def cancel(conn, job_id: int) -> str:
+    """Cancels a queued job, or terminates a running one. Returns the job's state before."""
+    row = conn.execute("SELECT state, pid FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        raise LookupError(f"no job {job_id}")
+    state, pid = row
+    if state == 'queued':
+        conn.execute("UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ? AND state = 'queued'",
+                     (int(time.time()), job_id))
+    elif state == 'running':
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        if pid: # Otherwise the daemon is just starting it and checks the flag
+            try:
+                os.killpg(pid, signal.SIGTERM) # The job runs in its own session
+            except ProcessLookupError:
+                pass
+    conn.commit()
+    return state
+
+def print_jobs(rows):
+    for job_id, job_type, state, exit_code, inputs, created_at in rows:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(created_at))
+        status = f"{state} ({exit_code})" if state == 'failed' and exit_code is not None else state
+        first_input = next((line for line in json.loads(inputs) if line), '-')
+        print(f"{job_id}\t{when}\t{job_type}\t{status}\t{first_input}")
+
+# --- Daemon ---
+
+class Daemon:
+    def __init__(self, conn, limits: dict[str, int]):
+        self.conn = conn
+        self.limits = limits
+        self.running = {} # job id -> (type, Popen)
+
+    def start_job(self, job_id: int, job_type: str, inputs: list[str], args: list[str]):
+        # Claim the job first, so a concurrent 'cancel' of a queued job wins cleanly.
+        claimed = self.conn.execute(
+            "UPDATE jobs SET state = 'running', started_at = ? WHERE id = ? AND state = 'queued'",
+            (int(time.time()), job_id)
+        ).rowcount
+        self.conn.commit()
+        if not claimed:
+            return
+
+        script = os.path.join(WORK_DIR, 'libexec', JOB_TYPES[job_type][0])
+        input_path = os.path.join(JOBS_DIR, f"{job_id}.input")
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{line}\n" for line in inputs)
+        with open(input_path, 'r', encoding='utf-8') as stdin, open(log_path_for(job_id), 'a', encoding='utf-8') as log:
+            log.write(f"[jobqueue] Job {job_id} ({job_type}) started {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            log.flush()
+            process = subprocess.Popen(
+                ['bash', script, *args], stdin=stdin, stdout=log, stderr=subprocess.STDOUT,
+                cwd=WORK_DIR, env={**os.environ, 'YT_MENU_JOB_ID': str(job_id)}, start_new_session=True
+            )
+        self.conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (process.pid, job_id))
+        self.conn.commit()
+        self.running[job_id] = (job_type, process)
+        if self.conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]:
+            os.killpg(process.pid, signal.SIGTERM)
+        print(f"jobqueue: started job {job_id} ({job_type}), pid {process.pid}", file=sys.stderr)
+
+    def reap(self):
+        for job_id, (job_type, process) in list(self.running.items()):
+            exit_code = process.poll()
+            if exit_code is None:
+                continue
+            del self.running[job_id]
+            cancelled = self.conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            state = 'cancelled' if cancelled else ('done' if exit_code == 0 else 'failed')
+            self.conn.execute("UPDATE jobs SET state = ?, exit_code = ?, finished_at = ? WHERE id = ?",
+                              (state, exit_code, int(time.time()), job_id))
+            self.conn.commit()
+            with open(log_path_for(job_id), 'a', encoding='utf-8') as log:
+                log.write(f"\n[jobqueue] Job {job_id} {state} (exit code {exit_code})\n")
+            print(f"jobqueue: job {job_id} ({job_type}) {state}", file=sys.stderr)
+
+    def schedule(self):
+        counts = {}
+        for job_type, _ in self.running.values():
+            counts[job_type] = counts.get(job_type, 0) + 1
+        for job_id, job_type, inputs, args in self.conn.execute(
+                "SELECT id, type, inputs, args FROM jobs WHERE state = 'queued' ORDER BY id").fetchall():
+            if counts.get(job_type, 0) < self.limits.get(job_type, 1):
+                self.start_job(job_id, job_type, json.loads(inputs), json.loads(args))
+                counts[job_type] = counts.get(job_type, 0) + 1
+
+    def recover(self):
+        """Jobs left 'running' by a daemon that died are marked interrupted; they are not restarted."""
+        count = self.conn.execute(
+            "UPDATE jobs SET state = 'interrupted', finished_at = ? WHERE state = 'running'", (int(time.time()),)
+        ).rowcount
+        self.conn.commit()
+        if count:
+            print(f"jobqueue: marked {count} job(s) of an earlier daemon as interrupted", file=sys.stderr)
+
+    def stop_running(self):
+        for job_id, (_, process) in self.running.items():
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for job_id, (_, process) in self.running.items():
+            exit_code = process.wait()
+            self.conn.execute("UPDATE jobs SET state = 'interrupted', exit_code = ?, finished_at = ? WHERE id = ?",
+                              (exit_code, int(time.time()), job_id))
+        self.conn.commit()
+
+def serve(db_path: str, limits: dict[str, int]):
+    if daemon_pid():
+        print(f"Error: A job queue daemon is already running (pid {daemon_pid()}).", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(PID_FILE, 'w') as f:
+        f.write(f"{os.getpid()}\n")
+
+    def shutdown(_signum, _frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    daemon = Daemon(connect(db_path), limits)
+    daemon.recover()
+    print(f"jobqueue: running, limits {', '.join(f'{t}={n}' for t, n in limits.items())}", file=sys.stderr)
+    try:
+        while True:
+            daemon.reap()
+            daemon.schedule()
+            time.sleep(POLL_SECONDS)
+    finally:
+        daemon.stop_running()
+        try:
+            os.unlink(PID_FILE)
+        except FileNotFoundError:
+            pass
+
+def start(db_path: str, concurrency: str | None) -> int:
+    if pid := daemon_pid():
+        print(f"Job queue daemon already running (pid {pid}).")
+        return 0
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    log_path = os.path.join(JOBS_DIR, 'daemon.log')
+    command = [sys.executable, os.path.abspath(__file__), '--db', db_path, 'serve']
+    if concurrency:
+        command += ['--concurrency', concurrency]
+    with open(log_path, 'a') as log:
+        subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+    for _ in range(50):
+        if pid := daemon_pid():
+            print(f"Job queue daemon started (pid {pid}, log: {log_path}).")
+            return 0
+        time.sleep(0.1)
+    print(f"Error: Job queue daemon did not come up. See {log_path}", file=sys.stderr)
+    return 1
+
+def stop() -> int:
+    pid = daemon_pid()
+    if not pid:
+        print("No running job queue daemon found.")
+        return 1
+    os.kill(pid, signal.SIGTERM)
+    print(f"Stopped job queue daemon (pid {pid}); its running jobs were interrupted.")
+    return 0
+
+def tail(conn, job_id: int, follow: bool) -> int:
+    row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        print(f"Error: No job {job_id}.", file=sys.stderr)
+        return 1
+    log_path = log_path_for(job_id)
+    position = 0
+    while True:
+        if os.path.exists(log_path):
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                f.seek(position)
+                chunk = f.read()
+                position = f.tell()
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        state = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        if not follow or state not in ACTIVE_STATES:
+            if state == 'queued':
+                print(f"Job {job_id} is queued and has no output yet.")
+            return 0
+        time.sleep(0.5)
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Job queue for the yt-menu worker scripts.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Queue database (default: {DEFAULT_DB}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("enqueue", help="Queue a job and print its id. Arguments after '--' go to the worker script.")
+    p.add_argument("type", choices=JOB_TYPES)
+    p.add_argument("--input", action="append", default=[],
+                   help="A line the script reads on stdin, in the order it asks (URL first). Repeatable.")
+    p.add_argument("--ask", action="store_true", help="Ask for the inputs of the job type interactively.")
+
+    p = subparsers.add_parser("list", help="List active jobs (all jobs with --all).")
+    p.add_argument("--all", action="store_true")
+    p.add_argument("--limit", type=int, default=50)
+
+    p = subparsers.add_parser("tail", help="Print a job's output.")
+    p.add_argument("id", type=int)
+    p.add_argument("-f", "--follow", action="store_true", help="Keep printing until the job has finished.")
+
+    p = subparsers.add_parser("cancel", help="Cancel a queued job or terminate a running one.")
+    p.add_argument("id", type=int)
+
+    for name, help_text in (("serve", "Run the daemon in the foreground."), ("start", "Start the daemon in the background.")):
+        p = subparsers.add_parser(name, help=help_text)
+        p.add_argument("--concurrency", help="Per-type limits, e.g. 'album=1,comments=3' (unlisted types keep their default).")
+    subparsers.add_parser("stop", help="Stop the daemon; running jobs are interrupted.")
+    subparsers.add_parser("status", help="Report whether the daemon is running.")
+
+    # 'enqueue TYPE ... -- ARGS': everything after '--' is passed to the worker script.
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    script_args = argv[split + 1:]
+    args = parser.parse_args(argv[:split])
+
+    if args.command in ("serve", "start"):
+        try:
+            limits = parse_concurrency(args.concurrency)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.command == "serve":
+            serve(args.db, limits)
+        else:
+            sys.exit(start(args.db, args.concurrency))
+        return
+    if args.command == "stop":
+        sys.exit(stop())
+    if args.command == "status":
+        pid = daemon_pid()
+        print(f"Job queue daemon is {f'running (pid {pid})' if pid else 'not running'}.")
+        sys.exit(0 if pid else 1)
+
+    conn = connect(args.db)
+
+    if args.command == "enqueue":
+        inputs = list(args.input)
+        if args.ask:
+            # Questions go to STDERR; STDOUT only carries the job id.
+            for question in JOB_TYPES[args.type][1][len(inputs):]:
+                print(f"{question}: ", end='', file=sys.stderr, flush=True)
+                inputs.append(sys.stdin.readline().rstrip('\n'))
+        if not any(inputs) and not script_args:
+            parser.error("a job needs at least one input (the URL) or script arguments after '--'")
+        if args.type == 'llm-package' and inputs and inputs[0].strip().endswith('+'):
+            # The trailing '+' opens the interactive prompt menu, which a queued job cannot answer.
+            parser.error("the prompt menu ('+' after the URL) needs a terminal; choose the prompts "
+                         "by name instead, e.g. -- --batch URL --prompt \"Impartial Summary\"")
+        job_id = enqueue(conn, args.type, inputs, script_args)
+        print(job_id)
+        if not daemon_pid():
+            print("Note: No job queue daemon is running; start it with 'yt-menu daemon start'.", file=sys.stderr)
+
+    elif args.command == "list":
+        where = "" if args.all else f"WHERE state IN {ACTIVE_STATES}"
+        print_jobs(conn.execute(
+            f"SELECT id, type, state, exit_code, inputs, created_at FROM jobs {where} ORDER BY id DESC LIMIT ?",
+            (args.limit,)))
+
+    elif args.command == "tail":
+        sys.exit(tail(conn, args.id, args.follow))
+
+    elif args.command == "cancel":
+        try:
+            state = cancel(conn, args.id)
+        except LookupError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if state in ACTIVE_STATES:
+            print(f"Job {args.id} cancelled{' (terminating)' if state == 'running' else ''}.")
+        else:
+            print(f"Job {args.id} has already finished ({state}).")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,388 @@
+import argparse
+import heapq
 import json
+import re
 import sys
 import os
 
-def process_and_restructure_comments(input_file_path):
+# --- Compact Comment Records ---
+
+class CommentRecord:
+    """Minimal per-comment record. __slots__ keeps the per-comment overhead low."""
+    __slots__ = ('id', 'author', 'text', 'like_count', 'author_is_uploader', 'parent', 'replies', 'is_orphan')
+
+    def __init__(self, comment):
+        self.id = comment.get('id')
+        self.author = comment.get('author')
+        self.text = comment.get('text')
+        self.like_count = comment.get('like_count') or 0
+        self.author_is_uploader = bool(comment.get('author_is_uploader', False))
+        self.parent = comment.get('parent')
+        self.replies = []
+        self.is_orphan = False
+
+    def to_dict(self):
+        """Converts the record (and its replies) to the output comment object."""
+        opt_comment = {
+            'id': self.id,
+            'author': self.author,
+            'text': self.text,
+            'replies': [reply.to_dict() for reply in self.replies]
+        }
+
+        # Conditionally include non-default values
+        if self.like_count > 0:
+            opt_comment['like_count'] = self.like_count
+        if self.author_is_uploader:
+            opt_comment['author_is_uploader'] = True
+        if self.is_orphan:
+            opt_comment['is_orphan'] = True # Add context
+        return opt_comment
+
+def link_comment_threads(records):
+    """
+    Places each record under its parent and returns the root records, in the
+    original order. Replies to deleted or unretrievable comments are treated
+    as root comments to avoid losing them.
+    """
+    comment_map = {record.id: record for record in records}
+    root_comments = []
+    for record in records:
+        if record.parent == 'root':
+            root_comments.append(record)
+        elif parent_node := comment_map.get(record.parent):
+            parent_node.replies.append(record)
+        else:
+            record.is_orphan = True
+            root_comments.append(record)
+    return root_comments
+
+# --- Compact Columnar Layout ---
+
+OUTPUT_FORMATS = ('nested', 'compact')
+
+COMPACT_COMMENTS_DESC = (
+    "comments holds one entry per comment in the parallel arrays parent, author, likes and text. "
+    "Comment i was written by authors[author[i]], has likes[i] likes and the text text[i]. "
+    "parent[i] is the index of the comment it replies to, or -1 for a top-level comment; "
+    "replies always follow their parent. uploader lists the authors who are the channel owner. "
+    "orphans, if present, lists top-level comments that actually reply to a comment that is no longer available."
+)
+
+def compact_comments(comments):
+    """
+    Converts threaded comment objects (see CommentRecord.to_dict) to the
+    columnar layout: authors interned into a table, parent indices instead of
+    nesting, comments in thread order. Comment ids are dropped.
+    """
+    authors = {}
+    columns = {'parent': [], 'author': [], 'likes': [], 'text': []}
+    uploader = set()
+    orphans = []
+    stack = [(comment, -1) for comment in reversed(comments)]
+    while stack:
+        comment, parent = stack.pop()
+        index = len(columns['text'])
+        author = authors.setdefault(comment.get('author'), len(authors))
+        columns['parent'].append(parent)
+        columns['author'].append(author)
+        columns['likes'].append(comment.get('like_count', 0))
+        columns['text'].append(comment.get('text'))
+        if comment.get('author_is_uploader'):
+            uploader.add(author)
+        if comment.get('is_orphan'):
+            orphans.append(index)
+        stack.extend((reply, index) for reply in reversed(comment.get('replies', [])))
+
+    compact = {'authors': list(authors), **columns, 'uploader': sorted(uploader)}
+    if orphans:
+        compact['orphans'] = orphans
+    return compact
+
+def expand_compact_comments(compact):
+    """Inverse of compact_comments, without the ids. Returns the threaded comment objects."""
+    uploader = set(compact.get('uploader', []))
+    orphans = set(compact.get('orphans', []))
+    nodes = []
+    roots = []
+    for i, (parent, author, likes, text) in enumerate(zip(compact['parent'], compact['author'], compact['likes'], compact['text'])):
+        node = {'author': compact['authors'][author], 'text': text, 'replies': []}
+        if likes > 0:
+            node['like_count'] = likes
+        if author in uploader:
+            node['author_is_uploader'] = True
+        if i in orphans:
+            node['is_orphan'] = True
+        nodes.append(node)
+        (roots if parent < 0 else nodes[parent]['replies']).append(node)
+    return roots
+
+# --- Budgeted Selection ---
+
+APPROX_CHARS_PER_TOKEN = 4
+# Serialized size of one comment beyond its JSON-encoded text. Nested objects
+# are written with indent=2 inside a package: root objects open at indent level
+# 2 ("comments": [ is level 1), each reply level two deeper. A nested object
+# always has the id, author, text and replies keys ('"id": ' etc., 35 chars),
+# separators and newlines; optional keys are added per comment. A compact row
+# costs its likes, its parent and author indices (taken as up to four digits
+# each), four commas, and its author name in the authors table (counted for
+# every row, although repeated names are stored once).
+NESTED_BASE_LEVEL = 2
+NESTED_KEY_CHARS = 35
+COMPACT_ROW_CHARS = 12
+UPLOADER_BONUS = 1000
+REPLY_WEIGHT = 2
+
+def own_cost(record, output_format='nested', depth=0):
+    """Serialized characters of a single comment at the given reply depth, without its replies."""
+    text = len(json.dumps(record.text, ensure_ascii=False))
+    if output_format == 'compact':
+        return text + len(json.dumps(record.author, ensure_ascii=False)) + 1 + len(str(record.like_count)) + COMPACT_ROW_CHARS
+    level = NESTED_BASE_LEVEL + 2 * depth
+    keys = 4
+    cost = (text + len(json.dumps(record.author, ensure_ascii=False)) + len(json.dumps(record.id, ensure_ascii=False))
+            + NESTED_KEY_CHARS)
+    if record.like_count > 0:
+        keys += 1
+        cost += len('"like_count": ') + len(str(record.like_count))
+    if record.author_is_uploader:
+        keys += 1
+        cost += len('"author_is_uploader": true')
+    if record.is_orphan:
+        keys += 1
+        cost += len('"is_orphan": true')
+    cost += 2 # "[]" of the replies
+    if record.replies:
+        cost += 1 + 2 * (level + 1) # newline and indent before the closing "]"
+    # Indented key lines with ",\n", the "{" line and the "}," line.
+    return cost + keys * (2 * (level + 1) + 2) + 2 * level + 2 + 2 * level + 2
+
+def comment_cost(record, output_format='nested', depth=0):
+    """Serialized characters of a comment including its replies."""
+    return own_cost(record, output_format, depth) + sum(comment_cost(reply, output_format, depth + 1) for reply in record.replies)
+
+def thread_score(record):
+    """Ranks a thread by likes, reply count and uploader participation."""
+    score = record.like_count + REPLY_WEIGHT * len(record.replies)
+    if record.author_is_uploader or any(reply.author_is_uploader for reply in record.replies):
+        score += UPLOADER_BONUS
+    return score
+
+def reply_score(record):
+    return record.like_count + (UPLOADER_BONUS if record.author_is_uploader else 0)
+
+def prune_replies(replies, remaining, max_replies=None, output_format='nested'):
+    """
+    Keeps the best replies that fit in the remaining budget, at most
+    max_replies of them. A reply that does not fit is passed over for
+    smaller ones. Returns the kept replies in their original order and the
+    budget left over.
+    """
+    heap = [(-reply_score(reply), i, reply) for i, reply in enumerate(replies)]
+    heapq.heapify(heap)
+    kept = []
+    while heap and (max_replies is None or len(kept) < max_replies):
+        _, i, reply = heapq.heappop(heap)
+        cost = comment_cost(reply, output_format, 1)
+        if cost > remaining:
+            continue
+        remaining -= cost
+        kept.append((i, reply))
+    kept.sort(key=lambda item: item[0])
+    return [reply for _, reply in kept], remaining
+
+def select_comment_threads(roots, max_chars=None, max_replies=None, output_format='nested'):
+    """
+    Keeps the highest-ranked threads until max_chars is used up. A thread
+    that does not fit is passed over, so smaller ones ranked below it can
+    still use the rest of the budget. Threads are popped from a heap, so the
+    search stops as soon as not even an empty comment would fit. Replies in
+    each kept thread are pruned to the remaining budget and to max_replies.
+    Returns the kept roots, best first.
+    """
+    remaining = max_chars if max_chars is not None else float('inf')
+    smallest = own_cost(CommentRecord({}), output_format)
+    heap = [(-thread_score(root), i, root) for i, root in enumerate(roots)]
+    heapq.heapify(heap)
+    selected = []
+    while heap and remaining >= smallest:
+        _, _, root = heapq.heappop(heap)
+        root_cost = own_cost(root, output_format)
+        if root_cost > remaining:
+            continue
+        remaining -= root_cost
+        root.replies, remaining = prune_replies(root.replies, remaining, max_replies, output_format)
+        selected.append(root)
+    return selected
+
+def thread_records(records, max_chars=None, max_replies=None, output_format='nested'):
+    """
+    Links records into threads and applies the budget when one is given. The
+    budget is measured in the output format the comments will be written in.
+    """
+    roots = link_comment_threads(records)
+    if max_chars is not None or max_replies is not None:
+        roots = select_comment_threads(roots, max_chars, max_replies, output_format)
+    return [record.to_dict() for record in roots]
+
+# --- Streaming .info.json Reader ---
+
+_WHITESPACE = re.compile(r'\s*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR_END = re.compile(r'[,\]}\s]')
+
+class JsonStreamReader:
+    """
+    Reads the top-level object of a JSON document incrementally. Values are
+    either decoded one at a time or skipped by scanning, so only the current
+    value (never the whole document) has to be held in memory.
+    """
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, min_size=0):
+        """Drops consumed input and appends the next chunk. Returns False at EOF."""
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        chunk = self.f.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def _next_char(self):
+        """Skips whitespace and returns the next character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def _expect(self, chars):
+        char = self._next_char()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def read_value(self):
+        """Decodes the next value, reading more input until it is complete."""
+        if self._next_char() not in '"[{':
+            # A number may continue in the next chunk ("-2." decodes as -2), so
+            # make sure the token's delimiter is buffered before decoding.
+            while not _SCALAR_END.search(self.buf, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: grow the buffer geometrically and retry.
+                if not self._fill(len(self.buf)):
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """Consumes the next value without building any Python objects for it."""
+        char = self._next_char()
+        if char not in '"[{':
+            self.read_value() # Scalars are small, decoding them is cheapest.
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if not match:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON input")
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._skip_string_tail()
+            elif token in '[{':
+                depth += 1
+            else:
+                depth -= 1
+            if depth == 0:
+                return
+
+    def _skip_string_tail(self):
+        """Consumes the rest of a string whose opening quote was just consumed."""
+        while True:
+            match = _STRING_TAIL.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            # No closing quote in the buffer yet (possibly split after a backslash).
+            if not self._fill(len(self.buf)):
+                raise ValueError("Unterminated string in JSON input")
+
+    def iter_object(self):
+        """Yields the keys of the top-level object; the caller must consume each value."""
+        self._expect('{')
+        if self._next_char() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def iter_array(self):
+        """Decodes and yields the elements of the array at the current position one by one."""
+        self._expect('[')
+        if self._next_char() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self._expect(',]') == ']':
+                return
+
+def stream_info_json(input_file_path, keep_keys=()):
+    """
+    Streams a .info.json file. Yields ('comment', comment_dict) for every
+    element of the comments array and (key, value) for each top-level key in
+    keep_keys. Every other top-level key (formats, thumbnails, captions, ...)
+    is skipped without being decoded.
+    """
+    with open(input_file_path, 'r', encoding='utf-8') as f:
+        reader = JsonStreamReader(f)
+        for key in reader.iter_object():
+            if key == 'comments':
+                if reader._next_char() == 'n': # "comments": null
+                    reader.skip_value()
+                    continue
+                for comment in reader.iter_array():
+                    yield 'comment', comment
+            elif key in keep_keys:
+                yield key, reader.read_value()
+            else:
+                reader.skip_value()
+
+# --- Restructuring ---
+
+def process_and_restructure_comments(input_file_path, max_chars=None, max_replies=None, output_format='nested'):
     """
     Reads a .info.json file, extracts and minimizes comment data, and
     restructures the flat list into a nested tree of conversations.
+    With max_chars or max_replies only the best threads and replies are kept.
     """
     try:
         with open(input_file_path, 'r', encoding='utf-8') as f:
@@ -14,72 +391,75 @@ def process_and_restructure_comments(input_file_path):
         print(f"Error reading or parsing {input_file_path}: {e}", file=sys.stderr)
         return None
 
-    if 'comments' not in data or not data['comments']:
-        return []
+    return restructure_comments(data.get('comments'), max_chars, max_replies, output_format)
 
-    comment_map = {}
-    processed_comments = []
+def process_and_restructure_comments_streaming(input_file_path, max_chars=None, max_replies=None, output_format='nested'):
+    """
+    Streaming variant of process_and_restructure_comments. Comments are read
+    one at a time and only their compact records are kept, so peak memory
+    follows the kept comment text rather than the size of the .info.json.
+    """
+    try:
+        records = [CommentRecord(comment) for _key, comment in stream_info_json(input_file_path)]
+    except Exception as e:
+        print(f"Error reading or parsing {input_file_path}: {e}", file=sys.stderr)
+        return None
 
-    # --- First Pass: Minimize and Map ---
-    # Create optimized comment objects and map them by their ID for fast lookup.
-    for comment in data['comments']:
-        opt_comment = {
-            'id': comment.get('id'),
-            'author': comment.get('author'),
-            'text': comment.get('text'),
-            'replies': []  # Initialize replies list for every comment
-        }
+    return thread_records(records, max_chars, max_replies, output_format)
 
-        # Conditionally include non-default values
-        if (like_count := comment.get('like_count', 0)) > 0:
-            opt_comment['like_count'] = like_count
-        if comment.get('author_is_uploader', False):
-            opt_comment['author_is_uploader'] = True
-        
-        # Store the original parent ID for the linking pass
-        parent_id = comment.get('parent')
-        
-        comment_map[opt_comment['id']] = opt_comment
-        processed_comments.append((opt_comment, parent_id))
-
-    # --- Second Pass: Link and Build Tree ---
-    # Iterate through the processed comments to place them in the tree.
-    root_comments = []
-    for comment_obj, parent_id in processed_comments:
-        if parent_id == 'root':
-            root_comments.append(comment_obj)
-        else:
-            if parent_node := comment_map.get(parent_id):
-                parent_node['replies'].append(comment_obj)
-            else:
-                # This comment is a reply to a deleted or unretrievable comment.
-                # We'll treat it as a root comment to avoid losing it.
-                comment_obj['is_orphan'] = True # Add context
-                root_comments.append(comment_obj)
+def restructure_comments(comments, max_chars=None, max_replies=None, output_format='nested'):
+    """
+    Minimizes an in-memory list of yt-dlp comment dicts and restructures the
+    flat list into a nested tree of conversations.
+    """
+    if not comments:
+        return []
 
-    return root_comments
+    records = [CommentRecord(comment) for comment in comments]
+    return thread_records(records, max_chars, max_replies, output_format)
+
+def budget_in_chars(max_chars=None, max_tokens=None):
+    """Combines a character and an approximate token budget into one character budget. 0 keeps no comments."""
+    budgets = [b for b in (max_chars, None if max_tokens is None else max_tokens * APPROX_CHARS_PER_TOKEN) if b is not None]
+    return min(budgets) if budgets else None
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print(f"Usage: python {sys.argv[0]} <path_to_info.json>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Restructures the comments of a .info.json into threaded form and prints the output path to STDOUT."
+    )
+    parser.add_argument("input_path", help="Path to the .info.json file.")
+    parser.add_argument("--stream", action="store_true", help="Read the comments incrementally instead of loading the whole file.")
+    parser.add_argument("--max-chars", type=int, help="Keep only the best-ranked threads that fit in this many output characters.")
+    parser.add_argument("--max-tokens", type=int, help=f"Like --max-chars, in approximate tokens ({APPROX_CHARS_PER_TOKEN} characters each).")
+    parser.add_argument("--max-replies", type=int, help="Keep at most this many replies per thread.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='nested',
+                        help="Nested comment objects (default), or compact columnar arrays written without whitespace.")
+    args = parser.parse_args()
+
+    max_chars = budget_in_chars(args.max_chars, args.max_tokens)
+
+    input_path = args.input_path
 
-    input_path = sys.argv[1]
-    
     if not os.path.exists(input_path):
         print(f"Error: Input file '{input_path}' does not exist.", file=sys.stderr)
         sys.exit(1)
 
-    structured_data = process_and_restructure_comments(input_path)
+    if args.stream:
+        structured_data = process_and_restructure_comments_streaming(input_path, max_chars, args.max_replies, args.format)
+    else:
+        structured_data = process_and_restructure_comments(input_path, max_chars, args.max_replies, args.format)
 
     if structured_data is not None:
         base, _ = os.path.splitext(input_path)
         # Use a more descriptive intermediate filename
         output_path = f"{base}.comments_threaded.json"
-        
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(structured_data, f, indent=2, ensure_ascii=False)
-        
+            if args.format == 'compact':
+                json.dump(compact_comments(structured_data), f, separators=(',', ':'), ensure_ascii=False)
+            else:
+                json.dump(structured_data, f, indent=2, ensure_ascii=False)
+
         print(f"Successfully created structured comment file at: {output_path}", file=sys.stderr)
         # Print ONLY the path to stdout for the calling script.
-        print(output_path)
\ No newline at end of file
+        print(output_path)
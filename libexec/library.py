@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Local library index (config/library.sqlite) shared by all download modes. It
+# records what has been fetched (video id, playlist id, mode, output path, size,
+# time) so the worker scripts can skip finished items with one indexed lookup
+# instead of asking yt-dlp to resolve them over the network again. It also keeps
+# the playlist ids of each crawled channel that have been downloaded completely,
+# for the incremental sync of releases-retriever.py.
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from urllib.parse import urlparse
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(WORK_DIR, 'config', 'library.sqlite')
+MODES = ('album', 'song', 'comments', 'llm-package')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    mode TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    extractor TEXT NOT NULL DEFAULT 'youtube',
+    playlist_id TEXT,
+    title TEXT,
+    path TEXT,
+    size INTEGER,
+    recorded_at INTEGER NOT NULL,
+    PRIMARY KEY (mode, video_id)
+);
+CREATE INDEX IF NOT EXISTS items_playlist ON items (playlist_id);
+CREATE TABLE IF NOT EXISTS playlists (
+    mode TEXT NOT NULL,
+    playlist_id TEXT NOT NULL,
+    track_count INTEGER,
+    completed_at INTEGER,
+    PRIMARY KEY (mode, playlist_id)
+);
+CREATE TABLE IF NOT EXISTS channel_playlists (
+    channel TEXT NOT NULL,
+    playlist_id TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    PRIMARY KEY (channel, playlist_id)
+);
+"""
+
+# yt-dlp --print-to-file templates producing the lines 'record' reads: one per
+# finished track (after_move), and one per playlist once all of its entries have
+# been processed (playlist). requested_entries lists the indices yt-dlp did not
+# skip; it is left out when none were skipped, and the rest were skipped because
+# the download archive (exported from the library) already has them.
+RECORD_TEMPLATE = "%(id)s\t%(extractor_key)s\t%(playlist_id|)s\t%(n_entries|)s\t%(title)s\t%(filepath)s"
+PLAYLIST_RECORD_TEMPLATE = "playlist\t%(id)s\t%(playlist_count|)s\t%(requested_entries|)j"
+
+VIDEO_ID_PATTERNS = (
+    re.compile(r'[?&]v=([A-Za-z0-9_-]{11})'),
+    re.compile(r'youtu\.be/([A-Za-z0-9_-]{11})'),
+    re.compile(r'/(?:shorts|live|embed)/([A-Za-z0-9_-]{11})'),
+)
+PLAYLIST_ID_PATTERN = re.compile(r'[?&]list=([A-Za-z0-9_-]+)')
+CHANNEL_TAB_PATTERN = re.compile(r'/(?:releases|playlists)$')
+
+# --- Helper Functions ---
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def extract_video_id(url_or_id: str) -> str | None:
+    """Returns the YouTube video id of a URL, or the argument itself if it already is one."""
+    if re.fullmatch(r'[A-Za-z0-9_-]{11}', url_or_id):
+        return url_or_id
+    for pattern in VIDEO_ID_PATTERNS:
+        if match := pattern.search(url_or_id):
+            return match.group(1)
+    return None
+
+def extract_playlist_id(url: str) -> str | None:
+    match = PLAYLIST_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+def channel_key(url: str) -> str:
+    """Normalizes a channel URL so its /releases and /playlists tabs share one sync state."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').removeprefix('www.').removeprefix('m.')
+    return host + CHANNEL_TAB_PATTERN.sub('', parsed.path.rstrip('/'))
+
+def rebase_path(path: str, rebase: tuple[str, str] | None, extension: str | None) -> str:
+    """Maps a staging path to its final destination (used by the audio pipeline)."""
+    if rebase:
+        staging_dir, dest_dir = rebase
+        path = os.path.join(dest_dir, os.path.relpath(path, staging_dir))
+    if extension:
+        path = f"{os.path.splitext(path)[0]}.{extension}"
+    return path
+
+# --- Library Operations ---
+
+def record_item(conn, mode, video_id, path, extractor='youtube', playlist_id=None, title=None):
+    size = os.path.getsize(path) if path and os.path.isfile(path) else None
+    conn.execute(
+        "INSERT OR REPLACE INTO items (mode, video_id, extractor, playlist_id, title, path, size, recorded_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (mode, video_id, extractor, playlist_id or None, title, path, size, int(time.time()))
+    )
+
+def update_playlist(conn, mode, playlist_id, track_count, downloaded=0, archived=0):
+    """
+    Marks a playlist complete once all of its tracks are in the library: either
+    recorded under this playlist, or, for one run, downloaded now or skipped as
+    already archived (such tracks may be recorded under another playlist).
+    """
+    recorded = conn.execute(
+        "SELECT COUNT(*) FROM items WHERE mode = ? AND playlist_id = ?", (mode, playlist_id)
+    ).fetchone()[0]
+    complete = track_count and (recorded >= track_count or downloaded + archived >= track_count)
+    completed_at = int(time.time()) if complete else None
+    conn.execute(
+        "INSERT INTO playlists (mode, playlist_id, track_count, completed_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (mode, playlist_id) DO UPDATE SET track_count = excluded.track_count, "
+        "completed_at = COALESCE(playlists.completed_at, excluded.completed_at)",
+        (mode, playlist_id, track_count, completed_at)
+    )
+
+def parse_playlist_line(fields: list[str]) -> tuple[str, int | None, int]:
+    """A PLAYLIST_RECORD_TEMPLATE line -> (playlist id, track count, number of archived tracks)."""
+    _, playlist_id, count, requested = fields
+    track_count = int(count) if count.isdigit() else None
+    if not requested or not track_count:
+        return playlist_id, track_count, 0
+    try:
+        return playlist_id, track_count, max(0, track_count - len(json.loads(requested)))
+    except (ValueError, TypeError):
+        return playlist_id, track_count, 0
+
+def record_from_file(conn, mode, record_file, rebase=None, extension=None) -> int:
+    """Imports the lines yt-dlp wrote with RECORD_TEMPLATE and PLAYLIST_RECORD_TEMPLATE. Returns the number recorded."""
+    playlists = {}
+    downloaded = {}
+    archived = {}
+    recorded = 0
+    with open(record_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) == 4 and fields[0] == 'playlist':
+                playlist_id, track_count, archived[playlist_id] = parse_playlist_line(fields)
+                playlists[playlist_id] = track_count or playlists.get(playlist_id)
+                continue
+            if len(fields) != 6:
+                continue
+            video_id, extractor, playlist_id, n_entries, title, path = fields
+            path = rebase_path(path, rebase, extension)
+            if not os.path.isfile(path):
+                continue # Failed download or encode; leave it to the next run
+            record_item(conn, mode, video_id, path, extractor.lower() or 'youtube', playlist_id, title)
+            recorded += 1
+            if playlist_id:
+                playlists[playlist_id] = int(n_entries) if n_entries.isdigit() else playlists.get(playlist_id)
+                downloaded.setdefault(playlist_id, set()).add(video_id)
+    for playlist_id, track_count in playlists.items():
+        update_playlist(conn, mode, playlist_id, track_count,
+                        len(downloaded.get(playlist_id, ())), archived.get(playlist_id, 0))
+    conn.commit()
+    return recorded
+
+def lookup(conn, mode, video_id):
+    """Returns the recorded path if the item is in the library and still on disk."""
+    row = conn.execute("SELECT path FROM items WHERE mode = ? AND video_id = ?", (mode, video_id)).fetchone()
+    if row and row[0] and os.path.exists(row[0]):
+        return row[0]
+    return None
+
+def playlist_is_complete(conn, mode, playlist_id) -> bool:
+    row = conn.execute(
+        "SELECT completed_at FROM playlists WHERE mode = ? AND playlist_id = ?", (mode, playlist_id)
+    ).fetchone()
+    return bool(row and row[0])
+
+def filter_playlists(conn, mode, list_path) -> tuple[int, int]:
+    """Removes completed playlists from a URL list file in place. Returns (kept, skipped)."""
+    with open(list_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    kept = []
+    for line in lines:
+        playlist_id = extract_playlist_id(line)
+        if playlist_id and playlist_is_complete(conn, mode, playlist_id):
+            continue
+        kept.append(line)
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write("".join(f"{line}\n" for line in kept))
+    return len(kept), len(lines) - len(kept)
+
+def export_archive(conn, mode, output_path) -> int:
+    """Writes a yt-dlp --download-archive file of the items still on disk."""
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for extractor, video_id, path in conn.execute(
+                "SELECT extractor, video_id, path FROM items WHERE mode = ?", (mode,)):
+            if path and os.path.exists(path):
+                f.write(f"{extractor} {video_id}\n")
+                count += 1
+    return count
+
+def print_rows(rows):
+    for mode, video_id, playlist_id, title, path, size, recorded_at in rows:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(recorded_at))
+        size_text = f"{size / 1e6:.1f} MB" if size else "-"
+        print(f"{when}\t{mode}\t{video_id}\t{playlist_id or '-'}\t{size_text}\t{title or '-'}\t{path or '-'}")
+
+# --- Channel Sync ---
+
+def seen_channel_playlists(conn, channel_url) -> set[str]:
+    """Returns the playlist ids of this channel that earlier syncs have downloaded completely."""
+    return {row[0] for row in conn.execute(
+        "SELECT playlist_id FROM channel_playlists WHERE channel = ?", (channel_key(channel_url),))}
+
+def remember_channel_playlists(conn, channel_url, playlist_ids):
+    now = int(time.time())
+    conn.executemany(
+        "INSERT OR IGNORE INTO channel_playlists (channel, playlist_id, first_seen) VALUES (?, ?, ?)",
+        [(channel_key(channel_url), playlist_id, now) for playlist_id in playlist_ids]
+    )
+    conn.commit()
+
+def remember_completed_playlists(conn, mode, channel_url, playlist_urls) -> int:
+    """
+    Marks the playlists of a crawl as seen for the channel, but only those the
+    library has complete, so a failed, aborted or declined download is offered
+    again by the next sync. Returns the number remembered.
+    """
+    playlist_ids = [pid for pid in map(extract_playlist_id, playlist_urls)
+                    if pid and playlist_is_complete(conn, mode, pid)]
+    remember_channel_playlists(conn, channel_url, playlist_ids)
+    return len(playlist_ids)
+
+def read_crawl_results(list_path, channel_url=None) -> list[tuple[str, list[str]]]:
+    """(channel URL, playlist URLs) pairs of a releases-retriever.py URL list, or of its --batch JSON."""
+    with open(list_path, 'r', encoding='utf-8') as f:
+        if list_path.endswith('.json'):
+            return [(channel['url'], channel['playlists']) for channel in json.load(f).get('channels', [])]
+        return [(channel_url, [line.strip() for line in f if line.strip().startswith(('http://', 'https://'))])]
+
+def forget_channel(conn, channel_url) -> int:
+    cursor = conn.execute("DELETE FROM channel_playlists WHERE channel = ?", (channel_key(channel_url),))
+    conn.commit()
+    return cursor.rowcount
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and update the yt-menu library index.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Library database (default: {DEFAULT_DB}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("record", help="Record downloaded items.")
+    p.add_argument("--mode", required=True, choices=MODES)
+    p.add_argument("--from-file", help="File written by yt-dlp --print-to-file with the record templates.")
+    p.add_argument("--rebase", nargs=2, metavar=("STAGING_DIR", "DEST_DIR"), help="Map staging paths to their destination.")
+    p.add_argument("--ext", help="Replace the file extension of recorded paths (e.g. mp3).")
+    p.add_argument("--id", help="Video URL or id of a single item to record.")
+    p.add_argument("--path", help="Output path of the single item.")
+    p.add_argument("--title", help="Title of the single item.")
+
+    p = subparsers.add_parser("has", help="Exit 0 and print the path if the item is in the library.")
+    p.add_argument("--mode", required=True, choices=MODES)
+    p.add_argument("url", help="Video URL or id, or a playlist URL.")
+
+    p = subparsers.add_parser("filter-playlists", help="Drop completed playlists from a URL list file.")
+    p.add_argument("--mode", default="album", choices=MODES)
+    p.add_argument("list_path")
+
+    p = subparsers.add_parser("export-archive", help="Write a yt-dlp download archive for a mode.")
+    p.add_argument("--mode", required=True, choices=MODES)
+    p.add_argument("output_path")
+
+    p = subparsers.add_parser("video-id", help="Print the video id of a URL.")
+    p.add_argument("url")
+
+    p = subparsers.add_parser("template", help="Print the yt-dlp --print-to-file template used by 'record'.")
+    p.add_argument("--playlist", action="store_true", help="The template of the per-playlist line (for 'playlist:').")
+
+    p = subparsers.add_parser("remember-channel", help="After a download, mark the completed playlists of a crawl as seen.")
+    p.add_argument("--mode", default="album", choices=MODES)
+    p.add_argument("--channel", help="Channel URL the list was crawled from (not needed for a --batch JSON).")
+    p.add_argument("list_path", help="URL list or --batch JSON written by releases-retriever.py.")
+
+    p = subparsers.add_parser("forget-channel", help="Reset the incremental sync state of a channel URL.")
+    p.add_argument("url")
+
+    p = subparsers.add_parser("list", help="List library items, newest first.")
+    p.add_argument("--mode", choices=MODES)
+    p.add_argument("--limit", type=int, default=50)
+
+    p = subparsers.add_parser("search", help="Search titles and paths.")
+    p.add_argument("term")
+    p.add_argument("--mode", choices=MODES)
+    p.add_argument("--limit", type=int, default=50)
+
+    args = parser.parse_args()
+
+    if args.command == "template":
+        print(PLAYLIST_RECORD_TEMPLATE if args.playlist else RECORD_TEMPLATE)
+        return
+    if args.command == "video-id":
+        video_id = extract_video_id(args.url)
+        if not video_id:
+            sys.exit(1)
+        print(video_id)
+        return
+
+    conn = connect(args.db)
+    columns = "mode, video_id, playlist_id, title, path, size, recorded_at"
+
+    if args.command == "record":
+        if args.from_file:
+            recorded = record_from_file(conn, args.mode, args.from_file, args.rebase, args.ext)
+            print(f"Library: recorded {recorded} item(s) as '{args.mode}'.", file=sys.stderr)
+        elif args.id and args.path:
+            video_id = extract_video_id(args.id) or args.id
+            record_item(conn, args.mode, video_id, args.path, title=args.title)
+            conn.commit()
+        else:
+            parser.error("record needs --from-file, or --id and --path")
+
+    elif args.command == "has":
+        playlist_id = extract_playlist_id(args.url)
+        video_id = extract_video_id(args.url)
+        if playlist_id and playlist_is_complete(conn, args.mode, playlist_id):
+            print(playlist_id)
+            return
+        # An album URL stands for the whole playlist, even if it also names one
+        # of its tracks; that track alone does not make the album present.
+        if video_id and not (playlist_id and args.mode == 'album'):
+            path = lookup(conn, args.mode, video_id)
+            if path:
+                print(path)
+                return
+        sys.exit(1)
+
+    elif args.command == "filter-playlists":
+        kept, skipped = filter_playlists(conn, args.mode, args.list_path)
+        print(f"Library: {skipped} completed playlist(s) skipped, {kept} left to download.", file=sys.stderr)
+
+    elif args.command == "export-archive":
+        count = export_archive(conn, args.mode, args.output_path)
+        print(f"Library: {count} known '{args.mode}' item(s) will be skipped.", file=sys.stderr)
+
+    elif args.command == "remember-channel":
+        if not args.list_path.endswith('.json') and not args.channel:
+            parser.error("remember-channel needs --channel for a URL list")
+        for channel_url, playlist_urls in read_crawl_results(args.list_path, args.channel):
+            count = remember_completed_playlists(conn, args.mode, channel_url, playlist_urls)
+            print(f"Library: {count} of {len(playlist_urls)} playlist(s) of {channel_key(channel_url)} completed; "
+                  f"the others are offered again by the next sync.", file=sys.stderr)
+
+    elif args.command == "forget-channel":
+        count = forget_channel(conn, args.url)
+        print(f"Library: forgot {count} playlist(s) of {channel_key(args.url)}; the next sync lists every playlist the library does not have complete.", file=sys.stderr)
+
+    elif args.command == "list":
+        where, params = ("WHERE mode = ?", [args.mode]) if args.mode else ("", [])
+        print_rows(conn.execute(
+            f"SELECT {columns} FROM items {where} ORDER BY recorded_at DESC LIMIT ?", (*params, args.limit)))
+
+    elif args.command == "search":
+        pattern = f"%{args.term}%"
+        where = "WHERE (title LIKE ? OR path LIKE ? OR video_id = ? OR playlist_id = ?)"
+        params = [pattern, pattern, args.term, args.term]
+        if args.mode:
+            where += " AND mode = ?"
+            params.append(args.mode)
+        print_rows(conn.execute(
+            f"SELECT {columns} FROM items {where} ORDER BY recorded_at DESC LIMIT ?", (*params, args.limit)))
+
+if __name__ == "__main__":
+    main()
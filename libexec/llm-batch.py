@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Batch mode of llm-package.sh. Expands a playlist URL or a file of URLs into
+# videos and builds one package per video with a bounded pool of workers. Each
+# worker fetches into its own directory (reusing the metadata cache), picks the
+# subtitle by yt-dlp's language suffix and runs package-builder.py, which reads
+# the metadata from the .info.json. Every result or failure goes into a JSON
+# lines manifest, whose path is printed to STDOUT.
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cache
+import library
+import runreport
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_TEMPLATE = "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s"
+METADATA_KEYS = ("id", "title", "channel", "uploader")
+SUBTITLE_PRIORITIES = ("en-en", "en-orig", "en-US", "en")
+SUBTITLE_ARGS = ["--write-auto-subs", "--sub-langs", "^en(-[a-zA-Z]+)*$", "--sub-format", "json3/vtt/srt/ass/best"]
+
+# --- Helper Functions ---
+
+def read_sources(source: str) -> list[str]:
+    """A file gives one URL per line ('#' comments allowed); anything else is taken as a URL."""
+    if os.path.isfile(source):
+        with open(source, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return [source]
+
+def expand_playlist(url: str, ytdlp_command: list[str]) -> list[str]:
+    """Lists the videos of a playlist as watch URLs without resolving each video (--flat-playlist)."""
+    result = subprocess.run(
+        [*ytdlp_command, "--flat-playlist", "--ignore-config", "--print", "%(id)s", url],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"could not list playlist {url}: {result.stderr.strip()}")
+    return [f"https://www.youtube.com/watch?v={line.strip()}" for line in result.stdout.splitlines() if line.strip()]
+
+def expand_sources(source: str, ytdlp_command: list[str]) -> list[str]:
+    videos = []
+    for url in read_sources(source):
+        if library.extract_playlist_id(url) and not library.extract_video_id(url):
+            print(f"Listing playlist {url}...", file=sys.stderr)
+            videos += expand_playlist(url, ytdlp_command)
+        else:
+            videos.append(url)
+    return list(dict.fromkeys(videos))
+
+def pick_subtitle(subtitle_files: dict[str, str]) -> str | None:
+    """Same preference as the interactive mode: en-en, en-orig, en-US, en, then anything. Keys are 'lang.ext'."""
+    for priority in SUBTITLE_PRIORITIES:
+        for variant, path in subtitle_files.items():
+            if variant.rsplit('.', 1)[0] == priority:
+                return path
+    return next(iter(subtitle_files.values()), None)
+
+def read_metadata(info_json: str) -> dict:
+    """id, title, channel and uploader from a .info.json, streamed so the comments are never loaded into memory."""
+    metadata = {}
+    for key, value in json_restructurer.stream_info_json(info_json, METADATA_KEYS):
+        if key != 'comment':
+            metadata[key] = value
+            if len(metadata) == len(METADATA_KEYS):
+                break
+    return metadata
+
+# --- Worker ---
+
+class BatchJob:
+    def __init__(self, args, ytdlp_command: list[str], builder_args: list[str]):
+        self.args = args
+        self.ytdlp_command = ytdlp_command
+        self.builder_args = builder_args
+        self.library_lock = threading.Lock()
+
+    def fetch(self, video: str, video_id: str | None, work_dir: str, log) -> None:
+        """Restores what the metadata cache has and fetches the rest."""
+        metadata_cache = None
+        missing = ['info', 'subtitle']
+        if video_id and self.args.cache_ttl_hours > 0:
+            metadata_cache = cache.MetadataCache(ttl_hours=self.args.cache_ttl_hours, max_mb=self.args.cache_max_mb)
+            missing = metadata_cache.restore(video_id, missing, work_dir, ['json3', 'vtt', 'srt', 'ass'], link=True)
+        if not missing:
+            return
+        fetch_args = []
+        if 'info' in missing:
+            fetch_args += ["--write-comments", "--write-info-json"]
+        if 'subtitle' in missing:
+            fetch_args += SUBTITLE_ARGS
+        result = subprocess.run(
+            [*self.ytdlp_command, *fetch_args, "--skip-download", "--ignore-config",
+             "--paths", work_dir, "--output", OUTPUT_TEMPLATE, video],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"yt-dlp exited with {result.returncode}")
+        if metadata_cache:
+            metadata_cache.store(video_id, work_dir, missing)
+
+    def build(self, video: str) -> dict:
+        started = time.monotonic()
+        video_id = library.extract_video_id(video)
+        entry = {"url": video, "video_id": video_id}
+        work_dir = tempfile.mkdtemp(prefix="llm-batch.", dir=os.path.join(WORK_DIR, "tmp"))
+        log_path = os.path.join(work_dir, "worker.log")
+        try:
+            with open(log_path, 'w', encoding='utf-8') as log:
+                self.fetch(video, video_id, work_dir, log)
+
+                info_json = None
+                subtitle_files = {}
+                for name in sorted(os.listdir(work_dir)):
+                    if name.endswith('.info.json'):
+                        info_json = os.path.join(work_dir, name)
+                    elif variant := cache.subtitle_variant(name):
+                        subtitle_files[variant] = os.path.join(work_dir, name)
+                if not info_json:
+                    raise RuntimeError("yt-dlp wrote no .info.json")
+
+                command = [sys.executable, os.path.join(WORK_DIR, "libexec", "package-builder.py"),
+                           "--stream", "--info-json", info_json, "--output-dir", self.args.output_dir,
+                           *self.builder_args]
+                subtitle = pick_subtitle(subtitle_files)
+                if subtitle:
+                    command += ["--subtitle", subtitle]
+                result = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=log, text=True)
+                package_path = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+                if result.returncode != 0 or not os.path.isfile(package_path):
+                    raise RuntimeError(f"package-builder.py exited with {result.returncode}")
+
+            metadata = read_metadata(info_json)
+            entry.update(status="ok", package=package_path, video_id=metadata.get('id') or video_id,
+                         title=metadata.get('title'), channel=metadata.get('channel') or metadata.get('uploader'),
+                         transcription=bool(subtitle))
+            with self.library_lock:
+                conn = library.connect()
+                library.record_item(conn, 'llm-package', entry['video_id'] or video, package_path,
+                                    title=metadata.get('title'))
+                conn.commit()
+                conn.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+        except Exception as e:
+            entry.update(status="failed", error=str(e), log=log_path)
+        entry["seconds"] = round(time.monotonic() - started, 1)
+        # Threads share this process, so only wall time is meaningful per video;
+        # the package-builder run reports its own stages.
+        runreport.record("llm-batch.video", status=entry["status"], wall_s=entry["seconds"],
+                         url=video, video_id=entry.get("video_id"), error=entry.get("error"))
+        return entry
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Builds llm-packages for a playlist or a file of URLs with a pool of workers, writes a JSON lines manifest and prints its path. Everything after '--' is the yt-dlp command."
+    )
+    parser.add_argument("source", help="Playlist URL, video URL, or text file with one URL (video or playlist) per line.")
+    parser.add_argument("--output-dir", required=True, help="Directory for the packages and the manifest.")
+    parser.add_argument("--jobs", type=int, default=3, help="Number of videos processed at once (default: 3).")
+    parser.add_argument("--instructions", help="LLM instructions as a JSON object string, passed to package-builder.py.")
+    parser.add_argument("--max-comment-tokens", type=int, help="Passed to package-builder.py.")
+    parser.add_argument("--max-replies", type=int, help="Passed to package-builder.py.")
+    parser.add_argument("--format", choices=('nested', 'compact'), default='nested', help="Package format, passed to package-builder.py.")
+    parser.add_argument("--cache-ttl-hours", type=float, default=24, help="Metadata cache TTL; 0 disables the cache (default: 24).")
+    parser.add_argument("--cache-max-mb", type=float, default=2048, help="Metadata cache size limit (default: 2048).")
+    # The yt-dlp command follows '--'; it is split off first so its options are not parsed.
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+
+    ytdlp_command = argv[split + 1:]
+    if not ytdlp_command:
+        parser.error("the yt-dlp command is missing (give it after '--')")
+    if not os.path.isdir(args.output_dir):
+        print(f"Error: Provided output directory does not exist: {args.output_dir}", file=sys.stderr)
+        sys.exit(1)
+    os.makedirs(os.path.join(WORK_DIR, "tmp"), exist_ok=True)
+
+    builder_args = []
+    if args.instructions:
+        builder_args += ["--instructions", args.instructions]
+    if args.max_comment_tokens is not None:
+        builder_args += ["--max-comment-tokens", str(args.max_comment_tokens)]
+    if args.max_replies is not None:
+        builder_args += ["--max-replies", str(args.max_replies)]
+    builder_args += ["--format", args.format]
+
+    try:
+        videos = expand_sources(args.source, ytdlp_command)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not videos:
+        print(f"Error: No videos found in {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    manifest_path = os.path.join(args.output_dir, f"llm-batch-{time.strftime('%Y%m%d-%H%M%S')}.manifest.jsonl")
+    job = BatchJob(args, ytdlp_command, builder_args)
+    jobs = max(1, args.jobs)
+    print(f"Building {len(videos)} packages with {jobs} parallel workers...", file=sys.stderr, flush=True)
+
+    failed = 0
+    with open(manifest_path, 'w', encoding='utf-8') as manifest, ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(job.build, video) for video in videos]
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = future.result()
+            manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            manifest.flush()
+            if entry["status"] == "ok":
+                print(f"[{done}/{len(videos)}] ok: {entry['title']}", file=sys.stderr, flush=True)
+            else:
+                failed += 1
+                print(f"[{done}/{len(videos)}] FAILED: {entry['url']}: {entry['error']} (log: {entry['log']})", file=sys.stderr, flush=True)
+
+    print(f"{len(videos) - failed} packages built, {failed} failed. Manifest: {manifest_path}", file=sys.stderr)
+    print(manifest_path)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
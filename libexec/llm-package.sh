@@ -5,6 +5,32 @@ if ! command -v jq &> /dev/null; then
     echo "[yt-menu] Error: 'jq' command not found." >&2; exit 1; fi
 
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/directories-config.sh"
+source "$WORK_DIR/lib/library.sh"
+source "$WORK_DIR/lib/cache.sh"
+source "$WORK_DIR/lib/run-report.sh"
+
+# --- ARGUMENTS (BATCH MODE) ---
+# Without arguments the script is interactive. With --batch it builds packages
+# for a playlist URL or a file of URLs without asking anything.
+usage() {
+    echo "Usage: $(basename "$0") [--batch PLAYLIST_URL|URL_FILE [--prompt NAME]... [--custom-prompt TEXT] [--jobs N]]"
+    echo "  --prompt takes the names from the prompt menu, e.g. --prompt \"Impartial Summary\"."
+}
+batch_source=""
+batch_jobs=$(get_config_default "LLM_PACKAGE_BATCH_JOBS" "3")
+batch_prompts=()
+custom_prompt=""
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --batch) batch_source="$2"; shift 2 ;;
+        --prompt) batch_prompts+=("$2"); shift 2 ;;
+        --custom-prompt) custom_prompt="$2"; shift 2 ;;
+        --jobs) batch_jobs="$2"; shift 2 ;;
+        -h|--help) usage; exit 0 ;;
+        *) echo "[yt-menu] Error: Unknown argument '$1'." >&2; usage >&2; exit 1 ;;
+    esac
+done
 
 # --- CONFIGURATION & URL INPUT ---
 config_file="$WORK_DIR/config/yt-comments.cfg"
@@ -35,17 +61,156 @@ fi
 
 # --- URL INPUT MODIFICATION ---
 prompt_menu_requested=false
-printf "Enter URL for download. Append \"+\" for prompt menu. Confirm with Enter: "
-read -r url_input
-if [[ "$url_input" == *+ ]]; then
-    prompt_menu_requested=true
-    url="${url_input%+}"
-else
-    url="$url_input"
+if [ -z "$batch_source" ]; then
+    printf "Enter URL for download. Append \"+\" for prompt menu. Confirm with Enter: "
+    read -r url_input
+    if [[ "$url_input" == *+ ]]; then
+        prompt_menu_requested=true
+        url="${url_input%+}"
+    else
+        url="$url_input"
+    fi
+
+    if [ -z "$url" ]; then
+        echo "[yt-menu] Error: URL cannot be empty." >&2; exit 1;
+    fi
+
+    # Packaging a video again is legitimate (e.g. with other prompts), so ask.
+    if ! library_confirm_refetch llm-package "$url"; then
+        echo "[yt-menu] Skipped."; exit 0;
+    fi
 fi
 
-if [ -z "$url" ]; then
-    echo "[yt-menu] Error: URL cannot be empty." >&2; exit 1;
+
+# Menu Definition: Category|Menu Text|Prompt Payload
+menu_items=(
+    "FORMAT|Plain Text|Any analysis of this json object must be formatted in pure plain-text only."
+    "FORMAT|Markdown Spreadsheet|Wherein reasonable and applicable any analysis of this json object must be structured as a Markdown spreadsheet."
+    "TONE|Brilliant & Disagreeable|Any analysis of this json object must have the tone and timbre of that of a virtuous and brilliant mind. It does not care for convention and seeks the truth. Low agreeability. Kind-hearted and severe. Assumes audience is very intelligent. Does not casually or needlessly expound. Keeps it tight. Does not omit anything of interest or pertinence. Has an advanced sense of when to answer tersely and when not to hold anything back."
+    "TASK|Answer the Question|Provide a pithy answer to any clickbait posed in the title or deduced from description, transcription or comments below."
+    "TASK|Impartial Summary|Provide an accurate, impartial and dense summary of the core message intended for a knowledgeable and time-constrained audience. It's paramount to simply report the content which is being relayed in the transcription material. Do not embroider, comment on, edit, sanction, opinionize. We are as clear glass, a Buddha mind, there is nothing new under the Sun, and there is never a reason to be upset, or anxious, or small."
+    "TASK|Brutal Critique|Identify the primary thesis, and smaller supporting points, of the video and brutally criticize it. Construct a fair representation of the arguments made and proceed to disassemble them with surgical precision, focusing on the weakest points, but not over-extending the attack but keeping a balanced center."
+    "TASK|Explore Further|Extract and collate concrete and actionable intelligence and _build upon it_. In the first instance, include everthing noteworthy from the material at hand with a special consideration to anything actionable. In the second phase (which need not be explicitly structured as such), apply your own discrete and brilliant interpretation and tidbits and clues regarding where to go for further investigate. Structure for maximum utility and immediate application."
+    "TASK|Comments Briefing|Process the comments to provide a valuable briefing. We are interested in the gist of what is said, as well as what the most erudite and elegant comments and discussions bring to the table in this conversation. Use your own judgement regarding how to structure and angle the report. You may detail relevant trends of agreement or disagreement or common points of confusion. It may be beneficial to include a some (or many!) _high-value_ comments verbatim in the report. Do not omit anything of pertinence. Finally but crucially, it is very important to include an estimation of what commenters feel about the subject matter. The preferred way is a graph showing approximate percentages of users expressing differnet attitudes."
+    "CUSTOM|Custom Prompt|-"
+)
+
+# State variables
+selected_formatting_name=""
+selected_formatting_prompt=""
+selected_tone_name=""
+selected_tone_prompt=""
+declare -A selected_tasks
+
+# --- Function: select_prompt ---
+# Applies a menu item to the selection: FORMAT and TONE replace, TASK toggles.
+select_prompt() {
+    local category="$1" name="$2" prompt="$3"
+    case "$category" in
+        FORMAT)
+            selected_formatting_name="$name"; selected_formatting_prompt="$prompt" ;;
+        TONE)
+            selected_tone_name="$name"; selected_tone_prompt="$prompt" ;;
+        TASK)
+            if [[ -v "selected_tasks[$name]" ]]; then unset "selected_tasks[$name]"; else selected_tasks["$name"]="$prompt"; fi ;;
+    esac
+}
+
+# --- Function: assemble_llm_instructions ---
+# Turns the selected_* variables and custom_prompt into the instructions object
+# for package-builder.py. Sets llm_instructions_json (empty if nothing is selected).
+assemble_llm_instructions() {
+    echo "[yt-menu] -----------------------------------------------------"
+    echo "[yt-menu] Assembling LLM instructions with new format..."
+
+    # 1. Format the single-selection prompts (Format and Tone)
+    local formatted_format_prompt=""
+    if [ -n "$selected_formatting_name" ]; then
+        formatted_format_prompt=" * ${selected_formatting_name}: ${selected_formatting_prompt}"
+    fi
+
+    local formatted_tone_prompt=""
+    if [ -n "$selected_tone_name" ]; then
+        formatted_tone_prompt=" * ${selected_tone_name}: ${selected_tone_prompt}"
+    fi
+
+    # 2. Format the multi-selection prompts (Tasks) and build a JSON array
+    local tasks_json_array="[]" name
+    if [ ${#selected_tasks[@]} -gt 0 ]; then
+        formatted_task_prompts_for_jq=()
+        for name in "${!selected_tasks[@]}"; do
+            prompt="${selected_tasks[$name]}"
+            formatted_string=" * ${name}: ${prompt}"
+            # Add the formatted string to a temporary bash array
+            formatted_task_prompts_for_jq+=("$formatted_string")
+        done
+        # Use jq to safely convert the bash array into a JSON array string
+        tasks_json_array=$(jq -n --compact-output '[$ARGS.positional]' --args "${formatted_task_prompts_for_jq[@]}")
+    fi
+
+    # 3. Use jq to construct the final instructions object from the newly formatted shell variables.
+    #    The custom prompt is used as-is.
+    llm_instructions_json=$(report_stage llm-package.instructions -- jq -n \
+        --arg format "$formatted_format_prompt" \
+        --arg tone "$formatted_tone_prompt" \
+        --argjson tasks "$tasks_json_array" \
+        --arg custom "$custom_prompt" \
+        '{
+            "text-formatting": $format,
+            "tone-and-timbre": $tone,
+            "essential-tasks-instructions-considerations": $tasks,
+            "high-priority-instruction": $custom
+        } | with_entries(select(.value | IN("", [], null) | not))')
+
+    if [ -z "$llm_instructions_json" ] || [ "$llm_instructions_json" == "{}" ]; then
+        echo "[yt-menu] No LLM instructions were selected. Skipping injection."
+        llm_instructions_json=""
+    else
+        echo "[yt-menu] LLM instructions assembled successfully."
+    fi
+}
+
+# --- BATCH MODE ---
+if [ -n "$batch_source" ]; then
+    for prompt_name in "${batch_prompts[@]}"; do
+        found=false
+        for item in "${menu_items[@]}"; do
+            IFS='|' read -r category name prompt <<< "$item"
+            if [ "$category" != "CUSTOM" ] && [ "$name" == "$prompt_name" ]; then
+                select_prompt "$category" "$name" "$prompt"; found=true; break
+            fi
+        done
+        if [ "$found" = false ]; then
+            echo "[yt-menu] Error: Unknown prompt '$prompt_name'. Available prompts:" >&2
+            for item in "${menu_items[@]}"; do
+                IFS='|' read -r category name _ <<< "$item"
+                [ "$category" != "CUSTOM" ] && echo "  $name" >&2
+            done
+            exit 1
+        fi
+    done
+    llm_instructions_json=""
+    if [ ${#batch_prompts[@]} -gt 0 ] || [ -n "$custom_prompt" ]; then
+        assemble_llm_instructions
+    fi
+
+    batch_args=(--output-dir "$comments_basedir" --jobs "$batch_jobs")
+    if [ -n "$llm_instructions_json" ]; then
+        batch_args+=(--instructions "$llm_instructions_json")
+    fi
+    comment_token_budget=$(get_config_default "LLM_PACKAGE_COMMENT_TOKENS" "")
+    max_replies=$(get_config_default "LLM_PACKAGE_MAX_REPLIES" "")
+    [ -n "$comment_token_budget" ] && batch_args+=(--max-comment-tokens "$comment_token_budget")
+    [ -n "$max_replies" ] && batch_args+=(--max-replies "$max_replies")
+    batch_args+=(--format "$(get_config_default "LLM_PACKAGE_FORMAT" "nested")")
+    batch_args+=(
+        --cache-ttl-hours "$(get_config_default "CACHE_TTL_HOURS" "24")"
+        --cache-max-mb "$(get_config_default "CACHE_MAX_MB" "2048")"
+    )
+
+    echo "[yt-menu] Batch mode: building packages for $batch_source"
+    report_stage llm-package.batch -- "$VENV_PYTHON" "$WORK_DIR/libexec/llm-batch.py" "$batch_source" "${batch_args[@]}" -- "${YTDLP_COMMAND_ARRAY[@]}"
+    exit $?
 fi
 
 
@@ -63,26 +228,6 @@ if [ "$prompt_menu_requested" = true ]; then
     B_WHITE='\e[1;37m'
     CYAN='\e[0;36m'
 
-    # Menu Definition: Category|Menu Text|Prompt Payload
-    menu_items=(
-        "FORMAT|Plain Text|Any analysis of this json object must be formatted in pure plain-text only."
-        "FORMAT|Markdown Spreadsheet|Wherein reasonable and applicable any analysis of this json object must be structured as a Markdown spreadsheet."
-        "TONE|Brilliant & Disagreeable|Any analysis of this json object must have the tone and timbre of that of a virtuous and brilliant mind. It does not care for convention and seeks the truth. Low agreeability. Kind-hearted and severe. Assumes audience is very intelligent. Does not casually or needlessly expound. Keeps it tight. Does not omit anything of interest or pertinence. Has an advanced sense of when to answer tersely and when not to hold anything back."
-        "TASK|Answer the Question|Provide a pithy answer to any clickbait posed in the title or deduced from description, transcription or comments below."
-        "TASK|Impartial Summary|Provide an accurate, impartial and dense summary of the core message intended for a knowledgeable and time-constrained audience. It's paramount to simply report the content which is being relayed in the transcription material. Do not embroider, comment on, edit, sanction, opinionize. We are as clear glass, a Buddha mind, there is nothing new under the Sun, and there is never a reason to be upset, or anxious, or small."
-        "TASK|Brutal Critique|Identify the primary thesis, and smaller supporting points, of the video and brutally criticize it. Construct a fair representation of the arguments made and proceed to disassemble them with surgical precision, focusing on the weakest points, but not over-extending the attack but keeping a balanced center."
-        "TASK|Explore Further|Extract and collate concrete and actionable intelligence and _build upon it_. In the first instance, include everthing noteworthy from the material at hand with a special consideration to anything actionable. In the second phase (which need not be explicitly structured as such), apply your own discrete and brilliant interpretation and tidbits and clues regarding where to go for further investigate. Structure for maximum utility and immediate application."
-        "TASK|Comments Briefing|Process the comments to provide a valuable briefing. We are interested in the gist of what is said, as well as what the most erudite and elegant comments and discussions bring to the table in this conversation. Use your own judgement regarding how to structure and angle the report. You may detail relevant trends of agreement or disagreement or common points of confusion. It may be beneficial to include a some (or many!) _high-value_ comments verbatim in the report. Do not omit anything of pertinence. Finally but crucially, it is very important to include an estimation of what commenters feel about the subject matter. The preferred way is a graph showing approximate percentages of users expressing differnet attitudes."
-        "CUSTOM|Custom Prompt|-"
-    )
-
-    # State variables
-    selected_formatting_name=""
-    selected_formatting_prompt=""
-    selected_tone_name=""
-    selected_tone_prompt=""
-    declare -A selected_tasks
-    custom_prompt=""
 
     while true; do
         clear
@@ -127,7 +272,11 @@ if [ "$prompt_menu_requested" = true ]; then
         echo ""
 
         printf "${B_WHITE}Choice: ${NC}"
-        read -r -n 1 choice
+        if ! read -r -n 1 choice; then
+            echo "" >&2
+            echo "[yt-menu] Error: The prompt menu needs a terminal, but stdin ended. Aborting." >&2
+            exit 1
+        fi
 
         if [[ "$choice" == "d" || "$choice" == "D" ]]; then break; fi
         if ! [[ "$choice" =~ ^[0-9]+$ ]] || [ "$choice" -lt 1 ] || [ "$choice" -gt "${#menu_items[@]}" ]; then continue; fi
@@ -136,12 +285,8 @@ if [ "$prompt_menu_requested" = true ]; then
         IFS='|' read -r category name prompt <<< "${menu_items[$index]}"
 
         case "$category" in
-            FORMAT)
-                selected_formatting_name="$name"; selected_formatting_prompt="$prompt" ;;
-            TONE)
-                selected_tone_name="$name"; selected_tone_prompt="$prompt" ;;
-            TASK)
-                if [[ -v "selected_tasks[$name]" ]]; then unset "selected_tasks[$name]"; else selected_tasks["$name"]="$prompt"; fi ;;
+            FORMAT|TONE|TASK)
+                select_prompt "$category" "$name" "$prompt" ;;
             CUSTOM)
                 echo -e "\n\n${B_WHITE}Enter your custom multi-line prompt. End with 'EOF' on a new line:${NC}"
                 line=""
@@ -157,55 +302,7 @@ if [ "$prompt_menu_requested" = true ]; then
         esac
     done
 
-    # --- ASSEMBLE LLM INSTRUCTIONS (MODIFIED FOR NEW FORMAT) ---
-    echo "[yt-menu] -----------------------------------------------------"
-    echo "[yt-menu] Assembling LLM instructions with new format..."
-
-    # 1. Format the single-selection prompts (Format and Tone)
-    formatted_format_prompt=""
-    if [ -n "$selected_formatting_name" ]; then
-        formatted_format_prompt=" * ${selected_formatting_name}: ${selected_formatting_prompt}"
-    fi
-
-    formatted_tone_prompt=""
-    if [ -n "$selected_tone_name" ]; then
-        formatted_tone_prompt=" * ${selected_tone_name}: ${selected_tone_prompt}"
-    fi
-
-    # 2. Format the multi-selection prompts (Tasks) and build a JSON array
-    tasks_json_array="[]"
-    if [ ${#selected_tasks[@]} -gt 0 ]; then
-        formatted_task_prompts_for_jq=()
-        for name in "${!selected_tasks[@]}"; do
-            prompt="${selected_tasks[$name]}"
-            formatted_string=" * ${name}: ${prompt}"
-            # Add the formatted string to a temporary bash array
-            formatted_task_prompts_for_jq+=("$formatted_string")
-        done
-        # Use jq to safely convert the bash array into a JSON array string
-        tasks_json_array=$(jq -n --compact-output '[$ARGS.positional]' --args "${formatted_task_prompts_for_jq[@]}")
-    fi
-
-    # 3. Use jq to construct the final instructions object from the newly formatted shell variables.
-    #    The custom prompt is used as-is.
-    llm_instructions_json=$(jq -n \
-        --arg format "$formatted_format_prompt" \
-        --arg tone "$formatted_tone_prompt" \
-        --argjson tasks "$tasks_json_array" \
-        --arg custom "$custom_prompt" \
-        '{
-            "text-formatting": $format,
-            "tone-and-timbre": $tone,
-            "essential-tasks-instructions-considerations": $tasks,
-            "high-priority-instruction": $custom
-        } | with_entries(select(.value | IN("", [], null) | not))')
-
-    if [ -z "$llm_instructions_json" ] || [ "$llm_instructions_json" == "{}" ]; then
-        echo "[yt-menu] No LLM instructions were selected. Skipping injection."
-        llm_instructions_json=""
-    else
-        echo "[yt-menu] LLM instructions assembled successfully."
-    fi
+    assemble_llm_instructions
 fi
 
 # --- END OF MENU ---
@@ -226,8 +323,27 @@ trap cleanup EXIT
 # --- DOWNLOAD ASSETS ---
 echo "[yt-menu] -----------------------------------------------------"
 echo "[yt-menu] Downloading assets to temporary directory: $tmp_dir"
-"${YTDLP_COMMAND_ARRAY[@]}" --write-comments --write-info-json --write-description --write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" --sub-format "srt/ass/best" --skip-download --ignore-config --paths "$tmp_dir" --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" "$url"
-if [ $? -ne 0 ]; then echo "[yt-menu] Error: yt-dlp exited with a non-zero status. Aborting." >&2; exit 1; fi
+# Reuse a recent .info.json (with comments) and subtitle from the metadata
+# cache; only what is missing is fetched. $tmp_dir is private and removed at
+# the end, so the cached files are hard-linked rather than copied.
+CACHE_SUB_FORMATS="json3,vtt,srt,ass"
+CACHE_LINK=1
+cache_restore "$url" "$tmp_dir" info subtitle
+fetch_args=()
+if cache_missing info; then
+    fetch_args+=(--write-comments --write-info-json)
+fi
+if cache_missing subtitle; then
+    fetch_args+=(--write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" --sub-format "json3/vtt/srt/ass/best")
+fi
+if [ ${#fetch_args[@]} -gt 0 ]; then
+    report_stage llm-package.yt-dlp --output "$tmp_dir" -- \
+        "${YTDLP_COMMAND_ARRAY[@]}" "${fetch_args[@]}" --skip-download --ignore-config --paths "$tmp_dir" --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" "$url"
+    if [ $? -ne 0 ]; then echo "[yt-menu] Error: yt-dlp exited with a non-zero status. Aborting." >&2; exit 1; fi
+    cache_store "$tmp_dir"
+else
+    echo "[yt-menu] All assets reused from the metadata cache."
+fi
 echo "[yt-menu] -----------------------------------------------------"
 
 mapfile -t all_created_files < <(find "$tmp_dir" -type f)
@@ -238,44 +354,12 @@ for file in "${all_created_files[@]}"; do if [[ "$file" == *.info.json ]]; then
 if [ -z "$info_json_file" ]; then echo "[yt-menu] Error: Could not find the .info.json file." >&2; exit 1; fi
 
 base_filename="${info_json_file%.info.json}"
-description_file="$base_filename.description"
-
-# --- PARSE FILENAME FOR METADATA ---
-echo "[yt-menu] Parsing filename for metadata..."
-fname_no_path=$(basename "$base_filename")
-id_and_date_part="${fname_no_path##* \[}"
-channel_and_title_part="${fname_no_path%% \[*}"
-video_id="${id_and_date_part%%\]*}"
-upload_date="${id_and_date_part##*.}"
-channel="${channel_and_title_part%% - *}"
-video_title="${channel_and_title_part#* - }"
-video_url="https://www.youtube.com/watch?v=${video_id}"
-echo "[yt-menu]   -> Channel: $channel"
-echo "[yt-menu]   -> Title: $video_title"
-echo "[yt-menu]   -> ID: $video_id"
-echo "[yt-menu]   -> Date: $upload_date"
-echo "[yt-menu] -----------------------------------------------------"
-
-# --- RESTRUCTURE COMMENTS VIA PYTHON ---
-echo "[yt-menu] Restructuring comments into a threaded format..."
-python_script_path="$WORK_DIR/libexec/json-restructurer.py"
-stderr_file=$(mktemp)
-threaded_comments_file=$("$VENV_PYTHON" "$python_script_path" "$info_json_file" 2> "$stderr_file")
-if [ $? -ne 0 ]; then
-    echo "[yt-menu] Error: Python script exited." >&2
-    echo "[yt-menu] Python stderr: $(<"$stderr_file")" >&2
-fi; rm "$stderr_file"
-if [ -n "$threaded_comments_file" ] && [ -f "$threaded_comments_file" ]; then
-    echo "[yt-menu] SUCCESS: Threaded comments file created at '$threaded_comments_file'"; rm "$info_json_file"
-else
-    echo "[yt-menu] FAILURE: Threaded comments file was NOT created."; threaded_comments_file=""
-fi
 echo "[yt-menu] -----------------------------------------------------"
 
 # --- SELECT BEST SUBTITLE ---
 echo "[yt-menu] Selecting best subtitle..."
 shopt -s nullglob
-all_sub_files=("$base_filename".*.{srt,ass})
+all_sub_files=("$base_filename".*.{json3,vtt,srt,ass})
 shopt -u nullglob
 best_sub_file=""
 if [ ${#all_sub_files[@]} -gt 0 ]; then
@@ -295,91 +379,37 @@ else
     echo "[yt-menu] No preferred subtitle file found."
 fi
 echo "[yt-menu] -----------------------------------------------------"
-# --- PROCESS TRANSCRIPTION (FORMAT-AWARE) ---
-structured_transcription_file=""
+# --- BUILD FINAL LLM PACKAGE ---
+# package-builder.py restructures the comments, structures the transcription and
+# writes the final package in one interpreter, straight into the base directory.
+echo "[yt-menu] Building final LLM JSON package (comments, transcription, description)..."
+builder_args=(--stream --info-json "$info_json_file" --output-dir "$comments_basedir")
 if [ -n "$best_sub_file" ]; then
-    echo "[yt-menu] Processing transcription into structured format..."
-
-    case "$best_sub_file" in
-        *.srt)
-            echo "[yt-menu]   -> Detected SRT format. Using srt-processor.py."
-            python_script_path="$WORK_DIR/libexec/srt-processor.py"
-            structured_transcription_file=$("$VENV_PYTHON" "$python_script_path" "$best_sub_file")
-            ;;
-        *.ass)
-            echo "[yt-menu]   -> Detected ASS format. Using ass-processor.py."
-            python_script_path="$WORK_DIR/libexec/ass-processor.py"
-            structured_transcription_file=$("$VENV_PYTHON" "$python_script_path" "$best_sub_file")
-            ;;
-        *)
-            echo "[yt-menu]   -> Warning: Unsupported subtitle format for structuring: $(basename "$best_sub_file")" >&2
-            ;;
-    esac
-
-    if [ ! -s "$structured_transcription_file" ]; then
-        echo "[yt-menu]   -> Warning: Python processor failed to create a valid structured file." >&2
-        structured_transcription_file=""
-    else
-        echo "[yt-menu]   -> Successfully created structured transcription file."
-    fi
+    builder_args+=(--subtitle "$best_sub_file")
 fi
-echo "[yt-menu] -----------------------------------------------------"
-
-# --- AGGREGATE FINAL LLM PACKAGE ---
-echo "[yt-menu] Aggregating all data into a final LLM JSON package..."
-package_basename=$(basename "${base_filename}.llm-package.json")
-temp_package_path="$tmp_dir/$package_basename"
-
-jq_command_args=()
-jq_filter_parts=()
-
-# 1. Conditionally add START instructions.
 if [ -n "$llm_instructions_json" ]; then
-    jq_command_args+=(--argjson instructions "$llm_instructions_json")
-    jq_filter_parts+=('"llm_instructions_start": $instructions')
+    builder_args+=(--instructions "$llm_instructions_json")
 fi
-
-# 2. Add the static metadata key.
-jq_command_args+=(--arg title "$video_title" --arg channel "$channel" --arg video_id "$video_id" --arg upload_date "$upload_date" --arg video_url "$video_url")
-jq_filter_parts+=('"metadata": {"title": $title, "channel": $channel, "video_id": $video_id, "upload_date": $upload_date, "url": $video_url}')
-
-# 3. Conditionally add the other data keys.
-if [ -f "$description_file" ]; then
-    jq_command_args+=(--rawfile description_data "$description_file")
-    jq_filter_parts+=('"description": $description_data')
-fi
-
-if [ -n "$structured_transcription_file" ]; then
-    jq_command_args+=(--slurpfile transcription_data "$structured_transcription_file")
-    jq_command_args+=(--arg transcription_format_desc "The transcription is an array where each element is [startTime, endTime, text].")
-    jq_filter_parts+=('"transcription": {"format_description": $transcription_format_desc, "data": $transcription_data[0]}')
+# Optional comment budget from config/yt-menu.cfg. Empty keeps every comment.
+comment_token_budget=$(get_config_default "LLM_PACKAGE_COMMENT_TOKENS" "")
+max_replies=$(get_config_default "LLM_PACKAGE_MAX_REPLIES" "")
+if [ -n "$comment_token_budget" ]; then
+    echo "[yt-menu]   -> Limiting comments to about $comment_token_budget tokens."
+    builder_args+=(--max-comment-tokens "$comment_token_budget")
 fi
-
-if [ -n "$threaded_comments_file" ]; then
-    jq_command_args+=(--slurpfile comments_data "$threaded_comments_file")
-    jq_filter_parts+=('"comments": $comments_data[0]')
+if [ -n "$max_replies" ]; then
+    builder_args+=(--max-replies "$max_replies")
 fi
-
-# FINAL JQ EXECUTION
-if [ ${#jq_filter_parts[@]} -gt 0 ]; then
-    base_jq_filter="{$(IFS=,; echo "${jq_filter_parts[*]}")}"
-    final_jq_filter="$base_jq_filter"
-
-    if [ -n "$llm_instructions_json" ]; then
-        final_jq_filter="$base_jq_filter | {llm_instructions_start, metadata} + . | . + {llm_instructions_end: \$instructions}"
-    fi
-
-    jq -n "${jq_command_args[@]}" "$final_jq_filter" > "$temp_package_path"
-
-    if [ $? -eq 0 ] && [ -s "$temp_package_path" ]; then
-        final_destination_path="$comments_basedir/$package_basename"
-        echo "[yt-menu] Successfully created package, moving to: $final_destination_path"
-        mv "$temp_package_path" "$final_destination_path"
-    else
-        echo "[yt-menu] Error: Failed to create JSON package. JQ exited with an error." >&2; exit 1;
-    fi
+# "compact" stores comments as columnar arrays with a schema descriptor; see data/config.defaults.
+package_format=$(get_config_default "LLM_PACKAGE_FORMAT" "nested")
+builder_args+=(--format "$package_format")
+
+final_destination_path=$(report_stage llm-package.build -- "$VENV_PYTHON" "$WORK_DIR/libexec/package-builder.py" "${builder_args[@]}")
+if [ $? -eq 0 ] && [ -s "$final_destination_path" ]; then
+    echo "[yt-menu] Successfully created package: $final_destination_path"
+    library_record llm-package "$url" "$final_destination_path"
 else
-    echo "[yt-menu] No data sources found to aggregate. Skipping package creation."
+    echo "[yt-menu] Error: Failed to create JSON package. package-builder.py exited with an error." >&2; exit 1;
 fi
 echo "[yt-menu] -----------------------------------------------------"
 echo "[yt-menu] All workflows complete."
@@ -5,6 +5,8 @@
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 # The path is relative to this script's location.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/library.sh"
+source "$WORK_DIR/lib/cache.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/subs.cfg"
@@ -40,35 +42,53 @@ fi
 printf "Enter URL for download of comments/description: "
 read -r url
 
-# --- Download and Capture Filename ---
-# We no longer need the timestamping method. We will capture the exact filename from yt-dlp.
-echo "Downloading comments and description to $comments_basedir"
+if ! library_confirm_refetch comments "$url"; then
+    echo "Skipped."
+    exit 0
+fi
 
-# The `info_json_file=$(...)` syntax captures the standard output of the command into the variable.
-# yt-dlp progress bars are printed to stderr, so they won't be captured.
-info_json_file=$("${YTDLP_COMMAND_ARRAY[@]}" \
-    --write-comments \
-    --write-info-json \
-    --write-description \
-    --skip-download \
-    --ignore-config \
-    --paths "$comments_basedir" \
-    --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" \
-    --print "after_move:%(info_dict.filepath)s" \ # <-- SLIGHTLY MORE ROBUST PRINT??
-    "$url")
+# --- Download or Restore from Cache ---
+# A recent .info.json (with comments) and description are reused from the
+# metadata cache; only what is missing is fetched.
+echo "Downloading comments and description to $comments_basedir"
+mkdir -p "$WORK_DIR/tmp"
+run_marker=$(mktemp "$WORK_DIR/tmp/minimized-comments.XXXXXX")
+cache_restore "$url" "$comments_basedir" info description
+fetch_args=()
+if cache_missing info; then
+    fetch_args+=(--write-comments --write-info-json)
+fi
+if cache_missing description; then
+    fetch_args+=(--write-description)
+fi
+if [ ${#fetch_args[@]} -gt 0 ]; then
+    if ! "${YTDLP_COMMAND_ARRAY[@]}" \
+        "${fetch_args[@]}" \
+        --skip-download \
+        --ignore-config \
+        --paths "$comments_basedir" \
+        --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" \
+        "$url"; then
+        echo "Error: yt-dlp exited with a non-zero status. Download may have failed." >&2
+        rm -f "$run_marker"
+        exit 1
+    fi
+    cache_store "$comments_basedir"
+fi
 
 # --- Post-Download Processing ---
 echo "-----------------------------------------------------"
 
-# Check if yt-dlp returned a filename. If not, it likely failed.
-if [ -z "$info_json_file" ]; then
-    echo "Error: yt-dlp did not return a filename. Download may have failed." >&2
-    exit 1
+# Find the .info.json by video id; for URLs without a recognizable id, take the one just written.
+if [ -n "$CACHE_VIDEO_ID" ]; then
+    info_json_file=$(find "$comments_basedir" -maxdepth 1 -type f -name "*\[$CACHE_VIDEO_ID\]*.info.json" -print -quit)
+else
+    info_json_file=$(find "$comments_basedir" -maxdepth 1 -type f -name "*.info.json" -newer "$run_marker" -print -quit)
 fi
+rm -f "$run_marker"
 
-# Check if the file actually exists, just in case.
-if [ ! -f "$info_json_file" ]; then
-    echo "Error: The file reported by yt-dlp does not exist: $info_json_file" >&2
+if [ -z "$info_json_file" ] || [ ! -f "$info_json_file" ]; then
+    echo "Error: No .info.json was written. Download may have failed." >&2
     exit 1
 fi
 
@@ -78,10 +98,11 @@ echo "File created: $info_json_file"
 echo "Executing JSON minimization script..."
 
 # Execute the python script with the single correct argument (the input file).
-"$VENV_PYTHON" "$python_script_path" "$info_json_file"
+"$VENV_PYTHON" "$python_script_path" --stream "$info_json_file"
 
 if [ $? -eq 0 ]; then
     echo "Script execution successful."
+    library_record comments "$url" "${info_json_file%.json}.comments_threaded.json"
 else
     echo "Warning: JSON minimization script failed with an error." >&2
 fi
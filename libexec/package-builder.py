@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Builds the final .llm-package.json in a single process. The comment and
+# subtitle processors are imported instead of being launched as separate
+# interpreters, and no intermediate JSON files are written or re-read.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import runreport
+import subtitles
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+TRANSCRIPTION_FORMAT_DESC = {
+    'ms': "The transcription is an array where each element is [startMs, endMs, text], with times in milliseconds from the start of the video.",
+    'clock': "The transcription is an array where each element is [startTime, endTime, text].",
+}
+
+# Placed at the top of compact packages, before any data, so a reader can decode it.
+COMPACT_SCHEMA = {
+    'format': 'compact',
+    'version': 1,
+    'transcription': "transcription is an array where each element is [startMs, endMs, text], "
+                     "with times as integer milliseconds from the start of the video.",
+    'comments': json_restructurer.COMPACT_COMMENTS_DESC,
+}
+
+# Top-level .info.json keys the package needs besides the comments.
+INFO_KEYS = ('id', 'title', 'channel', 'uploader', 'upload_date', 'webpage_url', 'description')
+
+# --- Package Assembly ---
+
+def build_metadata(info):
+    """Extracts the package metadata from the yt-dlp info dict."""
+    video_id = info.get('id')
+    return {
+        'title': info.get('title'),
+        'channel': info.get('channel') or info.get('uploader'),
+        'video_id': video_id,
+        'upload_date': info.get('upload_date'),
+        'url': info.get('webpage_url') or f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+def structure_transcription(subtitle_text, subtitle_ext, time_format='ms'):
+    """Hands subtitle text to the subtitle engine's parser for its format."""
+    if subtitle_ext in subtitles.PARSERS:
+        return subtitles.structure_subtitle_text(subtitle_text, subtitle_ext, time_format)
+    print(f"Warning: Unsupported subtitle format for structuring: .{subtitle_ext}", file=sys.stderr)
+    return []
+
+def read_info_streaming(info_json_path, max_chars=None, max_replies=None, output_format='nested'):
+    """
+    Streams the .info.json, keeping only INFO_KEYS and compact comment records.
+    Returns the reduced info dict, the threaded comments and the number of
+    comments read.
+    """
+    info = {}
+    records = []
+    for key, value in json_restructurer.stream_info_json(info_json_path, INFO_KEYS):
+        if key == 'comment':
+            records.append(json_restructurer.CommentRecord(value))
+        else:
+            info[key] = value
+    comments = json_restructurer.thread_records(records, max_chars, max_replies, output_format)
+    return info, comments, len(records)
+
+def build_llm_package(info, subtitle_text=None, subtitle_ext=None, instructions=None,
+                      comments=None, comment_total=None, max_chars=None, max_replies=None,
+                      time_format='ms', output_format='nested'):
+    """
+    Assembles the package dict from the in-memory info dict and subtitle text.
+    Key order matches the former jq aggregation: start instructions, metadata,
+    description, transcription, comments and finally the end instructions.
+    Already threaded comments may be passed in; otherwise they are
+    restructured from info['comments'], within max_chars/max_replies if given.
+    The compact format adds the schema after the start instructions, always
+    uses millisecond times and stores the comments as columnar arrays.
+    """
+    compact = output_format == 'compact'
+    if compact:
+        time_format = 'ms'
+    package = {}
+    if instructions:
+        package['llm_instructions_start'] = instructions
+    if compact:
+        package['schema'] = COMPACT_SCHEMA
+
+    package['metadata'] = build_metadata(info)
+
+    if info.get('description') is not None:
+        package['description'] = info['description']
+
+    if subtitle_text:
+        with runreport.stage("package-builder.transcription", format=subtitle_ext) as fields:
+            transcription = structure_transcription(subtitle_text, subtitle_ext, time_format)
+            fields['cues'] = len(transcription)
+        if transcription and compact:
+            package['transcription'] = transcription
+        elif transcription:
+            package['transcription'] = {
+                'format_description': TRANSCRIPTION_FORMAT_DESC[time_format],
+                'data': transcription,
+            }
+
+    if comments is None:
+        with runreport.stage("package-builder.comments") as fields:
+            comment_total = len(info.get('comments') or [])
+            comments = json_restructurer.restructure_comments(info.get('comments'), max_chars, max_replies, output_format)
+            fields.update(comments_read=comment_total, threads_kept=len(comments))
+    if max_chars is not None or max_replies is not None:
+        package['comments_selection'] = selection_note(comments, comment_total, max_chars, max_replies)
+    package['comments'] = json_restructurer.compact_comments(comments) if compact else comments
+
+    if instructions:
+        package['llm_instructions_end'] = instructions
+
+    return package
+
+def selection_note(comments, comment_total, max_chars, max_replies):
+    """Describes how the comments were cut down, so the reader knows it is a sample."""
+    limits = []
+    if max_chars is not None:
+        limits.append(f"about {max_chars // json_restructurer.APPROX_CHARS_PER_TOKEN} tokens")
+    if max_replies is not None:
+        limits.append(f"at most {max_replies} replies per thread")
+    return (f"Comments are a selection ranked by likes, reply count and uploader participation, "
+            f"best thread first, limited to {' and '.join(limits)}. "
+            f"{len(comments)} threads were kept out of {comment_total} comments in total.")
+
+def write_package(package, output_path, output_format='nested'):
+    """
+    Writes the package next to its final destination and renames it into
+    place. Compact packages are written without whitespace.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix='.llm-package.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if output_format == 'compact':
+                json.dump(package, f, separators=(',', ':'), ensure_ascii=False)
+            else:
+                json.dump(package, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Builds an .llm-package.json from a yt-dlp .info.json and an optional subtitle file, and prints the package path to STDOUT."
+    )
+    parser.add_argument("--info-json", required=True, help="Path to the .info.json written by yt-dlp (with --write-comments for comments).")
+    parser.add_argument("--subtitle", help=f"Path to the subtitle file to use as transcription ({', '.join(subtitles.SUPPORTED_FORMATS)}).")
+    parser.add_argument("--time-format", choices=subtitles.TIME_FORMATS, default='ms', help="Transcription times as integer milliseconds (default) or HH:MM:SS.mmm strings. Compact packages always use milliseconds.")
+    parser.add_argument("--format", choices=json_restructurer.OUTPUT_FORMATS, default='nested',
+                        help="Nested comment objects, indented (default), or compact: columnar comments with an author table, "
+                             "a schema descriptor, no whitespace.")
+    parser.add_argument("--instructions", help="LLM instructions as a JSON object string.")
+    parser.add_argument("--output-dir", required=True, help="Directory where the finished package is written.")
+    parser.add_argument("--stream", action="store_true", help="Stream the .info.json instead of loading it whole; keeps memory bounded on huge files.")
+    parser.add_argument("--max-comment-chars", type=int, help="Keep only the best-ranked comment threads that fit in this many characters of written JSON.")
+    parser.add_argument("--max-comment-tokens", type=int, help="Like --max-comment-chars, in approximate tokens.")
+    parser.add_argument("--max-replies", type=int, help="Keep at most this many replies per comment thread.")
+    args = parser.parse_args()
+
+    max_chars = json_restructurer.budget_in_chars(args.max_comment_chars, args.max_comment_tokens)
+    comments = None
+    comment_total = None
+    try:
+        with runreport.stage("package-builder.read", stream=args.stream) as fields:
+            if args.stream:
+                # Streaming threads the comments while reading, so this stage includes them.
+                info, comments, comment_total = read_info_streaming(args.info_json, max_chars, args.max_replies, args.format)
+                fields.update(comments_read=comment_total, threads_kept=len(comments))
+            else:
+                with open(args.info_json, 'r', encoding='utf-8') as f:
+                    info = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading or parsing {args.info_json}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    subtitle_text = None
+    subtitle_ext = None
+    if args.subtitle:
+        subtitle_ext = os.path.splitext(args.subtitle)[1].lstrip('.').lower()
+        with open(args.subtitle, 'r', encoding='utf-8') as f:
+            subtitle_text = f.read()
+
+    instructions = json.loads(args.instructions) if args.instructions else None
+
+    if not os.path.isdir(args.output_dir):
+        print(f"Error: Provided output directory does not exist: {args.output_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    package = build_llm_package(info, subtitle_text, subtitle_ext, instructions,
+                                comments, comment_total, max_chars, args.max_replies, args.time_format, args.format)
+    metadata = package['metadata']
+    print(f"  -> Channel: {metadata['channel']}", file=sys.stderr)
+    print(f"  -> Title: {metadata['title']}", file=sys.stderr)
+    print(f"  -> ID: {metadata['video_id']}", file=sys.stderr)
+    print(f"  -> Date: {metadata['upload_date']}", file=sys.stderr)
+    # Release the raw info dict (formats, captions, comments) before serializing.
+    del info, comments
+
+    base_filename = os.path.basename(args.info_json)
+    if base_filename.endswith('.info.json'):
+        base_filename = base_filename[:-len('.info.json')]
+    output_path = os.path.join(args.output_dir, f"{base_filename}.llm-package.json")
+
+    with runreport.stage("package-builder.write") as fields:
+        write_package(package, output_path, args.format)
+        fields['output_bytes'] = os.path.getsize(output_path)
+    print(f"Successfully created package at: {output_path}", file=sys.stderr)
+    # Print ONLY the path to stdout for the calling script.
+    print(output_path)
+
+if __name__ == "__main__":
+    main()
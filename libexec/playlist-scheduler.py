@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Bounded parallel scheduler for playlist downloads. Runs one yt-dlp per playlist,
+# at most --jobs at a time, and spaces out job starts per host. Each job's full
+# output goes to its own log file; the terminal gets per-album progress lines
+# and a final summary.
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+import runreport
+
+ITEM_PATTERN = re.compile(r'\[download\] Downloading (?:item|video) (\d+) of (\d+)')
+PLAYLIST_PATTERN = re.compile(r'\[download\] Downloading playlist: (.+)')
+LINE_SPLIT = re.compile(rb'[\r\n]+')
+
+# --- Helper Functions ---
+
+def read_playlist_urls(list_path: str) -> list[str]:
+    """
+    Reads the URL list written by releases-retriever.py, ignoring anything that is
+    not a URL. A .json file is taken as the output of its --batch mode.
+    """
+    with open(list_path, 'r', encoding='utf-8') as f:
+        if list_path.endswith('.json'):
+            return json.load(f).get('playlists', [])
+        return [line.strip() for line in f if line.strip().startswith(('http://', 'https://'))]
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+class HostRateLimiter:
+    """Enforces a minimum interval between job starts against the same host."""
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_start = {}
+        self.lock = asyncio.Lock()
+
+    async def wait(self, url: str):
+        host = urlparse(url).hostname or ''
+        async with self.lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_start.get(host, now))
+            self.next_start[host] = start_at + self.interval
+        await asyncio.sleep(start_at - now)
+
+class JobResult:
+    __slots__ = ('index', 'url', 'title', 'returncode', 'items_done', 'items_total', 'duration', 'log_path')
+
+    def __init__(self, index: int, url: str, log_path: str):
+        self.index = index
+        self.url = url
+        self.title = url
+        self.returncode = None
+        self.items_done = 0
+        self.items_total = 0
+        self.duration = 0.0
+        self.log_path = log_path
+
+# --- Scheduler ---
+
+async def run_job(job: JobResult, total: int, command: list[str], limiter: HostRateLimiter, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        await limiter.wait(job.url)
+        tag = f"[{job.index}/{total}]"
+        print(f"{tag} Started: {job.url}", flush=True)
+        started = time.monotonic()
+
+        with open(job.log_path, 'wb') as log:
+            process = await asyncio.create_subprocess_exec(
+                *command, job.url,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            pending = b''
+            while chunk := await process.stdout.read(65536):
+                log.write(chunk)
+                lines = LINE_SPLIT.split(pending + chunk)
+                pending = lines.pop()
+                for raw_line in lines:
+                    line = raw_line.decode('utf-8', errors='replace')
+                    if match := PLAYLIST_PATTERN.search(line):
+                        job.title = match.group(1).strip()
+                    elif match := ITEM_PATTERN.search(line):
+                        job.items_done, job.items_total = int(match.group(1)), int(match.group(2))
+                        print(f"{tag} {job.title}: track {job.items_done} of {job.items_total}", flush=True)
+            job.returncode = await process.wait()
+
+        job.duration = time.monotonic() - started
+        status = "Done" if job.returncode == 0 else f"FAILED (exit {job.returncode}, log: {job.log_path})"
+        print(f"{tag} {status}: {job.title} in {format_duration(job.duration)}", flush=True)
+        runreport.record("albums.playlist", status="ok" if job.returncode == 0 else "error",
+                         exit_code=job.returncode, wall_s=round(job.duration, 3), url=job.url,
+                         title=job.title, tracks=job.items_total)
+
+async def run_all(urls: list[str], command: list[str], jobs: int, host_interval: float, log_dir: str) -> list[JobResult]:
+    semaphore = asyncio.Semaphore(jobs)
+    limiter = HostRateLimiter(host_interval)
+    results = [JobResult(i, url, os.path.join(log_dir, f"playlist-{i:03d}.log")) for i, url in enumerate(urls, start=1)]
+    await asyncio.gather(*(run_job(job, len(urls), command, limiter, semaphore) for job in results))
+    return results
+
+def print_summary(results: list[JobResult], wall_time: float):
+    failed = [job for job in results if job.returncode != 0]
+    print("\n--- Summary ---")
+    print(f"Playlists: {len(results)}, succeeded: {len(results) - len(failed)}, failed: {len(failed)}, wall time: {format_duration(wall_time)}")
+    for job in results:
+        mark = "ok  " if job.returncode == 0 else "FAIL"
+        tracks = f"{job.items_total} tracks" if job.items_total else "tracks unknown"
+        print(f"  {mark} {job.title} ({tracks}, {format_duration(job.duration)})")
+    for job in failed:
+        print(f"  Log for failed '{job.title}': {job.log_path}")
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Downloads the playlists in a URL list in parallel. Everything after '--' is the yt-dlp command and its arguments; each playlist URL is appended to it."
+    )
+    parser.add_argument("--list", required=True, help="Text file with one playlist URL per line, or a releases-retriever.py --batch JSON file.")
+    parser.add_argument("--jobs", type=int, default=3, help="Number of playlists downloaded at once (default: 3).")
+    parser.add_argument("--host-interval", type=float, default=2.0, help="Minimum seconds between job starts against the same host (default: 2).")
+    parser.add_argument("--log-dir", required=True, help="Directory for the per-playlist yt-dlp logs.")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="yt-dlp command and arguments, after '--'.")
+    args = parser.parse_args()
+
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        parser.error("the yt-dlp command is missing (give it after '--')")
+
+    urls = read_playlist_urls(args.list)
+    if not urls:
+        print(f"Error: No playlist URLs found in {args.list}", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(args.log_dir, exist_ok=True)
+    jobs = max(1, args.jobs)
+    print(f"Downloading {len(urls)} playlists with {jobs} parallel jobs...", flush=True)
+    started = time.monotonic()
+    results = asyncio.run(run_all(urls, command, jobs, args.host_interval, args.log_dir))
+    print_summary(results, time.monotonic() - started)
+
+    sys.exit(0 if all(job.returncode == 0 for job in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@
 
 
 import argparse
+import json
 import re
 import os
 import sys
@@ -25,8 +26,11 @@ import random
 import string
 import requests
 import functools
+import threading
 from urllib.parse import urljoin, urlparse, urlunparse
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import library
+import runreport
 
 # --- Helper Functions ---
 
@@ -78,54 +82,144 @@ def suggest_alternative_url(url: str) -> str | None:
     
     return None
 
+def keep_new_playlists(channel_url: str, playlist_urls: list[str]) -> list[str]:
+    """
+    Incremental sync: returns only the playlists of this channel that no earlier
+    sync has downloaded completely. Nothing is recorded here; the caller marks
+    the playlists as seen once they are downloaded (library.py remember-channel),
+    so a failed or declined download is offered again.
+    """
+    conn = library.connect()
+    seen = library.seen_channel_playlists(conn, channel_url)
+    new_urls = []
+    for url in playlist_urls:
+        playlist_id = library.extract_playlist_id(url)
+        if playlist_id not in seen and not library.playlist_is_complete(conn, 'album', playlist_id):
+            new_urls.append(url)
+    conn.close()
+    print(f"Debug: Incremental sync. {len(new_urls)} new of {len(playlist_urls)} playlists.", file=sys.stderr)
+    return new_urls
+
 # --- Scraper Implementations ---
 
-async def run_playwright_scraper(url: str) -> tuple[str | None, list[str] | None]:
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """Creates the Requests session, with consent cookies and a connection pool of pool_size per host."""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Cookie': 'CONSENT=YES+cb.20240520-07-p0.en+FX+000; SOCS=CAESEwgDEgk0ODE3Nzk3MjAaAmVuIAEaBgiA_LmvBg'
+    })
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class SessionPool:
+    """
+    One Requests session per worker thread, created on first use. A Session is
+    not thread-safe (its cookie jar and adapters change with every request), so
+    concurrent crawls must not share one.
+    """
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sessions = []
+
+    def get(self) -> requests.Session:
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = make_session()
+            with self.lock:
+                self.sessions.append(session)
+        return session
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions.clear()
+
+class BrowserPool:
+    """
+    One headless Chromium shared by all crawls, launched on first use, with at
+    most `size` browser contexts (one page each) open at a time.
+    """
+    def __init__(self, size: int = 1):
+        self.semaphore = asyncio.Semaphore(size)
+        self.lock = asyncio.Lock()
+        self.playwright = None
+        self.browser = None
+
+    async def get_browser(self):
+        async with self.lock:
+            if self.browser is None:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=True)
+            return self.browser
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+        self.browser = self.playwright = None
+
+async def scrape_page(page, url: str) -> tuple[str, list[str]]:
+    """Loads a channel page, passes the consent dialog and extracts the playlist links and page title."""
+    # Go to the page and wait for network activity to cease. More reliable than wait_until='domcontentloaded' hopefully
+    await page.goto(url, wait_until='networkidle', timeout=60000)
+
+    try:
+        # Attempt to click "Accept all" consent button
+        await page.get_by_role("button", name="Accept all").first.click(timeout=5000)
+        # Wait for the subsequent navigation/reload to finish
+        await page.wait_for_load_state('networkidle', timeout=15000)
+        print("Debug (Playwright): Consent form submitted.", file=sys.stderr)
+    except PlaywrightTimeoutError:
+        print("Debug (Playwright): No consent dialog found or it timed out.", file=sys.stderr)
+
+    print("Debug (Playwright): Waiting for playlist grid renderer to load...", file=sys.stderr)
+    # Wait for the main container of the playlists, which is more stable.
+    await page.wait_for_selector('ytd-rich-grid-renderer', timeout=30000)
+    print("Debug (Playwright): Playlist grid renderer loaded.", file=sys.stderr)
+
+    links_with_list_param = await page.locator('a[href*="list="]').all()
+    playlist_ids = set()
+    for link in links_with_list_param:
+        href = await link.get_attribute('href')
+        if href:
+            match = re.search(r'list=([a-zA-Z0-9_-]+)', href)
+            if match:
+                playlist_ids.add(match.group(1))
+
+    playlist_urls = sorted([f"https://www.youtube.com/playlist?list={pid}" for pid in playlist_ids])
+    return await page.title(), playlist_urls
+
+async def run_playwright_scraper(url: str, browser_pool: BrowserPool | None = None) -> tuple[str | None, list[str] | None]:
     """
-    Launches a headless browser using Playwright to fetch page content,
-    waits for dynamic content to load, and extracts playlist links and page title.
+    Fetches the page with a headless browser from the pool, waits for dynamic
+    content to load, and extracts playlist links and page title. Without a pool
+    a browser is launched for this one URL.
     """
     print(f"Debug (Playwright): Navigating to URL: {url}", file=sys.stderr)
+    own_pool = browser_pool is None
+    if own_pool:
+        browser_pool = BrowserPool()
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
+        async with browser_pool.semaphore:
+            browser = await browser_pool.get_browser()
             context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                user_agent=USER_AGENT,
                 locale='en-GB',
                 timezone_id='Europe/London',
             )
-            page = await context.new_page()
-
-            # Go to the page and wait for network activity to cease. More reliable than wait_until='domcontentloaded' hopefully
-            await page.goto(url, wait_until='networkidle', timeout=60000)
-
             try:
-                # Attempt to click "Accept all" consent button
-                await page.get_by_role("button", name="Accept all").first.click(timeout=5000)
-                # Wait for the subsequent navigation/reload to finish
-                await page.wait_for_load_state('networkidle', timeout=15000)
-                print("Debug (Playwright): Consent form submitted.", file=sys.stderr)
-            except PlaywrightTimeoutError:
-                print("Debug (Playwright): No consent dialog found or it timed out.", file=sys.stderr)
-
-            print("Debug (Playwright): Waiting for playlist grid renderer to load...", file=sys.stderr)
-            # Wait for the main container of the playlists, which is more stable.
-            await page.wait_for_selector('ytd-rich-grid-renderer', timeout=30000)
-            print("Debug (Playwright): Playlist grid renderer loaded.", file=sys.stderr)
-
-            links_with_list_param = await page.locator('a[href*="list="]').all()
-            playlist_ids = set()
-            for link in links_with_list_param:
-                href = await link.get_attribute('href')
-                if href:
-                    match = re.search(r'list=([a-zA-Z0-9_-]+)', href)
-                    if match:
-                        playlist_ids.add(match.group(1))
-
-            playlist_urls = sorted([f"https://www.youtube.com/playlist?list={pid}" for pid in playlist_ids])
-            page_title = await page.title()
-            await browser.close()
-            return page_title, playlist_urls
+                return await scrape_page(await context.new_page(), url)
+            finally:
+                await context.close()
 
     except PlaywrightTimeoutError as e:
         print(f"Error (Playwright): Timed out waiting for content on '{url}'. Details: {e}", file=sys.stderr)
@@ -133,20 +227,141 @@ async def run_playwright_scraper(url: str) -> tuple[str | None, list[str] | None
     except Exception as e:
         print(f"Error (Playwright): An unexpected error occurred: {e}", file=sys.stderr)
         return None, None # Return None on critical failure
+    finally:
+        if own_pool:
+            await browser_pool.close()
+
+# --- Channel Page Data (Requests) ---
+# Channel pages embed their first batch of items as JSON (ytInitialData) and the
+# client configuration (ytcfg) with the key and context for the internal browse
+# API. The remaining items are fetched by posting continuation tokens to it.
+
+INITIAL_DATA_MARKERS = ('var ytInitialData = ', 'window["ytInitialData"] = ')
+YTCFG_PATTERN = re.compile(r'ytcfg\.set\s*\(\s*(?=\{)')
+BROWSE_API_URL = 'https://www.youtube.com/youtubei/v1/browse'
+PAGE_LIMIT = 500 # Safety stop for --max-pages 0 (unlimited)
+
+def extract_initial_data(html_content: str) -> dict | None:
+    decoder = json.JSONDecoder()
+    for marker in INITIAL_DATA_MARKERS:
+        start = html_content.find(marker)
+        if start != -1:
+            try:
+                return decoder.raw_decode(html_content, start + len(marker))[0]
+            except ValueError:
+                return None
+    return None
 
-def run_requests_scraper(url: str) -> tuple[str | None, list[str] | None]:
+def extract_ytcfg(html_content: str) -> dict:
+    """Merges all ytcfg.set({...}) calls of the page."""
+    decoder = json.JSONDecoder()
+    config = {}
+    for match in YTCFG_PATTERN.finditer(html_content):
+        try:
+            value = decoder.raw_decode(html_content, match.end())[0]
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            config.update(value)
+    return config
+
+def selected_tab_content(initial_data: dict):
+    """Returns the content of the selected channel tab, so header and sidebar links are not picked up."""
+    tabs = initial_data.get('contents', {}).get('twoColumnBrowseResultsRenderer', {}).get('tabs', [])
+    for tab in tabs:
+        renderer = tab.get('tabRenderer') or {}
+        if renderer.get('selected'):
+            return renderer.get('content', {})
+    return initial_data
+
+def continuation_token(item) -> str | None:
+    """The token of a continuationItemRenderer item, the one that loads the rest of its list."""
+    renderer = item.get('continuationItemRenderer') if isinstance(item, dict) else None
+    if not isinstance(renderer, dict):
+        return None
+    endpoint = renderer.get('continuationEndpoint') or {}
+    token = (endpoint.get('continuationCommand') or {}).get('token')
+    if token is None:
+        # Newer responses wrap the command: commandExecutorCommand.commands[].continuationCommand
+        for command in (endpoint.get('commandExecutorCommand') or {}).get('commands', []):
+            token = (command.get('continuationCommand') or {}).get('token') or token
+    return token if isinstance(token, str) else None
+
+def collect_browse_items(node) -> tuple[set[str], list[str]]:
+    """
+    Walks browse data and returns (playlist ids, continuation tokens). Only the
+    continuationItemRenderer at the end of an item list is followed; other
+    continuation commands, like the sort menu's, load the same list again.
+    """
+    playlist_ids = set()
+    tokens = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if isinstance(item.get('playlistId'), str):
+                playlist_ids.add(item['playlistId'])
+            if item.get('contentType') == 'LOCKUP_CONTENT_TYPE_PLAYLIST' and isinstance(item.get('contentId'), str):
+                playlist_ids.add(item['contentId'])
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            if item and (token := continuation_token(item[-1])):
+                tokens.append(token)
+            stack.extend(item)
+    return playlist_ids, tokens
+
+def fetch_continuations(session: requests.Session, ytcfg: dict, tokens: list[str], max_pages: int) -> set[str]:
     """
-    Fetches HTML using Requests, attempts to bypass consent screens, and extracts playlist links.
-    NOTE: This is a synchronous function.
+    Follows continuation tokens through the browse API until the list is
+    exhausted or max_pages continuation pages (0 = no limit) were fetched.
+    """
+    api_key = ytcfg.get('INNERTUBE_API_KEY')
+    context = ytcfg.get('INNERTUBE_CONTEXT')
+    if not api_key or not context:
+        print("Debug (Requests): No API configuration on the page; continuations skipped.", file=sys.stderr)
+        return set()
+
+    headers = {'Content-Type': 'application/json'}
+    if ytcfg.get('INNERTUBE_CONTEXT_CLIENT_NAME'):
+        headers['X-YouTube-Client-Name'] = str(ytcfg['INNERTUBE_CONTEXT_CLIENT_NAME'])
+    if ytcfg.get('INNERTUBE_CLIENT_VERSION'):
+        headers['X-YouTube-Client-Version'] = ytcfg['INNERTUBE_CLIENT_VERSION']
+
+    limit = max_pages or PAGE_LIMIT
+    playlist_ids = set()
+    pending = list(tokens)
+    seen_tokens = set()
+    pages = 0
+    while pending and pages < limit:
+        token = pending.pop(0)
+        if token in seen_tokens:
+            continue
+        seen_tokens.add(token)
+        response = session.post(
+            BROWSE_API_URL, params={'key': api_key, 'prettyPrint': 'false'},
+            json={'context': context, 'continuation': token}, headers=headers, timeout=20
+        )
+        response.raise_for_status()
+        pages += 1
+        new_ids, new_tokens = collect_browse_items(response.json().get('onResponseReceivedActions', []))
+        playlist_ids |= new_ids
+        pending.extend(new_tokens)
+    print(f"Debug (Requests): Fetched {pages} continuation page(s).", file=sys.stderr)
+    if pending and pages >= limit:
+        print(f"Debug (Requests): Stopped at the page limit ({limit}); the list may be incomplete.", file=sys.stderr)
+    return playlist_ids
+
+def run_requests_scraper(url: str, session: requests.Session | None = None, max_pages: int = 0) -> tuple[str | None, list[str] | None]:
+    """
+    Fetches HTML using Requests, attempts to bypass consent screens, and extracts playlist links:
+    from the selected tab of the embedded initial data and its continuations, or, if the page has
+    no initial data, from the raw HTML.
+    NOTE: This is a synchronous function. A shared session reuses its pooled connections.
     """
     print(f"Debug (Requests): Attempting to fetch URL: {url}", file=sys.stderr)
     try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Cookie': 'CONSENT=YES+cb.20240520-07-p0.en+FX+000; SOCS=CAESEwgDEgk0ODE3Nzk3MjAaAmVuIAEaBgiA_LmvBg'
-        })
+        if session is None:
+            session = make_session()
         response = session.get(url, timeout=20)
         response.raise_for_status()
         html_content = response.text
@@ -155,8 +370,21 @@ def run_requests_scraper(url: str) -> tuple[str | None, list[str] | None]:
         title_match = re.search(r"<title>(.*?)</title>", html_content, re.IGNORECASE | re.DOTALL)
         page_title = title_match.group(1).strip() if title_match else "playlist_data"
 
-        playlist_references = set(re.findall(r'["\'](/playlist\?list=([a-zA-Z0-9_-]+))["\']', html_content))
-        playlist_urls = sorted([f"https://www.youtube.com{match[0]}" for match in playlist_references])
+        initial_data = extract_initial_data(html_content)
+        if initial_data is None:
+            # No embedded data: fall back to every playlist link in the raw HTML,
+            # which may include other tabs, shelves and related channels.
+            playlist_ids = {match[1] for match in re.findall(r'["\'](/playlist\?list=([a-zA-Z0-9_-]+))["\']', html_content)}
+        else:
+            playlist_ids, tokens = collect_browse_items(selected_tab_content(initial_data))
+            if tokens:
+                try:
+                    playlist_ids |= fetch_continuations(session, extract_ytcfg(html_content), tokens, max_pages)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    # Keep what the first page had; a partial list still beats the browser fallback.
+                    print(f"Error (Requests): Continuation request failed: {e}", file=sys.stderr)
+
+        playlist_urls = sorted([f"https://www.youtube.com/playlist?list={pid}" for pid in playlist_ids])
 
         return page_title, playlist_urls
 
@@ -169,16 +397,25 @@ def run_requests_scraper(url: str) -> tuple[str | None, list[str] | None]:
 
 # --- Main Logic ---
 
-async def get_playlists_from_url(url: str) -> tuple[str | None, list[str] | None]:
+def run_requests_scraper_pooled(url: str, session_pool: SessionPool | None, max_pages: int):
+    """Runs the Requests scraper with the session of the calling worker thread."""
+    return run_requests_scraper(url, session_pool.get() if session_pool else None, max_pages)
+
+async def get_playlists_from_url(url: str, session_pool: SessionPool | None = None,
+                                 browser_pool: BrowserPool | None = None, max_pages: int = 0) -> tuple[str | None, list[str] | None]:
     """Orchestrates the scraping process with primary and backup methods."""
 
     # --- Attempt 1: Requests (Lightweight & Primary) ---
     print("\n--- Attempt 1: Using Requests (lightweight) ---", file=sys.stderr)
     loop = asyncio.get_running_loop()
-    # Run the synchronous 'requests' function in a thread to avoid blocking asyncio
-    requests_result = await loop.run_in_executor(
-        None, functools.partial(run_requests_scraper, url=url)
-    )
+    with runreport.stage("releases.requests", url=url) as fields:
+        # Run the synchronous 'requests' function in a thread to avoid blocking asyncio
+        requests_result = await loop.run_in_executor(
+            None, functools.partial(run_requests_scraper_pooled, url=url, session_pool=session_pool, max_pages=max_pages)
+        )
+        fields['playlists_found'] = len(requests_result[1] or []) if requests_result else 0
+        if not fields['playlists_found']:
+            fields['status'] = 'empty'
 
     page_title = "playlist_data" # Default title
     if requests_result:
@@ -192,7 +429,11 @@ async def get_playlists_from_url(url: str) -> tuple[str | None, list[str] | None
     # --- Attempt 2: Playwright (Heavyweight Fallback) ---
     print("\n--- Requests failed or found no playlists. Attempt 2: Using Playwright (heavyweight fallback) ---", file=sys.stderr)
 
-    playwright_result = await run_playwright_scraper(url)
+    with runreport.stage("releases.playwright", url=url) as fields:
+        playwright_result = await run_playwright_scraper(url, browser_pool)
+        fields['playlists_found'] = len(playwright_result[1] or []) if playwright_result else 0
+        if not fields['playlists_found']:
+            fields['status'] = 'empty'
 
     if playwright_result:
         page_title_pw, playlist_urls_pw = playwright_result
@@ -205,18 +446,82 @@ async def get_playlists_from_url(url: str) -> tuple[str | None, list[str] | None
     print("--- Both scraping methods failed or found no playlists. ---", file=sys.stderr)
     return page_title, [] # Return original title and empty list if both failed
 
+def read_channel_list(list_path: str) -> list[str]:
+    """Reads one channel URL per line; blank lines and '#' comments are ignored."""
+    with open(list_path, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f]
+    return list(dict.fromkeys(url for url in urls if url and not url.startswith('#')))
+
+async def crawl_batch(channel_urls: list[str], concurrency: int, incremental: bool, max_pages: int = 0) -> list[dict]:
+    """
+    Crawls many channels concurrently. Each worker thread keeps one Requests
+    session for its crawls, and all crawls share one browser pool, so Chromium
+    starts at most once, and only if a channel needs the Playwright fallback.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    session_pool = SessionPool()
+    browser_pool = BrowserPool(concurrency)
+
+    async def crawl(url: str) -> dict:
+        async with semaphore:
+            page_title, playlist_urls = await get_playlists_from_url(url, session_pool, browser_pool, max_pages)
+        result = {"url": url, "title": page_title, "found": len(playlist_urls or []), "playlists": playlist_urls or []}
+        if page_title is None:
+            result["error"] = "all fetch attempts failed"
+        elif incremental and result["playlists"]:
+            result["playlists"] = keep_new_playlists(url, result["playlists"])
+        return result
+
+    try:
+        return await asyncio.gather(*(crawl(url) for url in channel_urls))
+    finally:
+        await browser_pool.close()
+        session_pool.close()
+
+def write_batch_output(output_dir: str, results: list[dict], incremental: bool) -> str:
+    """Writes one JSON document with the per-channel results and the merged playlist list."""
+    playlists = list(dict.fromkeys(url for result in results for url in result["playlists"]))
+    document = {
+        "incremental": incremental,
+        "channels": results,
+        "playlists": playlists,
+    }
+    output_filepath = os.path.join(output_dir, f"batch_{generate_random_string(3)}.json")
+    with open(output_filepath, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    failed = sum(1 for result in results if "error" in result)
+    print(f"\nDebug: Batch done. {len(results)} channels ({failed} failed), {len(playlists)} playlists.", file=sys.stderr)
+    return output_filepath
+
 async def main():
     parser = argparse.ArgumentParser(
         description="Unified Playlist Retriever: Fetches a URL using Playwright, falls back to Requests, extracts YouTube playlist links, saves them, and prints the file path to STDOUT.",
         formatter_class=argparse.RawTextHelpFormatter
     )
-    parser.add_argument("--url", required=True, help="Full URL of the YouTube page (e.g., channel/releases) to scan.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="Full URL of the YouTube page (e.g., channel/releases) to scan.")
+    source.add_argument("--batch", metavar="FILE", help="Text file with one channel URL per line, crawled concurrently.\nWrites a single JSON file (per-channel results and merged playlist list) instead of a URL list.")
     parser.add_argument("--output-dir", required=True, help="Absolute path to the directory where the temporary URL list file should be saved.")
+    parser.add_argument("--incremental", action="store_true", help="Only emit playlists of this channel that earlier syncs have not downloaded completely.\nAfter downloading, record them with library.py remember-channel.")
+    parser.add_argument("--max-pages", type=int, default=0, help="Stop following continuation pages after this many (default: 0, no limit).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batch mode: channels crawled at once, also the browser page limit (default: 4).")
     args = parser.parse_args()
 
+    if args.batch:
+        if not os.path.isdir(args.output_dir):
+            print(f"Error: Provided output directory does not exist: {args.output_dir}", file=sys.stderr)
+            sys.exit(1)
+        channel_urls = read_channel_list(args.batch)
+        if not channel_urls:
+            print(f"Error: No channel URLs found in {args.batch}", file=sys.stderr)
+            sys.exit(1)
+        results = await crawl_batch(channel_urls, max(1, args.concurrency), args.incremental, args.max_pages)
+        print(write_batch_output(args.output_dir, results, args.incremental))
+        return
+
 
     current_url = args.url
-    page_title, playlist_urls = await get_playlists_from_url(current_url)
+    page_title, playlist_urls = await get_playlists_from_url(current_url, max_pages=args.max_pages)
 
     # --- Attempt 3: Suggest alternative URL if still no results ---
     if not playlist_urls:
@@ -227,7 +532,7 @@ async def main():
             if choice.lower() == 'y':
                 print(f"--- User accepted. Retrying with {alternative_url} ---", file=sys.stderr)
                 current_url = alternative_url
-                page_title, playlist_urls = await get_playlists_from_url(current_url)
+                page_title, playlist_urls = await get_playlists_from_url(current_url, max_pages=args.max_pages)
 
     # --- Save results to file ---
     if page_title is None:
@@ -242,6 +547,10 @@ async def main():
     # random_suffix = generate_random_string(3)
     # output_filename = f"{sanitized_page_title}_{random_suffix}.txt"
     # output_filepath = os.path.join(output_dir, output_filename)
+    total_found = len(playlist_urls)
+    if args.incremental and playlist_urls:
+        playlist_urls = keep_new_playlists(args.url, playlist_urls)
+
     if not os.path.isdir(args.output_dir):
         print(f"Error: Provided output directory does not exist: {args.output_dir}", file=sys.stderr)
         sys.exit(1)
@@ -256,6 +565,9 @@ async def main():
             if playlist_urls:
                 f.write("\n".join(playlist_urls) + "\n")
                 print(f"\nDebug: Success. Found {len(playlist_urls)} unique playlist URLs.", file=sys.stderr)
+            elif total_found:
+                f.write(f"No new playlist URLs on {current_url} since the last sync.\n")
+                print(f"\nDebug: None of the {total_found} playlists on {current_url} are new.", file=sys.stderr)
             else:
                 f.write(f"No playlist URLs found on {current_url}.\n")
                 print(f"\nDebug: Failure. No playlist URLs found on {current_url} after all attempts.", file=sys.stderr)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Opt-in run report. When YT_MENU_REPORT names a file, every instrumented stage
+# appends one JSON line to it: wall time, CPU time, peak RSS, bytes read and
+# written, exit status and stage-specific fields. Stages of one run share
+# YT_MENU_RUN_ID. Without the variable everything here is a no-op.
+#
+# In Python:   with runreport.stage("package-builder.comments") as fields: ...
+# From shell:  runreport.py exec --stage NAME -- command args   (lib/run-report.sh)
+#
+# Byte counts come from /proc/<pid>/io (Linux; rchar/wchar, so they include
+# pipes and sockets) and are null elsewhere. In Python the figures are for the
+# whole process, so stages running in parallel threads overlap.
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+REPORT_ENV = 'YT_MENU_REPORT'
+RUN_ID_ENV = 'YT_MENU_RUN_ID'
+
+# --- Helper Functions ---
+
+def report_path() -> str | None:
+    return os.environ.get(REPORT_ENV) or None
+
+def enabled() -> bool:
+    return report_path() is not None
+
+def read_io(pid='self') -> tuple[int | None, int | None]:
+    """(bytes read, bytes written) of a process and its reaped children, or (None, None)."""
+    try:
+        with open(f'/proc/{pid}/io') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+def reset_peak_rss() -> bool:
+    """Resets VmHWM so the next read gives the peak of this stage only (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def current_peak_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource # Not on Windows; the process peak is the best available
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def difference(end, start):
+    return end - start if end is not None and start is not None else None
+
+def write_record(record: dict):
+    """Appends one line with a single write, so parallel writers do not interleave."""
+    path = report_path()
+    if not path:
+        return
+    record = {
+        'run': os.environ.get(RUN_ID_ENV), 'host': socket.gethostname(), 'pid': os.getpid(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'ytdlp': os.environ.get('YTDLP_REVISION'), **record,
+    }
+    line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+def record(name: str, **fields):
+    """Writes a plain event (no measurements), e.g. a finished job with its own timing."""
+    if enabled():
+        write_record({'stage': name, **fields})
+
+@contextmanager
+def stage(name: str, **fields):
+    """
+    Measures the enclosed block. Yields a dict; keys added to it (counts,
+    URLs, outcomes) are written with the record. An exception marks the
+    stage as failed and is re-raised.
+    """
+    if not enabled():
+        yield fields
+        return
+    reset_peak_rss()
+    bytes_in, bytes_out = read_io()
+    started_wall, started_cpu = time.perf_counter(), time.process_time()
+    status = 'ok'
+    try:
+        yield fields
+    except BaseException as e:
+        status = 'error'
+        fields.setdefault('error', f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        end_in, end_out = read_io()
+        write_record({
+            'stage': name, 'status': fields.pop('status', status),
+            'wall_s': round(time.perf_counter() - started_wall, 3),
+            'cpu_s': round(time.process_time() - started_cpu, 3),
+            'peak_rss_mb': round(current_peak_rss_mb(), 1),
+            'bytes_in': difference(end_in, bytes_in), 'bytes_out': difference(end_out, bytes_out),
+            **fields,
+        })
+
+def path_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _dirs, names in os.walk(path) for name in names
+                   if os.path.isfile(os.path.join(root, name)))
+    return os.path.getsize(path) if os.path.isfile(path) else 0
+
+# --- Commands ---
+
+def run_measured(name: str, command: list[str], outputs: list[str], fields: dict) -> int:
+    """Runs a command with inherited stdio and records it as one stage. Returns its exit code."""
+    started = time.perf_counter()
+    try:
+        process = subprocess.Popen(command)
+    except OSError as e:
+        print(f"Error: Could not run {command[0]}: {e}", file=sys.stderr)
+        write_record({'stage': name, 'status': 'error', 'error': str(e), **fields})
+        return 127
+    # Ctrl-C reaches the child too; the wrapper stays to record how it ended.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Wait without reaping first, so the child's I/O counters can still be read.
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    bytes_in, bytes_out = read_io(process.pid)
+    _pid, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+    process.returncode = exit_code = os.waitstatus_to_exitcode(status)
+
+    record = {
+        'stage': name, 'status': 'ok' if exit_code == 0 else 'error', 'exit_code': exit_code,
+        'wall_s': round(wall, 3), 'cpu_s': round(usage.ru_utime + usage.ru_stime, 3),
+        'peak_rss_mb': round(usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+        'bytes_in': bytes_in, 'bytes_out': bytes_out,
+    }
+    if outputs:
+        record['output_bytes'] = sum(path_size(path) for path in outputs)
+    write_record({**record, **fields})
+    return exit_code
+
+def summarize(path: str, run: str | None):
+    """Per stage: count, total and maximum wall time, CPU time and peak RSS."""
+    stages = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if run and entry.get('run') != run:
+                continue
+            summary = stages.setdefault(entry['stage'], {'count': 0, 'errors': 0, 'wall': 0.0, 'max_wall': 0.0, 'cpu': 0.0, 'rss': 0.0})
+            summary['count'] += 1
+            summary['errors'] += entry.get('status') == 'error'
+            summary['wall'] += entry.get('wall_s') or 0
+            summary['max_wall'] = max(summary['max_wall'], entry.get('wall_s') or 0)
+            summary['cpu'] += entry.get('cpu_s') or 0
+            summary['rss'] = max(summary['rss'], entry.get('peak_rss_mb') or 0)
+    print(f"{'stage':<36}{'count':>7}{'errors':>8}{'wall s':>10}{'max s':>9}{'cpu s':>9}{'peak MB':>9}")
+    for name, s in sorted(stages.items(), key=lambda item: -item[1]['wall']):
+        print(f"{name:<36}{s['count']:>7}{s['errors']:>8}{s['wall']:>10.2f}{s['max_wall']:>9.2f}{s['cpu']:>9.2f}{s['rss']:>9.1f}")
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Run report helpers. Records are written only if ${REPORT_ENV} is set.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("exec", help="Run a command (after '--') and record it as a stage. Exits with its exit code.")
+    p.add_argument("--stage", required=True, help="Stage name, e.g. llm-package.yt-dlp.")
+    p.add_argument("--output", action="append", default=[], help="File or directory whose size is recorded afterwards. Repeatable.")
+    p.add_argument("--field", action="append", default=[], metavar="KEY=VALUE", help="Extra field for the record. Repeatable.")
+
+    p = subparsers.add_parser("summary", help="Aggregate a report file by stage, slowest first.")
+    p.add_argument("report", nargs="?", help=f"Report file (default: ${REPORT_ENV}).")
+    p.add_argument("--run", help="Only this run id.")
+
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+
+    if args.command == "exec":
+        command = argv[split + 1:]
+        if not command:
+            parser.error("the command is missing (give it after '--')")
+        if not enabled():
+            os.execvp(command[0], command)
+        fields = dict(field.split('=', 1) for field in args.field if '=' in field)
+        sys.exit(run_measured(args.stage, command, args.output, fields))
+
+    elif args.command == "summary":
+        path = args.report or report_path()
+        if not path or not os.path.exists(path):
+            print(f"Error: No report file (give one or set ${REPORT_ENV}).", file=sys.stderr)
+            sys.exit(1)
+        summarize(path, args.run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# The libexec helpers are named like commands (e.g. json-restructurer.py), which
+# the regular import statement cannot handle. This module loads them by path so
+# other Python entry points can reuse their functions in-process.
+
+import importlib.util
+import os
+import sys
+
+LIBEXEC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_sibling(filename):
+    """Imports a script from the libexec directory as a module and returns it."""
+    module_name = os.path.splitext(filename)[0].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(LIBEXEC_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
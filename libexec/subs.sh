@@ -5,6 +5,7 @@
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 # The path is relative to this script's location.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/cache.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/subs.cfg"
@@ -47,14 +48,27 @@ read -r url
 
 # Execute command
 echo "Downloading comments to $comments_basedir"
-$YTDLP_COMMAND \
-    --write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" \
-    --sub-format "srt/ass/best" \
+# A recent description and subtitle are reused from the metadata cache; only
+# what is missing is fetched.
+CACHE_SUB_FORMATS="srt,ass,vtt"
+cache_restore "$url" "$comments_basedir" subtitle description
+fetch_args=()
+if cache_missing subtitle; then
+    fetch_args+=(--write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" --sub-format "srt/ass/best")
+fi
+if cache_missing description; then
+    fetch_args+=(--write-description)
+fi
+if [ ${#fetch_args[@]} -eq 0 ]; then
+    echo "Description and subtitles reused from the metadata cache."
+elif "${YTDLP_COMMAND_ARRAY[@]}" \
+    "${fetch_args[@]}" \
     --skip-download \
     --ignore-config \
-    --write-description \
     --paths "$comments_basedir" \
     --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" \
-    "$url"
+    "$url"; then
+    cache_store "$comments_basedir"
+fi
 
 ## yt-dlp --write-comments --write-description --skip-download --ignore-config -P "$music_basedir" "$url"
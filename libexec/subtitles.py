@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Subtitle engine shared by the transcription steps. One parser per format
+# (SRT, WebVTT, ASS/SSA, YouTube json3) turns a file into cues of
+# (start_ms, end_ms, text_lines); all formats then go through the same
+# rolling-caption deduplication and semantic chunking. The result is a list of
+# [start, end, text] arrays, with times as integer milliseconds or as
+# HH:MM:SS.mmm strings.
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+
+PAUSE_THRESHOLD_SECONDS = 0.8 # Slightly increased for better sentence grouping
+SENTENCE_ENDINGS = ('.', '?', '!')
+TIME_FORMATS = ('ms', 'clock')
+
+VTT_TAG_PATTERN = re.compile(r'<[^>]*>')
+ASS_OVERRIDE_PATTERN = re.compile(r'\{[^}]*\}')
+
+# --- Time Helpers ---
+
+def parse_time_ms(time_str):
+    """Converts HH:MM:SS,mmm / HH:MM:SS.mmm / MM:SS.mmm / H:MM:SS.cc to integer milliseconds, without regex."""
+    fields = time_str.strip().split(':')
+    seconds, _, fraction = fields[-1].replace(',', '.').partition('.')
+    total = 0
+    for field in fields[:-1]:
+        total = total * 60 + int(field)
+    return (total * 60 + int(seconds)) * 1000 + int(fraction[:3].ljust(3, '0'))
+
+def format_time_ms(milliseconds):
+    """Converts integer milliseconds to a consistent HH:MM:SS.mmm format."""
+    s, ms = divmod(milliseconds, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+# --- Parsers ---
+# Each parser takes an iterable of lines and yields (start_ms, end_ms, text_lines).
+
+def iter_timed_blocks(lines, clean_line=str.strip):
+    """
+    Shared by SRT and WebVTT: blocks are separated by blank lines and hold an
+    optional identifier, a 'start --> end [settings]' line and the text.
+    Blocks without a timing line (WEBVTT header, NOTE, STYLE) are skipped.
+    Only a truly empty line ends a block: YouTube's auto-caption WebVTT opens
+    each caption window with a text line holding a single space.
+    """
+    timing = None
+    text_lines = []
+    for line in lines:
+        if not line.rstrip('\r\n').lstrip('\ufeff'):
+            if timing and text_lines:
+                yield timing[0], timing[1], text_lines
+            timing, text_lines = None, []
+        elif timing is None:
+            start, arrow, end = line.strip().lstrip('\ufeff').partition('-->')
+            if arrow:
+                # The end time may be followed by position settings
+                timing = (parse_time_ms(start), parse_time_ms(end.split()[0]))
+            # Otherwise it is the cue number or identifier
+        else:
+            line = clean_line(line)
+            if line:
+                text_lines.append(line)
+    if timing and text_lines:
+        yield timing[0], timing[1], text_lines
+
+def iter_srt_cues(lines):
+    return iter_timed_blocks(lines)
+
+def clean_vtt_line(line):
+    """Removes inline timestamps and styling tags (<00:00:01.000>, <c>, <i>) and decodes entities."""
+    return html.unescape(VTT_TAG_PATTERN.sub('', line)).strip()
+
+def iter_vtt_cues(lines):
+    return iter_timed_blocks(lines, clean_vtt_line)
+
+def iter_ass_cues(lines):
+    """Reads the Dialogue lines of the [Events] section, using its Format line for the column order."""
+    in_events = False
+    columns = None
+    for line in lines:
+        line = line.strip().lstrip('\ufeff')
+        if line.startswith('['):
+            in_events = line == '[Events]'
+            continue
+        if not in_events:
+            continue
+        if line.startswith('Format:'):
+            columns = [col.strip() for col in line.split(':', 1)[1].split(',')]
+            try:
+                start_idx, end_idx, text_idx = (columns.index(name) for name in ('Start', 'End', 'Text'))
+            except ValueError:
+                # If the essential columns aren't present, we cannot proceed.
+                print("Error: 'Start', 'End', or 'Text' not found in ASS Format line.", file=sys.stderr)
+                return
+        elif line.startswith('Dialogue:') and columns:
+            parts = line.split(':', 1)[1].split(',', text_idx)
+            # Styling overrides ({\i1}); \N and \n are line breaks, \h a hard space
+            text = ASS_OVERRIDE_PATTERN.sub('', parts[text_idx]).replace('\\h', ' ')
+            text_lines = [part.strip() for part in text.replace('\\n', '\\N').split('\\N') if part.strip()]
+            if text_lines:
+                yield parse_time_ms(parts[start_idx]), parse_time_ms(parts[end_idx]), text_lines
+
+def iter_json3_cues(lines):
+    """YouTube's native caption format: events with tStartMs, dDurationMs and text segments."""
+    data = json.loads(''.join(lines))
+    for event in data.get('events', []):
+        segments = event.get('segs')
+        if not segments or 'tStartMs' not in event:
+            continue
+        text = ''.join(segment.get('utf8', '') for segment in segments)
+        text_lines = [part.strip() for part in text.split('\n') if part.strip()]
+        if text_lines:
+            start = event['tStartMs']
+            yield start, start + event.get('dDurationMs', 0), text_lines
+
+PARSERS = {
+    'srt': iter_srt_cues,
+    'vtt': iter_vtt_cues,
+    'ass': iter_ass_cues,
+    'ssa': iter_ass_cues,
+    'json3': iter_json3_cues,
+}
+SUPPORTED_FORMATS = tuple(PARSERS)
+
+# --- Shared Processing ---
+
+def remove_rolling_overlap(cues):
+    """
+    YouTube auto-captions roll: each cue repeats the last line(s) of the one
+    before ("A / B", then "B", then "B / C"). Drops the leading lines of a cue
+    that repeat the trailing lines of the previous cue, and cues with nothing new.
+    Only whole lines are compared, so a word that is genuinely said twice stays.
+    """
+    previous = []
+    for start, end, text_lines in cues:
+        overlap = 0
+        for size in range(min(len(previous), len(text_lines)), 0, -1):
+            if previous[-size:] == text_lines[:size]:
+                overlap = size
+                break
+        previous = text_lines
+        if overlap < len(text_lines):
+            yield start, end, text_lines[overlap:]
+
+def chunk_cues(cues, time_format='ms'):
+    """
+    Combines cues into semantic sentences/paragraphs and yields
+    [start, end, text] arrays. A chunk ends when a cue ends with
+    sentence-ending punctuation, or before a pause longer than
+    PAUSE_THRESHOLD_SECONDS.
+    """
+    format_time = format_time_ms if time_format == 'clock' else int
+    pause_threshold_ms = PAUSE_THRESHOLD_SECONDS * 1000
+    parts = []
+    chunk_start = chunk_end = 0
+    for start, end, text_lines in cues:
+        if parts and start - chunk_end > pause_threshold_ms:
+            yield [format_time(chunk_start), format_time(chunk_end), " ".join(parts)]
+            parts = []
+        if not parts:
+            chunk_start, chunk_end = start, end
+        else:
+            chunk_end = max(chunk_end, end) # json3 and ASS cues may overlap
+        parts.extend(text_lines)
+        if parts[-1].endswith(SENTENCE_ENDINGS):
+            yield [format_time(chunk_start), format_time(chunk_end), " ".join(parts)]
+            parts = []
+    if parts:
+        yield [format_time(chunk_start), format_time(chunk_end), " ".join(parts)]
+
+def detect_format(path):
+    """Maps a subtitle file name (e.g. 'x.en.vtt') to its parser name, or None."""
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    return ext if ext in PARSERS else None
+
+def iter_structured_chunks(lines, subtitle_format, time_format='ms'):
+    """Streaming pipeline: subtitle lines in, semantic [start, end, text] chunks out."""
+    return chunk_cues(remove_rolling_overlap(PARSERS[subtitle_format](lines)), time_format)
+
+def structure_subtitle_text(text, subtitle_format, time_format='ms'):
+    return list(iter_structured_chunks(text.splitlines(), subtitle_format, time_format))
+
+def structure_subtitle_file(path, subtitle_format=None, time_format='ms'):
+    """Parses a subtitle file line by line. The format defaults to the file extension."""
+    subtitle_format = subtitle_format or detect_format(path)
+    if subtitle_format not in PARSERS:
+        raise ValueError(f"Unsupported subtitle format: {os.path.basename(path)}")
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(iter_structured_chunks(f, subtitle_format, time_format))
+
+# --- Main Logic ---
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Turns a subtitle file (SRT, WebVTT, ASS/SSA, json3) into semantic [start, end, text] chunks, writes them next to the input and prints the output path."
+    )
+    parser.add_argument("input_path", help="Subtitle file.")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="Subtitle format (default: from the file extension).")
+    parser.add_argument("--time-format", choices=TIME_FORMATS, default='ms', help="Integer milliseconds (default) or HH:MM:SS.mmm strings.")
+    args = parser.parse_args()
+
+    try:
+        structured_data = structure_subtitle_file(args.input_path, args.format, args.time_format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    base, _ = os.path.splitext(args.input_path)
+    output_path = f"{base}.transcription_structured.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(structured_data, f, ensure_ascii=False, separators=(',', ':')) # Compact for max efficiency
+    print(output_path)
+
+if __name__ == "__main__":
+    main()
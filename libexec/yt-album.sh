@@ -31,6 +31,8 @@
 
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/audio-pipeline.sh"
+source "$WORK_DIR/lib/library.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/yt-album.cfg"
@@ -75,18 +77,21 @@ if [ -z "$playlist_url" ]; then
     exit 1
 fi
 
+# Skip the whole run if every track of this playlist is already in the library.
+if library_has album "$playlist_url" > /dev/null; then
+    echo "This playlist is already complete in the library (config/library.sqlite). Nothing to do."
+    exit 0
+fi
+
 printf "Set name for new dir under %s (Leave blank for automatic naming): " "$music_basedir"
 read -r album_dir_name
 
 # --- Execute yt-dlp ---
 
-# Argument array
+# Argument array. The mp3 conversion arguments (AUDIO_ARGS) are added by
+# audio_pipeline_setup, depending on whether pipeline mode is enabled.
 YT_DLP_ARGS=(
     -f bestaudio
-    --extract-audio
-    --audio-format mp3
-    --audio-quality 0
-    --embed-thumbnail
     --ignore-config
     --parse-metadata "playlist_index:(?P<meta_track>.*)"
     --parse-metadata ":(?P<meta_date>)"
@@ -95,30 +100,44 @@ YT_DLP_ARGS=(
     --replace-in-metadata "title" " \(Official Video\)" ""
     --replace-in-metadata "title" " \(Audio\)" ""
     --replace-in-metadata "title" " \(Video\)" ""
-    --embed-metadata
 )
 
 
+# Known tracks are skipped via a download archive exported from the library.
+library_setup album
+
 # .cfg-provided directory:
 
 if [ -z "$album_dir_name" ]; then
     # Case 1: Automatic naming (album_dir_name is empty)
     echo "Starting download with automatic naming..."
+    audio_pipeline_setup "$music_basedir" album
+    album_artwork_prefetch "$playlist_url"
     $YTDLP_COMMAND \
-        -P "$music_basedir" \
+        -P "$AUDIO_OUTPUT_DIR" \
         -o '%(channel)s - %(playlist)s/%(playlist_index)s. %(title)s.%(ext)s' \
         "${YT_DLP_ARGS[@]}" \
+        "${AUDIO_ARGS[@]}" \
+        "${LIBRARY_ARGS[@]}" \
         "$playlist_url"
 else
     # User-provided directory name:
     # We use -P for the path prefix, safer than embedding in -o.
     download_path="$music_basedir/$album_dir_name"
     echo "Downloading album to \"$download_path\""
+    audio_pipeline_setup "$download_path" album
+    album_artwork_prefetch "$playlist_url"
     $YTDLP_COMMAND \
-        -P "$download_path" \
+        -P "$AUDIO_OUTPUT_DIR" \
         -o '%(playlist_index)s. %(title)s.%(ext)s' \
         "${YT_DLP_ARGS[@]}" \
+        "${AUDIO_ARGS[@]}" \
+        "${LIBRARY_ARGS[@]}" \
         "$playlist_url"
 fi
 
+# No-op unless pipeline mode is enabled.
+audio_pipeline_finish
+library_commit
+
 exit 0
@@ -18,8 +18,8 @@
 
 
 # This script crawls a channel/user page for playlists, generates a list of
-# them using a helper script, and then downloads them (as mp3 albums) using yt-dlp's
-# batch file feature (-a).
+# them using a helper script, and then downloads them (as mp3 albums) in parallel,
+# one yt-dlp per playlist, using playlist-scheduler.py.
 
 # --- Prerequisite ---
 # This script depends on a python script, releases-retriever.py.
@@ -31,6 +31,10 @@
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 # The path is relative to this script's location.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/directories-config.sh"
+source "$WORK_DIR/lib/audio-pipeline.sh"
+source "$WORK_DIR/lib/library.sh"
+source "$WORK_DIR/lib/run-report.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/yt-album.cfg"
@@ -79,8 +83,17 @@ echo "Running script to retrieve playlists..."
 # Ensure tmp-directory exists on which releases-retriever.py depends
 mkdir -p "$WORK_DIR/tmp"
 
+# With ALBUM_INCREMENTAL_SYNC=1 only playlists of this channel that no earlier
+# sync has downloaded completely are listed.
+retriever_args=(--url "$crawl_url" --output-dir "$WORK_DIR/tmp")
+incremental_sync=$(get_config_default "ALBUM_INCREMENTAL_SYNC" "0")
+if [ "$incremental_sync" = "1" ]; then
+    echo "Incremental sync: only new playlists of this channel will be downloaded."
+    retriever_args+=(--incremental)
+fi
+
 # Execute releases-retriever.py and capture its standard output as a variable.
-generated_txt_file_path=$("$VENV_PYTHON" "$WORK_DIR/libexec/releases-retriever.py" --url "$crawl_url" --output-dir "$WORK_DIR/tmp")
+generated_txt_file_path=$(report_stage albums.retrieve -- "$VENV_PYTHON" "$WORK_DIR/libexec/releases-retriever.py" "${retriever_args[@]}")
 
 # Check if the helper script actually returned anything.
 if [ -z "$generated_txt_file_path" ]; then
@@ -90,28 +103,53 @@ fi
 
 echo "Playlist file generated at: $generated_txt_file_path"
 
+# Drop playlists the library already has complete; no network needed for those.
+report_stage albums.library-filter -- "${LIBRARY_CMD[@]}" filter-playlists --mode album "$generated_txt_file_path"
+if ! grep -q '^http' "$generated_txt_file_path"; then
+    echo "Nothing left to download (no new playlists, or all of them are already in the library)."
+    exit 0
+fi
+
 
 # --- Execute yt-dlp ---
 # - Using -P for the base path for cleanliness.
-# - Using single quotes for the output template to protect '%' and '()'.
-#   Since we need to include a variable, we must use double quotes instead.
+# - The output template needs the artist variable, so it is double-quoted.
 #   This is safe here as the template contains no other shell metacharacters.
-# - The batch file path from releases-retriever.py is passed to '-a'.
+# - playlist-scheduler.py runs one yt-dlp per playlist from the list file,
+#   ALBUM_PARALLEL_JOBS at a time, and appends each playlist URL to the command.
 # - All variables are double-quoted to handle spaces and special characters.
-$YTDLP_COMMAND \
-    -f bestaudio \
-    --extract-audio \
-    --audio-format mp3 \
-    --audio-quality 0 \
-    --embed-thumbnail \
-    --ignore-config \
-    --parse-metadata "playlist_index:(?P<meta_track>.*)" \
-    --parse-metadata ":(?P<meta_date>)" \
-    --embed-metadata \
-    --replace-in-metadata "channel" " - Topic$" "" \
-    --replace-in-metadata "title" " (Official Video)" "" \
-    -P "$music_basedir" \
-    -o "$artist_name - %(playlist)s/%(playlist_index)s. %(title)s.%(ext)s" \
-    -a "$generated_txt_file_path"
+parallel_jobs=$(get_config_default "ALBUM_PARALLEL_JOBS" "3")
+host_interval=$(get_config_default "ALBUM_HOST_INTERVAL" "2")
+audio_pipeline_setup "$music_basedir" album
+album_artwork_prefetch --batch-file "$generated_txt_file_path"
+library_setup album
+
+yt_dlp_args=(
+    -f bestaudio
+    "${AUDIO_ARGS[@]}"
+    "${LIBRARY_ARGS[@]}"
+    --ignore-config
+    --parse-metadata "playlist_index:(?P<meta_track>.*)"
+    --parse-metadata ":(?P<meta_date>)"
+    --replace-in-metadata "channel" " - Topic$" ""
+    --replace-in-metadata "title" " (Official Video)" ""
+    -P "$AUDIO_OUTPUT_DIR"
+    -o "$artist_name - %(playlist)s/%(playlist_index)s. %(title)s.%(ext)s"
+)
+
+report_stage albums.download -- "$VENV_PYTHON" "$WORK_DIR/libexec/playlist-scheduler.py" \
+    --list "$generated_txt_file_path" \
+    --jobs "$parallel_jobs" \
+    --host-interval "$host_interval" \
+    --log-dir "$WORK_DIR/tmp/playlist-logs/$(date +%Y%m%d-%H%M%S)" \
+    -- "${YTDLP_COMMAND_ARRAY[@]}" "${yt_dlp_args[@]}"
+audio_pipeline_finish
+library_commit
+
+# Only playlists that are now complete in the library count as synced; failed
+# or interrupted ones are listed again next time.
+if [ "$incremental_sync" = "1" ]; then
+    "${LIBRARY_CMD[@]}" remember-channel --mode album --channel "$crawl_url" "$generated_txt_file_path"
+fi
 
 exit 0
@@ -22,6 +22,8 @@
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 # The path is relative to this script's location.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/cache.sh"
+source "$WORK_DIR/lib/library.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/yt-comments.cfg"
@@ -84,17 +86,43 @@ printf "Enter URL: "
 # '-r' flag prevents backslash interpretation, which is important for URLs.
 read -r url
 
+if ! library_confirm_refetch comments "$url"; then
+    echo "Skipped."
+    exit 0
+fi
+
 # Execute command
 echo "Downloading comments to $comments_basedir"
-$YTDLP_COMMAND \
-    --write-comments \
-    --write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" \
-    --sub-format "srt/ass/best" \
+# A recent .info.json (with comments), description and subtitle are reused
+# from the metadata cache; only what is missing is fetched.
+CACHE_SUB_FORMATS="srt,ass,vtt"
+cache_restore "$url" "$comments_basedir" info description subtitle
+fetch_args=()
+if cache_missing info; then
+    fetch_args+=(--write-comments --write-info-json)
+fi
+if cache_missing subtitle; then
+    fetch_args+=(--write-auto-subs --sub-langs "^en(-[a-zA-Z]+)*$" --sub-format "srt/ass/best")
+fi
+if cache_missing description; then
+    fetch_args+=(--write-description)
+fi
+if [ ${#fetch_args[@]} -eq 0 ]; then
+    echo "Comments, description and subtitles reused from the metadata cache."
+elif "${YTDLP_COMMAND_ARRAY[@]}" \
+    "${fetch_args[@]}" \
     --skip-download \
     --ignore-config \
-    --write-description \
     --paths "$comments_basedir" \
     --output "%(channel)s - %(title)s [%(id)s].%(upload_date)s.%(ext)s" \
-    "$url"
+    "$url"; then
+    cache_store "$comments_basedir"
+fi
+
+# Record the description file, which is named after the video id.
+video_id=$("${LIBRARY_CMD[@]}" video-id "$url")
+if [ -n "$video_id" ]; then
+    library_record comments "$video_id" "$(find "$comments_basedir" -maxdepth 1 -type f -name "*\[$video_id\]*.description" | head -n 1)"
+fi
 
 ## yt-dlp --write-comments --write-description --skip-download --ignore-config -P "$music_basedir" "$url"
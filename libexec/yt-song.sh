@@ -23,6 +23,8 @@
 
 # Source the master environment file. It defines WORK_DIR, VENV_PYTHON, YTDLP_COMMAND.
 source "$(dirname "$0")/../lib/environment.sh"
+source "$WORK_DIR/lib/audio-pipeline.sh"
+source "$WORK_DIR/lib/library.sh"
 
 # --- Configuration ---
 config_file="$WORK_DIR/config/yt-song.cfg"
@@ -65,6 +67,11 @@ if [ -z "$target_url" ]; then
     echo "Target URL cannot be empty. Exiting."
     exit 1
 fi
+
+if existing_path=$(library_has song "$target_url"); then
+    echo "Already in library: $existing_path. Nothing to do."
+    exit 0
+fi
 # This prompts for creation of new subfolder but it adds another prompt, a whole extra step. I don't like it
 # printf "Input NEW folder name under %s (or leave blank): " "$music_basedir"
 # read -r subfolder_name
@@ -77,26 +84,27 @@ if [ -n "$subfolder_name" ]; then
     download_path="$music_basedir/$subfolder_name"
 fi
 echo "Downloading song(s) to \"$download_path\""
+audio_pipeline_setup "$download_path"
+library_setup song
 
 # Consolidate all arguments into a single array for robust execution.
 # Note the correction to --replace-in-metadata syntax.
 yt_dlp_final_args=(
-    -P "$download_path"
+    -P "$AUDIO_OUTPUT_DIR"
     -o '%(channel)s - %(title)s.%(ext)s'
     -f 'bestaudio'
-    --extract-audio
-    --audio-format mp3
-    --audio-quality 0
-    --embed-thumbnail
+    "${AUDIO_ARGS[@]}"
+    "${LIBRARY_ARGS[@]}"
     --ignore-config
     --no-playlist
     --parse-metadata 'playlist_index:(?P<meta_track>.*)'
     --parse-metadata ':(?P<meta_date>)'
-    --embed-metadata
     --replace-in-metadata 'channel' ' - Topic$' ''
     "$target_url"
 )
 
 "${YTDLP_COMMAND_ARRAY[@]}" "${yt_dlp_final_args[@]}"
+audio_pipeline_finish
+library_commit
 
 exit 0
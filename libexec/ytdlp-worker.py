@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Warm yt-dlp worker. 'serve' imports yt_dlp and its extractor registry once and
+# listens on a Unix socket. Every job forks from that warm process, so it starts
+# in milliseconds. 'run' is the client used by the worker scripts. It passes its
+# own stdin/stdout/stderr to the job, so output and prompts behave as with a
+# local yt-dlp. If no worker answers, it execs the regular one-shot command.
+# A worker that follows vendor/yt-dlp-current restarts itself when an update
+# (lib/ytdlp-update.sh) switches the link to another revision. Clients name the
+# revision they were started with; the worker turns away jobs for any other
+# one, and the client then runs the one-shot command of its own revision.
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+WORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOCKET = os.path.join(WORK_DIR, 'tmp', 'ytdlp-worker.sock')
+CLONE_YTDLP_DIR = os.path.join(WORK_DIR, 'vendor', 'yt-dlp')
+CURRENT_YTDLP_LINK = os.path.join(WORK_DIR, 'vendor', 'yt-dlp-current')
+# How often an idle worker looks for a new revision.
+REVISION_CHECK_SECONDS = 5
+
+# --- Helper Functions ---
+
+def current_ytdlp_dir():
+    """The revision environment.sh would use: the target of vendor/yt-dlp-current, else the clone."""
+    if os.path.isdir(CURRENT_YTDLP_LINK):
+        return os.path.realpath(CURRENT_YTDLP_LINK)
+    return CLONE_YTDLP_DIR
+
+def pid_file_for(socket_path):
+    return f"{socket_path}.pid"
+
+def read_message(conn, buffer=b''):
+    """Reads one newline-terminated JSON message. Returns (message, remaining bytes)."""
+    while b'\n' not in buffer:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return None, buffer
+        buffer += chunk
+    line, buffer = buffer.split(b'\n', 1)
+    return json.loads(line), buffer
+
+def send_message(conn, message):
+    conn.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+def worker_is_alive(socket_path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(socket_path)
+            send_message(probe, {'ping': True})
+            reply, _ = read_message(probe)
+            return bool(reply and reply.get('pong'))
+    except OSError:
+        return False
+
+# --- Server ---
+
+def run_job(conn, fds, request):
+    """Runs one yt-dlp invocation in the forked child and never returns."""
+    exit_code = 1
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL) # yt-dlp waits on ffmpeg
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.setsid()
+
+        for target_fd, received_fd in enumerate(fds):
+            os.dup2(received_fd, target_fd)
+            os.close(received_fd)
+        sys.stdin = open(0, 'r', encoding='utf-8', closefd=False)
+        sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, encoding='utf-8', errors='replace', closefd=False)
+        sys.stderr = open(2, 'w', buffering=1, encoding='utf-8', errors='backslashreplace', closefd=False)
+
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        sys.argv = ['yt-dlp', *request['args']]
+        send_message(conn, {'pid': os.getpid()})
+
+        import yt_dlp
+        try:
+            yt_dlp.main(request['args'])
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        exit_code = 130
+    except BaseException as e:
+        print(f"Error (ytdlp-worker): Job failed: {e}", file=sys.stderr)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            send_message(conn, {'exit': exit_code})
+        except OSError:
+            pass
+        os._exit(exit_code)
+
+def serve(socket_path, ytdlp_dir, follow_current=False):
+    """
+    Imports yt-dlp once and forks a child per job until terminated. With
+    follow_current, it re-executes itself once the current revision changes;
+    jobs already running finish on the old one.
+    """
+    sys.path.insert(0, ytdlp_dir)
+    started = time.monotonic()
+    import yt_dlp # noqa: F401 - the point is to have it imported before forking
+    from yt_dlp.extractor import gen_extractor_classes
+    gen_extractor_classes()
+    print(f"ytdlp-worker: yt-dlp {yt_dlp.version.__version__} loaded in {time.monotonic() - started:.2f}s", file=sys.stderr)
+
+    if os.path.exists(socket_path):
+        if worker_is_alive(socket_path):
+            print(f"Error: A worker is already listening on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(socket_path) # Stale socket from a worker that died
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(16)
+    with open(pid_file_for(socket_path), 'w') as f:
+        f.write(f"{os.getpid()}\n")
+
+    def shutdown(_signum, _frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN) # Let the kernel reap finished jobs
+    print(f"ytdlp-worker: listening on {socket_path}", file=sys.stderr)
+
+    restart = False
+    if follow_current:
+        server.settimeout(REVISION_CHECK_SECONDS)
+    try:
+        while True:
+            if follow_current and current_ytdlp_dir() != ytdlp_dir:
+                restart = True
+                break
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                continue
+            try:
+                first, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+                request, _ = read_message(conn, first)
+                if request is None or request.get('ping'):
+                    if request is not None:
+                        send_message(conn, {'pong': True})
+                    for fd in fds:
+                        os.close(fd)
+                    continue
+                if request.get('ytdlp_dir') and os.path.realpath(request['ytdlp_dir']) != os.path.realpath(ytdlp_dir):
+                    send_message(conn, {'other_revision': True})
+                    for fd in fds:
+                        os.close(fd)
+                    continue
+                if len(fds) != 3:
+                    raise ValueError("expected stdin, stdout and stderr descriptors")
+
+                sys.stderr.flush()
+                if os.fork() == 0:
+                    server.close()
+                    run_job(conn, fds, request)
+                for fd in fds:
+                    os.close(fd)
+            except (OSError, ValueError) as e:
+                print(f"ytdlp-worker: rejected job: {e}", file=sys.stderr)
+            finally:
+                conn.close()
+    finally:
+        server.close()
+        for path in (socket_path, pid_file_for(socket_path)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    if restart:
+        # Clients that connect in between fall back to the one-shot command.
+        print(f"ytdlp-worker: yt-dlp changed to {current_ytdlp_dir()}, restarting", file=sys.stderr)
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), '--socket', socket_path, 'serve'])
+
+# --- Client ---
+
+def fallback_command(ytdlp_dir, args):
+    return [sys.executable, '-Werror', '-Xdev', os.path.join(ytdlp_dir, 'yt_dlp', '__main__.py'), *args]
+
+def run_client(socket_path, ytdlp_dir, args):
+    """
+    Hands the job to the warm worker, or execs the one-shot command if no
+    worker answers or the worker has another yt-dlp revision loaded.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path)
+    except OSError:
+        conn.close()
+        command = fallback_command(ytdlp_dir, args)
+        os.execv(command[0], command)
+
+    request = {'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ), 'ytdlp_dir': ytdlp_dir}
+    payload = json.dumps(request).encode('utf-8') + b'\n'
+    sent = socket.send_fds(conn, [payload[:65536]], [0, 1, 2])
+    if sent < len(payload): # Even an empty send fails once a worker that turned the job away has closed
+        conn.sendall(payload[sent:])
+
+    reply, buffer = read_message(conn)
+    if reply is None:
+        print("Error (ytdlp-worker): Worker closed the connection before starting the job.", file=sys.stderr)
+        return 1
+    if reply.get('other_revision'): # An update landed after this script started
+        conn.close()
+        command = fallback_command(ytdlp_dir, args)
+        os.execv(command[0], command)
+    if 'exit' in reply: # The job failed before it could start yt-dlp
+        return reply['exit']
+    job_pid = reply['pid']
+
+    # The job runs in its own session, so forward terminal interrupts to it.
+    def forward(signum, _frame):
+        try:
+            os.kill(job_pid, signum)
+        except ProcessLookupError:
+            pass
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    reply, _ = read_message(conn, buffer)
+    if reply is None:
+        print("Error (ytdlp-worker): Worker job ended without reporting an exit status.", file=sys.stderr)
+        return 1
+    return reply['exit']
+
+# --- Lifecycle ---
+
+def start(socket_path, ytdlp_dir=None):
+    if worker_is_alive(socket_path):
+        print(f"Worker already running on {socket_path}")
+        return 0
+    log_path = os.path.join(os.path.dirname(socket_path), 'ytdlp-worker.log')
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    command = [sys.executable, os.path.abspath(__file__), '--socket', socket_path]
+    if ytdlp_dir:
+        command += ['--ytdlp-dir', ytdlp_dir]
+    with open(log_path, 'a') as log:
+        subprocess.Popen(
+            [*command, 'serve'],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+        )
+    for _ in range(300):
+        if worker_is_alive(socket_path):
+            print(f"Worker started on {socket_path} (log: {log_path})")
+            return 0
+        time.sleep(0.1)
+    print(f"Error: Worker did not come up. See {log_path}", file=sys.stderr)
+    return 1
+
+def stop(socket_path):
+    try:
+        with open(pid_file_for(socket_path)) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, signal.SIGTERM)
+    except (OSError, ValueError):
+        print("No running worker found.")
+        return 1
+    print(f"Stopped worker (pid {pid}).")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Warm yt-dlp worker: imports yt-dlp once and runs jobs handed to it over a Unix socket."
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET}).")
+    parser.add_argument("--ytdlp-dir", help="yt-dlp checkout to import (default: vendor/yt-dlp-current, followed across updates, "
+                                              "or vendor/yt-dlp before the first update).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Run the worker in the foreground.")
+    subparsers.add_parser("start", help="Start the worker in the background.")
+    subparsers.add_parser("stop", help="Stop the background worker.")
+    subparsers.add_parser("status", help="Report whether a worker is answering.")
+    run_parser = subparsers.add_parser("run", help="Run yt-dlp with the given arguments through the worker.")
+    run_parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for yt-dlp (after '--').")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket, args.ytdlp_dir or current_ytdlp_dir(), follow_current=args.ytdlp_dir is None)
+    elif args.command == "start":
+        sys.exit(start(args.socket, args.ytdlp_dir))
+    elif args.command == "stop":
+        sys.exit(stop(args.socket))
+    elif args.command == "status":
+        alive = worker_is_alive(args.socket)
+        print(f"Worker is {'running' if alive else 'not running'} ({args.socket})")
+        sys.exit(0 if alive else 1)
+    elif args.command == "run":
+        ytdlp_args = args.args[1:] if args.args[:1] == ['--'] else args.args
+        sys.exit(run_client(args.socket, args.ytdlp_dir or current_ytdlp_dir(), ytdlp_args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+import random
+
+import pytest
+
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+def comment(comment_id, text, likes=0, parent='root', author='@someone', uploader=False):
+    return {'id': comment_id, 'text': text, 'like_count': likes, 'parent': parent,
+            'author': author, 'author_is_uploader': uploader}
+
+def random_comments(seed=1, threads=300):
+    """Threads with up to four replies each, random text lengths and likes."""
+    rng = random.Random(seed)
+    comments = []
+    for i in range(threads):
+        comments.append(comment(f"r{i}", "x" * rng.randint(1, 200), rng.randint(0, 50),
+                                author=f"@u{i % 17}", uploader=i % 50 == 0))
+        for k in range(rng.randint(0, 4)):
+            comments.append(comment(f"r{i}.{k}", "y" * rng.randint(1, 100), rng.randint(0, 9),
+                                    parent=f"r{i}", author=f"@v{k}"))
+    return comments
+
+def nested_size(kept):
+    """Characters of the comments as a package writes them (indent=2, threads at level 2)."""
+    return len(json.dumps({'comments': kept}, indent=2, ensure_ascii=False))
+
+def compact_size(kept):
+    return len(json.dumps(json_restructurer.compact_comments(kept), separators=(',', ':'), ensure_ascii=False))
+
+def test_without_a_budget_every_comment_is_kept_in_order():
+    comments = [comment("a", "one"), comment("b", "two", parent="a"), comment("c", "three")]
+    kept = json_restructurer.restructure_comments(comments)
+    assert [c['id'] for c in kept] == ["a", "c"]
+    assert [r['id'] for r in kept[0]['replies']] == ["b"]
+
+@pytest.mark.parametrize("budget", [500, 2000, 10000, 50000])
+def test_nested_output_stays_within_the_budget(budget):
+    kept = json_restructurer.restructure_comments(random_comments(), budget)
+    assert kept
+    assert nested_size(kept) <= budget + nested_size([])
+
+@pytest.mark.parametrize("budget", [500, 2000, 10000, 50000])
+def test_compact_output_stays_within_the_budget(budget):
+    kept = json_restructurer.restructure_comments(random_comments(), budget, output_format='compact')
+    assert kept
+    assert compact_size(kept) <= budget + compact_size([])
+
+def test_zero_budget_keeps_no_comments():
+    budget = json_restructurer.budget_in_chars(max_tokens=0)
+    assert budget == 0
+    assert json_restructurer.restructure_comments(random_comments(), budget) == []
+
+def test_budget_in_chars_takes_the_smaller_budget():
+    assert json_restructurer.budget_in_chars() is None
+    assert json_restructurer.budget_in_chars(100, 10) == 10 * json_restructurer.APPROX_CHARS_PER_TOKEN
+    assert json_restructurer.budget_in_chars(30, 10) == 30
+
+def test_threads_that_do_not_fit_are_passed_over_for_smaller_ones():
+    comments = [comment("big", "x" * 5000, likes=100), comment("small", "short", likes=1)]
+    kept = json_restructurer.restructure_comments(comments, 1000)
+    assert [c['id'] for c in kept] == ["small"]
+
+def test_threads_are_kept_best_first():
+    comments = [comment("low", "a", likes=1), comment("high", "b", likes=50),
+                comment("uploader", "c", likes=0, uploader=True)]
+    kept = json_restructurer.restructure_comments(comments, 10000)
+    assert [c['id'] for c in kept] == ["uploader", "high", "low"]
+
+def test_max_replies_keeps_the_best_replies_in_their_original_order():
+    comments = [comment("top", "t")] + [comment(f"r{i}", "reply", likes=likes, parent="top")
+                                         for i, likes in enumerate([1, 9, 5, 7])]
+    kept = json_restructurer.restructure_comments(comments, max_replies=2)
+    assert [r['id'] for r in kept[0]['replies']] == ["r1", "r3"]
@@ -0,0 +1,56 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+COMMENTS = [
+    {'id': 'a', 'text': 'first', 'author': '@ann', 'like_count': 3, 'parent': 'root'},
+    {'id': 'b', 'text': 'reply', 'author': '@owner', 'author_is_uploader': True, 'parent': 'a'},
+    {'id': 'c', 'text': 'nested', 'author': '@ann', 'like_count': 1, 'parent': 'b'},
+    {'id': 'd', 'text': 'second', 'author': '@bob', 'parent': 'root'},
+    {'id': 'e', 'text': 'lost parent', 'author': '@bob', 'parent': 'gone'},
+]
+
+def without_ids(comments):
+    return [{**{k: v for k, v in comment.items() if k != 'id'}, 'replies': without_ids(comment['replies'])}
+            for comment in comments]
+
+def test_compact_layout():
+    compact = json_restructurer.compact_comments(json_restructurer.restructure_comments(COMMENTS))
+    assert compact == {
+        'authors': ['@ann', '@owner', '@bob'],
+        'parent': [-1, 0, 1, -1, -1],
+        'author': [0, 1, 0, 2, 2],
+        'likes': [3, 0, 1, 0, 0],
+        'text': ['first', 'reply', 'nested', 'second', 'lost parent'],
+        'uploader': [1],
+        'orphans': [4],
+    }
+
+def test_expand_is_the_inverse_without_ids():
+    threaded = json_restructurer.restructure_comments(COMMENTS)
+    assert json_restructurer.expand_compact_comments(json_restructurer.compact_comments(threaded)) == without_ids(threaded)
+
+def test_replies_follow_their_parent():
+    compact = json_restructurer.compact_comments(json_restructurer.restructure_comments(COMMENTS))
+    assert all(parent < index for index, parent in enumerate(compact['parent']))
+
+def test_no_comments():
+    compact = json_restructurer.compact_comments([])
+    assert compact == {'authors': [], 'parent': [], 'author': [], 'likes': [], 'text': [], 'uploader': []}
+    assert json_restructurer.expand_compact_comments(compact) == []
@@ -0,0 +1,89 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import json
+
+import pytest
+
+from sibling_import import load_sibling
+
+json_restructurer = load_sibling('json-restructurer.py')
+
+DOCUMENT = {
+    "id": "abc",
+    "formats": [{"url": "https://example.com/a?b=\"c\"", "nested": {"x": [1, 2, {"y": "}]"}]}}],
+    "title": "Back\\slash \"quoted\" é \U0001F600",
+    "like_count": -2.5e3,
+    "comments": [
+        {"id": "c1", "text": "first", "parent": "root"},
+        {"id": "c2", "text": "reply with \\\" and ]}", "parent": "c1"},
+    ],
+    "empty": {},
+    "flag": None,
+}
+
+def read_all(text, chunk_size):
+    """Every top-level key with its value, read through the stream reader."""
+    reader = json_restructurer.JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    return {key: reader.read_value() for key in reader.iter_object()}
+
+# Chunk sizes of 1 and 2 split every token, escape and surrogate pair.
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_read_value_matches_json_load(chunk_size, indent):
+    text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+    assert read_all(text, chunk_size) == DOCUMENT
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_skip_value_leaves_the_reader_at_the_next_key(chunk_size):
+    text = json.dumps(DOCUMENT, indent=1)
+    reader = json_restructurer.JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    kept = {}
+    for key in reader.iter_object():
+        if key in ("title", "flag"):
+            kept[key] = reader.read_value()
+        else:
+            reader.skip_value()
+    assert kept == {"title": DOCUMENT["title"], "flag": None}
+
+def test_iter_array_yields_elements_one_by_one():
+    reader = json_restructurer.JsonStreamReader(io.StringIO('{"a": [1, {"b": []}, "x"], "e": []}'), chunk_size=2)
+    result = {key: list(reader.iter_array()) for key in reader.iter_object()}
+    assert result == {"a": [1, {"b": []}, "x"], "e": []}
+
+def test_empty_object():
+    reader = json_restructurer.JsonStreamReader(io.StringIO(' { } '))
+    assert list(reader.iter_object()) == []
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2', '{"a": "open', '{"a" 1}'])
+def test_malformed_input_raises_value_error(text):
+    reader = json_restructurer.JsonStreamReader(io.StringIO(text), chunk_size=4)
+    with pytest.raises(ValueError):
+        for _key in reader.iter_object():
+            reader.skip_value()
+
+def test_stream_info_json_yields_comments_and_kept_keys(tmp_path):
+    path = tmp_path / "video.info.json"
+    path.write_text(json.dumps(DOCUMENT), encoding='utf-8')
+    items = list(json_restructurer.stream_info_json(str(path), ("id", "title")))
+    assert items == [("id", "abc"), ("title", DOCUMENT["title"]),
+                     ("comment", DOCUMENT["comments"][0]), ("comment", DOCUMENT["comments"][1])]
+
+def test_stream_info_json_accepts_null_comments(tmp_path):
+    path = tmp_path / "video.info.json"
+    path.write_text('{"comments": null, "id": "abc"}', encoding='utf-8')
+    assert list(json_restructurer.stream_info_json(str(path), ("id",))) == [("id", "abc")]
@@ -0,0 +1,91 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+
+import library
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = library.connect(str(tmp_path / "library.sqlite"))
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def record(conn, tmp_path):
+    """Writes the given lines as a yt-dlp record file and imports it. Returns the number recorded."""
+    def record(*lines):
+        record_file = tmp_path / "record"
+        record_file.write_text("".join(f"{line}\n" for line in lines), encoding='utf-8')
+        return library.record_from_file(conn, 'album', str(record_file))
+    return record
+
+def track(tmp_path, video_id, playlist_id, n_entries, exists=True):
+    """A RECORD_TEMPLATE line; the file only exists if the download (or encode) succeeded."""
+    path = tmp_path / f"{video_id}.mp3"
+    if exists:
+        path.write_bytes(b"mp3")
+    return f"{video_id}\tYoutube\t{playlist_id}\t{n_entries}\tTitle {video_id}\t{path}"
+
+def test_playlist_is_complete_once_every_track_is_recorded(conn, record, tmp_path):
+    assert record(track(tmp_path, "a", "PL", 2), track(tmp_path, "b", "PL", 2, exists=False)) == 1
+    assert not library.playlist_is_complete(conn, 'album', "PL")
+    assert record(track(tmp_path, "b", "PL", 2)) == 1
+    assert library.playlist_is_complete(conn, 'album', "PL")
+
+def test_archived_tracks_count_toward_completion(conn, record, tmp_path):
+    # "k" is already in the library from another album, so yt-dlp skips entry 1 through the archive.
+    library.record_item(conn, 'album', "k", str(tmp_path / "k.mp3"), playlist_id="OTHER")
+    record(track(tmp_path, "b", "PL", 3), track(tmp_path, "c", "PL", 3), "playlist\tPL\t3\t[2, 3]")
+    assert library.playlist_is_complete(conn, 'album', "PL")
+
+def test_playlist_with_only_archived_tracks_is_complete(conn, record):
+    assert record("playlist\tPL\t2\t[]") == 0
+    assert library.playlist_is_complete(conn, 'album', "PL")
+
+def test_failed_track_keeps_the_playlist_incomplete_despite_archived_ones(conn, record, tmp_path):
+    record(track(tmp_path, "b", "PL", 3), track(tmp_path, "c", "PL", 3, exists=False), "playlist\tPL\t3\t[2, 3]")
+    assert not library.playlist_is_complete(conn, 'album', "PL")
+
+def test_archived_tracks_of_an_earlier_run_are_not_counted_twice(conn, record, tmp_path):
+    record(track(tmp_path, "a", "PL", 3), track(tmp_path, "b", "PL", 3, exists=False),
+           track(tmp_path, "c", "PL", 3, exists=False), "playlist\tPL\t3\t")
+    # Second run: "a" is archived, "b" succeeds, "c" fails again.
+    record(track(tmp_path, "b", "PL", 3), track(tmp_path, "c", "PL", 3, exists=False), "playlist\tPL\t3\t[2, 3]")
+    assert not library.playlist_is_complete(conn, 'album', "PL")
+
+def test_playlist_line_without_requested_entries_means_nothing_was_skipped(conn, record, tmp_path):
+    record(track(tmp_path, "a", "PL", 2), "playlist\tPL\t2\t")
+    assert not library.playlist_is_complete(conn, 'album', "PL")
+
+def test_completion_is_not_reverted(conn):
+    library.update_playlist(conn, 'album', "PL", 1, downloaded=1)
+    library.update_playlist(conn, 'album', "PL", 2)
+    assert library.playlist_is_complete(conn, 'album', "PL")
+
+def test_unknown_track_count_never_completes(conn):
+    library.update_playlist(conn, 'album', "PL", None, downloaded=5, archived=5)
+    assert not library.playlist_is_complete(conn, 'album', "PL")
+
+@pytest.mark.parametrize("url, video_id, playlist_id", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLabc_-1", "dQw4w9WgXcQ", "PLabc_-1"),
+    ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ", None),
+    ("https://www.youtube.com/playlist?list=OLAK5uy_x", None, "OLAK5uy_x"),
+    ("dQw4w9WgXcQ", "dQw4w9WgXcQ", None),
+])
+def test_id_extraction(url, video_id, playlist_id):
+    assert library.extract_video_id(url) == video_id
+    assert library.extract_playlist_id(url) == playlist_id
@@ -0,0 +1,66 @@
+# Copyright (C) 2025 mons8 <115350611+mons8@users.noreply.github.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+
+import subtitles
+
+@pytest.mark.parametrize("text, milliseconds", [
+    ("00:00:01,500", 1500),           # SRT
+    ("01:02:03.004", 3723004),        # WebVTT
+    ("02:03.4", 123400),              # WebVTT without hours
+    ("0:00:05.25", 5250),             # ASS centiseconds
+    (" 00:00:00,000 ", 0),
+    ("10:00:00.1234", 36000123),      # Extra digits are cut, not rounded
+    ("00:00:07", 7000),
+])
+def test_parse_time_ms(text, milliseconds):
+    assert subtitles.parse_time_ms(text) == milliseconds
+
+@pytest.mark.parametrize("milliseconds", [0, 999, 61001, 3723004, 36000123])
+def test_format_time_ms_round_trips(milliseconds):
+    assert subtitles.parse_time_ms(subtitles.format_time_ms(milliseconds)) == milliseconds
+
+def test_rolling_captions_keep_only_the_new_lines():
+    cues = [(0, 1000, ["A", "B"]), (1000, 2000, ["B"]), (2000, 3000, ["B", "C"]), (3000, 4000, ["C", "D"])]
+    assert list(subtitles.remove_rolling_overlap(cues)) == [
+        (0, 1000, ["A", "B"]), (2000, 3000, ["C"]), (3000, 4000, ["D"])]
+
+def test_a_line_said_twice_in_a_row_stays_when_it_is_new():
+    cues = [(0, 1000, ["yes"]), (1000, 2000, ["no", "yes"])]
+    assert list(subtitles.remove_rolling_overlap(cues)) == cues
+
+def test_only_whole_lines_count_as_overlap():
+    cues = [(0, 1000, ["go go"]), (1000, 2000, ["go"])]
+    assert list(subtitles.remove_rolling_overlap(cues)) == cues
+
+def test_overlap_uses_the_longest_repeated_tail():
+    cues = [(0, 1000, ["A", "B", "A", "B"]), (1000, 2000, ["A", "B", "C"])]
+    assert list(subtitles.remove_rolling_overlap(cues)) == [cues[0], (1000, 2000, ["C"])]
+
+def test_srt_blocks_with_crlf_bom_and_missing_final_blank_line():
+    srt = "\ufeff1\r\n00:00:01,000 --> 00:00:02,000\r\nHello\r\nthere.\r\n\r\n2\r\n00:00:05,000 --> 00:00:06,500\r\nBye."
+    assert list(subtitles.iter_srt_cues(srt.splitlines(keepends=True))) == [
+        (1000, 2000, ["Hello", "there."]), (5000, 6500, ["Bye."])]
+
+def test_structured_chunks_split_at_sentence_ends_and_pauses():
+    srt = ("1\n00:00:00,000 --> 00:00:01,000\nOne\n\n"
+           "2\n00:00:01,000 --> 00:00:02,000\ntwo.\n\n"
+           "3\n00:00:02,100 --> 00:00:03,000\nThree\n\n"
+           "4\n00:00:05,000 --> 00:00:06,000\nfour\n")
+    assert subtitles.structure_subtitle_text(srt, 'srt') == [
+        [0, 2000, "One two."], [2100, 3000, "Three"], [5000, 6000, "four"]]
+    assert subtitles.structure_subtitle_text(srt, 'srt', 'clock')[0] == ["00:00:00.000", "00:00:02.000", "One two."]